@@ -1,15 +1,53 @@
-from flask import Flask, render_template, request, jsonify
+import time
+_startup_started = time.perf_counter()
+
+from flask import Flask, Response, render_template, request, jsonify, url_for
+import hashlib
 import json
 import os
 import random
-import time
 from modules.game_controller import ChallengeGameController
-from modules.agent_profiles import create_random_agent_profiles
+from modules.session_store import SessionLockTimeout, create_session_store
+from modules.session_export import export_sessions, parse_time
+from modules.rooms import RoomManager
+from modules.audio_pipeline import get_audio_pipeline
+from modules.speech_stream import create_speech_stream_manager
+from modules.stance_classifier import get_stance_classifier
+from modules.llm_backends import backend_stats
+from modules.model_pool import get_model_pool, model_pool_stats
+from modules.response_cache import get_response_cache
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
-# Store active game sessions
-game_sessions = {}
+# Store active game sessions (bounded, with idle expiry and LRU eviction)
+game_sessions = create_session_store(os.environ)
+
+@app.errorhandler(SessionLockTimeout)
+def session_busy(error):
+    """Answer in the usual JSON shape when a session stays locked by another request (e.g. a long debate turn)."""
+    return jsonify({'success': False, 'message': 'This session is busy with another request. Please try again.'}), 409
+
+# Open streams of recorded speech, split into utterances and recognized as they arrive
+speech_streams = create_speech_stream_manager(os.environ)
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+# Keyword stance detection, with every lexicon compiled once at startup
+stance_classifier = get_stance_classifier()
+MAX_STANCE_BATCH = 10000
+
+# Classroom rooms of this worker, each sharing one game session among many players.
+# A room's game session goes away with the room.
+rooms = RoomManager(
+    max_rooms=int(os.environ.get('CHALLENGE_MAX_ROOMS', 100)),
+    max_queue=int(os.environ.get('CHALLENGE_ROOM_QUEUE', 256)),
+    idle_timeout=float(os.environ.get('CHALLENGE_ROOM_IDLE_TIMEOUT', 3600)),
+    on_close=lambda room: game_sessions.delete(room.session_id)
+)
+
+# Load the shared model instances at boot rather than on the first request
+if os.environ.get('CHALLENGE_MODEL_WARMUP', '1') != '0':
+    get_model_pool().warmup()
 
 @app.route('/')
 def index():
@@ -22,15 +60,13 @@ def start_game():
     print("Start game API called")
     session_id = request.json.get('session_id', str(hash(str(os.urandom(16)))))
     
-    # Create random agents for the session
-    agent_profiles = create_random_agent_profiles(4)
-    
-    # Initialize game controller
-    game_controller = ChallengeGameController(agent_profiles)
-    game_sessions[session_id] = game_controller
+    # Create a game with random agents, seeded so its journal can be replayed
+    game_controller = ChallengeGameController.new_game(4)
+    agent_profiles = game_controller.agent_profiles
     
     # Start the game (move to individual phase)
     result = game_controller.start_game()
+    game_sessions[session_id] = game_controller
     
     # Return session info
     return jsonify({
@@ -49,11 +85,11 @@ def set_preference():
     policy_area = request.json.get('policy_area')
     option = int(request.json.get('option'))
     
-    if session_id not in game_sessions:
-        return jsonify({'success': False, 'message': 'Invalid session ID'})
-    
-    game_controller = game_sessions[session_id]
-    result = game_controller.set_human_preference(policy_area, option)
+    with game_sessions.session(session_id) as game_controller:
+        if game_controller is None:
+            return jsonify({'success': False, 'message': 'Invalid session ID'})
+        
+        result = game_controller.set_human_preference(policy_area, option)
     
     return jsonify(result)
 
@@ -63,16 +99,20 @@ def start_group_discussion():
     print("Group discussion API called")
     session_id = request.json.get('session_id')
     
-    if session_id not in game_sessions:
-        return jsonify({'success': False, 'message': 'Invalid session ID'})
-    
-    game_controller = game_sessions[session_id]
-    result = game_controller.start_group_discussion()
-    
-    if result['success']:
-        # Get opening statements from agents
-        statements = game_controller.get_agent_opening_statements()
-        result.update(statements)
+    with game_sessions.session(session_id) as game_controller:
+        if game_controller is None:
+            return jsonify({'success': False, 'message': 'Invalid session ID'})
+        
+        result = game_controller.start_group_discussion()
+        
+        if result['success']:
+            if request.json.get('stream_statements'):
+                # The client will fetch opening statements over Server-Sent Events
+                result['statements_stream_url'] = statements_stream_url(session_id)
+            else:
+                # Get opening statements from agents
+                statements = game_controller.get_agent_opening_statements()
+                result.update(statements)
     
     return jsonify(result)
 
@@ -84,11 +124,11 @@ def submit_argument():
     argument = request.json.get('argument')
     preferred_option = int(request.json.get('preferred_option'))
     
-    if session_id not in game_sessions:
-        return jsonify({'success': False, 'message': 'Invalid session ID'})
-    
-    game_controller = game_sessions[session_id]
-    result = game_controller.submit_human_argument(argument, preferred_option)
+    with game_sessions.session(session_id) as game_controller:
+        if game_controller is None:
+            return jsonify({'success': False, 'message': 'Invalid session ID'})
+        
+        result = game_controller.submit_human_argument(argument, preferred_option)
     
     return jsonify(result)
 
@@ -99,50 +139,143 @@ def finalize_topic():
     session_id = request.json.get('session_id')
     option = int(request.json.get('option'))
     
-    if session_id not in game_sessions:
-        return jsonify({'success': False, 'message': 'Invalid session ID'})
-    
-    game_controller = game_sessions[session_id]
-    result = game_controller.finalize_topic_decision(option)
-    
-    if result['success'] and not result.get('is_final_topic', False):
-        # Get opening statements for the next topic
-        statements = game_controller.get_agent_opening_statements()
-        result.update(statements)
+    with game_sessions.session(session_id) as game_controller:
+        if game_controller is None:
+            return jsonify({'success': False, 'message': 'Invalid session ID'})
+        
+        result = game_controller.finalize_topic_decision(option)
+        
+        if result['success'] and not result.get('is_final_topic', False):
+            if request.json.get('stream_statements'):
+                # The client will fetch opening statements over Server-Sent Events
+                result['statements_stream_url'] = statements_stream_url(session_id)
+            else:
+                # Get opening statements for the next topic
+                statements = game_controller.get_agent_opening_statements()
+                result.update(statements)
     
     return jsonify(result)
 
+def statements_stream_url(session_id):
+    """Build the URL of the opening statements event stream for a session."""
+    return url_for('stream_opening_statements', session_id=session_id)
+
+def format_sse(event):
+    """Format an event dictionary as a Server-Sent Events message."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+@app.route('/api/stream-opening-statements', methods=['GET'])
+def stream_opening_statements():
+    """Stream agent opening statements for the current topic as Server-Sent Events."""
+    print("Stream opening statements API called")
+    session_id = request.args.get('session_id')
+    
+    def record(topic, agent, preference, statement):
+        # Check the session out only to record each finished statement
+        with game_sessions.session(session_id) as game_controller:
+            if game_controller is None:
+                return None
+            return game_controller.record_opening_statement(topic, agent, preference, statement)
+    
+    def generate():
+        # Generating can take a while, so the stream only reads the session instead of
+        # keeping it checked out (and other requests waiting) until the last agent is done
+        game_controller = game_sessions.get(session_id)
+        if game_controller is None:
+            yield format_sse({'event': 'error', 'message': 'Invalid session ID'})
+            return
+        
+        for event in game_controller.stream_agent_opening_statements(record=record):
+            yield format_sse(event)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/start-reflection', methods=['POST'])
 def start_reflection():
     """Start the reflection phase."""
     print("Reflection API called")
     session_id = request.json.get('session_id')
     
-    if session_id not in game_sessions:
-        return jsonify({'success': False, 'message': 'Invalid session ID'})
-    
-    game_controller = game_sessions[session_id]
-    result = game_controller.start_reflection_phase()
-    
-    if result['success']:
-        # Get reflections from agents
-        reflections = game_controller.get_agent_reflections()
-        result.update(reflections)
+    with game_sessions.session(session_id) as game_controller:
+        if game_controller is None:
+            return jsonify({'success': False, 'message': 'Invalid session ID'})
+        
+        result = game_controller.start_reflection_phase()
+        
+        if result['success']:
+            # Get reflections from agents
+            reflections = game_controller.get_agent_reflections()
+            result.update(reflections)
     
     return jsonify(result)
 
+def report_etag(session_id, game_controller):
+    """Return the ETag of a session's final report, which changes whenever the report's inputs do."""
+    version = f"{session_id}:{game_controller.result_version()}"
+    return hashlib.sha1(version.encode('utf-8')).hexdigest()
+
 @app.route('/api/generate-report', methods=['POST'])
 def generate_report():
     """Generate the final report."""
     print("Generate report API called")
     session_id = request.json.get('session_id')
     
-    if session_id not in game_sessions:
+    # Read-only, so the session isn't checked out (or saved back)
+    game_controller = game_sessions.get(session_id)
+    if game_controller is None:
         return jsonify({'success': False, 'message': 'Invalid session ID'})
     
-    game_controller = game_sessions[session_id]
+    # The report only changes with the package or the discussion, so clients can revalidate it
+    etag = None
+    if game_controller.current_phase == 'reflection':
+        etag = report_etag(session_id, game_controller)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+    
     result = game_controller.generate_final_report()
     
+    response = jsonify(result)
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/policy-hints', methods=['POST'])
+def policy_hints():
+    """Suggest the best change to the current policy package for a chosen score."""
+    print("Policy hints API called")
+    session_id = request.json.get('session_id')
+    objective = request.json.get('objective', 'equity')
+    
+    # Read-only, so the session isn't checked out (or saved back)
+    game_controller = game_sessions.get(session_id)
+    if game_controller is None:
+        return jsonify({'success': False, 'message': 'Invalid session ID'})
+    
+    result = game_controller.get_policy_hints(objective)
+    
+    return jsonify(result)
+
+@app.route('/api/group-optimum', methods=['POST'])
+def group_optimum():
+    """Compute the package that best satisfies the whole group within the budget."""
+    print("Group optimum API called")
+    session_id = request.json.get('session_id')
+    weights = request.json.get('weights')
+    include_human = request.json.get('include_human', True)
+    
+    # Read-only, so the session isn't checked out (or saved back)
+    game_controller = game_sessions.get(session_id)
+    if game_controller is None:
+        return jsonify({'success': False, 'message': 'Invalid session ID'})
+    
+    result = game_controller.compute_group_optimum(weights, include_human)
+    
     return jsonify(result)
 
 @app.route('/api/get-policy-areas', methods=['GET'])
@@ -163,11 +296,11 @@ def get_game_state():
     print("Get game state API called")
     session_id = request.json.get('session_id')
     
-    if session_id not in game_sessions:
+    # Read-only, so the session isn't checked out (or saved back)
+    game_controller = game_sessions.get(session_id)
+    if game_controller is None:
         return jsonify({'success': False, 'message': 'Invalid session ID'})
     
-    game_controller = game_sessions[session_id]
-    
     return jsonify({
         'success': True,
         'current_phase': game_controller.current_phase,
@@ -184,9 +317,13 @@ def process_speech():
     session_id = request.json.get('session_id')
     speech_text = request.json.get('speech_text')
     
-    if session_id not in game_sessions:
+    # Only the topic is read, so the session isn't checked out (or saved back)
+    game_controller = game_sessions.get(session_id)
+    if game_controller is None:
         return jsonify({'success': False, 'message': 'Invalid session ID'})
     
+    policy_area = game_controller.current_topic
+    
     # In a real implementation, this would process the speech 
     # and determine the user's intent or argument
     # For now, we'll just return the text
@@ -194,33 +331,94 @@ def process_speech():
     return jsonify({
         'success': True,
         'processed_text': speech_text,
-        'detected_stance': detect_stance_from_text(speech_text)
+        'detected_stance': detect_stance_from_text(speech_text, policy_area)
+    })
+
+@app.route('/api/speech-stream/start', methods=['POST'])
+def start_speech_stream():
+    """Open a stream for recorded speech, sent afterwards as chunks of 16-bit mono PCM."""
+    print("Start speech stream API called")
+    session_id = request.json.get('session_id')
+    try:
+        sample_rate = int(request.json.get('sample_rate', 16000))
+    except (TypeError, ValueError):
+        sample_rate = None
+    
+    if sample_rate is None or not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        return jsonify({'success': False, 'message': f'sample_rate must be an integer from {MIN_SAMPLE_RATE} to {MAX_SAMPLE_RATE}'})
+    
+    if session_id not in game_sessions:
+        return jsonify({'success': False, 'message': 'Invalid session ID'})
+    
+    stream_id = speech_streams.open(sample_rate, session_id)
+    if stream_id is None:
+        return jsonify({'success': False, 'message': 'Too many open speech streams'})
+    
+    return jsonify({'success': True, 'stream_id': stream_id, 'sample_rate': sample_rate})
+
+@app.route('/api/speech-stream/chunk', methods=['POST'])
+def speech_stream_chunk():
+    """
+    Add a chunk of raw PCM (the request body) to a speech stream, given by the stream_id
+    query parameter. Returns the utterances recognized since the previous chunk.
+    """
+    stream = speech_streams.get(request.args.get('stream_id'))
+    if stream is None:
+        return jsonify({'success': False, 'message': 'Invalid stream ID'})
+    
+    result = stream.feed(request.get_data())
+    result['success'] = True
+    return jsonify(result)
+
+@app.route('/api/speech-stream/end', methods=['POST'])
+def end_speech_stream():
+    """End a speech stream and return its transcript, like /api/process-speech."""
+    print("End speech stream API called")
+    stream = speech_streams.close(request.json.get('stream_id'))
+    if stream is None:
+        return jsonify({'success': False, 'message': 'Invalid stream ID'})
+    
+    speech_text = stream.finish()
+    
+    # Weigh the keywords for the topic under discussion (read without checking out the session)
+    game_controller = game_sessions.get(stream.session_id)
+    policy_area = game_controller.current_topic if game_controller else None
+    
+    return jsonify({
+        'success': True,
+        'processed_text': speech_text,
+        'detected_stance': detect_stance_from_text(speech_text, policy_area)
     })
 
-def detect_stance_from_text(text):
+def detect_stance_from_text(text, policy_area=None):
     """
-    Simple function to guess the user's stance from their speech.
-    This would be more sophisticated in a real implementation.
+    Guess which option (1-3) the user's speech argues for.
+    Keywords are weighted by the policy area under discussion when it is given.
     """
-    text = text.lower()
-    
-    # Simple keyword matching
-    option3_keywords = ['comprehensive', 'inclusive', 'equal', 'rights', 'justice', 'transform']
-    option2_keywords = ['moderate', 'balance', 'compromise', 'middle', 'reasonable']
-    option1_keywords = ['minimal', 'cost', 'budget', 'restrict', 'limit', 'control']
-    
-    option3_score = sum(1 for keyword in option3_keywords if keyword in text)
-    option2_score = sum(1 for keyword in option2_keywords if keyword in text)
-    option1_score = sum(1 for keyword in option1_keywords if keyword in text)
-    
-    if option3_score > option2_score and option3_score > option1_score:
-        return 3
-    elif option2_score > option3_score and option2_score > option1_score:
-        return 2
-    elif option1_score > option3_score and option1_score > option2_score:
-        return 1
-    else:
-        return 2  # Default to middle option if unclear
+    return stance_classifier.classify(text, policy_area)
+
+@app.route('/api/classify-stance', methods=['POST'])
+def classify_stance():
+    """
+    Classify a batch of texts, e.g. to re-score stored arguments.
+    Takes texts and optionally policy_area (one area for all texts, or a list with one per text).
+    """
+    print("Classify stance API called")
+    texts = request.json.get('texts')
+    policy_areas = request.json.get('policy_area')
+    
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({'success': False, 'message': 'texts must be a list of strings'})
+    if len(texts) > MAX_STANCE_BATCH:
+        return jsonify({'success': False, 'message': f'At most {MAX_STANCE_BATCH} texts per request'})
+    
+    try:
+        result = stance_classifier.classify_batch(texts, policy_areas)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)})
+    
+    result['success'] = True
+    return jsonify(result)
 
 @app.route('/api/submit-reflection', methods=['POST'])
 def submit_reflection():
@@ -246,14 +444,201 @@ def clear_session():
     print("Clear session API called")
     session_id = request.json.get('session_id')
     
-    if session_id in game_sessions:
-        del game_sessions[session_id]
+    game_sessions.delete(session_id)
     
     return jsonify({
         'success': True,
         'message': 'Session cleared'
     })
 
+@app.route('/api/rooms/create', methods=['POST'])
+def create_room():
+    """Start a new game played by a whole room, with the caller as its host."""
+    print("Create room API called")
+    host_name = request.json.get('name', 'Host')
+    session_id = str(hash(str(os.urandom(16))))
+    
+    game_controller = ChallengeGameController.new_game(4)
+    result = game_controller.start_game()
+    game_sessions[session_id] = game_controller
+    
+    room = rooms.create(session_id, host_name)
+    if room is None:
+        game_sessions.delete(session_id)
+        return jsonify({'success': False, 'message': 'Too many open rooms'})
+    
+    return jsonify({
+        'success': True,
+        'room_id': room.room_id,
+        'player_id': room.host_id,
+        'message': result['message'],
+        'instructions': result['instructions'],
+        'agent_profiles': game_controller.agent_profiles,
+        'events_url': url_for('room_events', room_id=room.room_id, player_id=room.host_id)
+    })
+
+@app.route('/api/rooms/join', methods=['POST'])
+def join_room():
+    """Join a room as a player."""
+    print("Join room API called")
+    room = rooms.get(request.json.get('room_id'))
+    if room is None:
+        return jsonify({'success': False, 'message': 'Invalid room ID'})
+    
+    player_id = room.join(request.json.get('name', 'Player'))
+    return jsonify({
+        'success': True,
+        'room_id': room.room_id,
+        'player_id': player_id,
+        'events_url': url_for('room_events', room_id=room.room_id, player_id=player_id)
+    })
+
+@app.route('/api/rooms/leave', methods=['POST'])
+def leave_room():
+    """Leave a room."""
+    print("Leave room API called")
+    room = rooms.get(request.json.get('room_id'))
+    if room is None:
+        return jsonify({'success': False, 'message': 'Invalid room ID'})
+    
+    return jsonify({'success': room.leave(request.json.get('player_id'))})
+
+@app.route('/api/rooms/action', methods=['POST'])
+def room_action():
+    """
+    Take an action in a room's game: set-preference, start-group-discussion,
+    finalize-topic and start-reflection (host only), or argument (anyone).
+    The result is returned to the caller and the changes are sent to the whole room.
+    """
+    print("Room action API called", request.json)
+    room = rooms.get(request.json.get('room_id'))
+    if room is None:
+        return jsonify({'success': False, 'message': 'Invalid room ID'})
+    
+    with game_sessions.session(room.session_id) as game_controller:
+        if game_controller is None:
+            # The room's game expired
+            rooms.close(room.room_id)
+            return jsonify({'success': False, 'message': 'Invalid room ID'})
+        
+        result = room.perform(game_controller, request.json.get('player_id'), request.json.get('action'), request.json)
+    
+    return jsonify(result)
+
+@app.route('/api/rooms/events', methods=['GET'])
+def room_events():
+    """Stream a room's events to one participant as Server-Sent Events, starting with a snapshot of the game."""
+    print("Room events API called")
+    room = rooms.get(request.args.get('room_id'))
+    player_id = request.args.get('player_id')
+    if room is None or player_id not in room.participants:
+        return Response(format_sse({'event': 'error', 'message': 'Invalid room ID'}), mimetype='text/event-stream')
+    
+    with game_sessions.session(room.session_id) as game_controller:
+        if game_controller is None:
+            rooms.close(room.room_id)
+            return Response(format_sse({'event': 'error', 'message': 'Invalid room ID'}), mimetype='text/event-stream')
+        
+        subscriber = room.broadcaster.subscribe(player_id, room.snapshot(game_controller))
+    
+    def generate():
+        try:
+            for message in subscriber.messages():
+                yield message
+        finally:
+            room.broadcaster.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/rooms/close', methods=['POST'])
+def close_room():
+    """Close a room (host only) and disconnect its participants."""
+    print("Close room API called")
+    room = rooms.get(request.json.get('room_id'))
+    if room is None:
+        return jsonify({'success': False, 'message': 'Invalid room ID'})
+    if request.json.get('player_id') != room.host_id:
+        return jsonify({'success': False, 'message': 'Only the host can do that.'})
+    
+    rooms.close(room.room_id)
+    return jsonify({'success': True})
+
+@app.route('/api/audio/<clip_id>', methods=['GET'])
+def get_audio(clip_id):
+    """Serve a synthesized statement by the audio_id returned with it."""
+    audio_pipeline = get_audio_pipeline()
+    if audio_pipeline is None:
+        return jsonify({'success': False, 'message': 'Speech synthesis is disabled'}), 404
+    
+    # Clip IDs are content hashes, so a clip never changes and clients can keep it
+    if request.if_none_match.contains(clip_id):
+        response = app.response_class(status=304)
+    else:
+        audio = audio_pipeline.get(clip_id)
+        if audio is None:
+            return jsonify({'success': False, 'message': 'Unknown audio clip'}), 404
+        response = Response(audio, mimetype=audio_pipeline.mimetype)
+    response.set_etag(clip_id)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/session-stats', methods=['GET'])
+def session_stats():
+    """Get session store statistics (occupancy, hits, misses, evictions) and classroom room statistics."""
+    print("Session stats API called")
+    
+    return jsonify({
+        'success': True,
+        'stats': game_sessions.stats(),
+        'rooms': rooms.stats()
+    })
+
+@app.route('/api/export-sessions', methods=['GET'])
+def export_sessions_api():
+    """Stream a summary of every session as NDJSON (or gzip-compressed NDJSON), for offline analysis."""
+    print("Export sessions API called", dict(request.args))
+    export_format = request.args.get('format', 'ndjson')
+    
+    try:
+        chunks = export_sessions(
+            game_sessions,
+            export_format,
+            phase=request.args.get('phase') or None,
+            since=parse_time(request.args.get('since')),
+            until=parse_time(request.args.get('until'))
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)})
+    
+    filename = 'sessions.ndjson.gz' if export_format == 'gzip' else 'sessions.ndjson'
+    return Response(chunks, mimetype='application/gzip' if export_format == 'gzip' else 'application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename={filename}',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/backend-stats', methods=['GET'])
+def get_backend_stats():
+    """Get server startup time, LLM backend load costs, model pool usage, response cache hit rates, audio pipeline counters and stance classifier timing."""
+    print("Backend stats API called")
+    
+    return jsonify({
+        'success': True,
+        'startup_seconds': startup_seconds,
+        'llm_backends': backend_stats(),
+        'model_pools': model_pool_stats(),
+        'response_cache': get_response_cache().stats(),
+        'audio_pipeline': get_audio_pipeline().stats() if get_audio_pipeline() else None,
+        'stance_classifier': stance_classifier.stats()
+    })
+
+# Time spent importing and setting up the app, including model pool warmup
+startup_seconds = time.perf_counter() - _startup_started
+print(f"CHALLENGE Game app initialized in {startup_seconds:.3f}s")
+
 if __name__ == '__main__':
     print("Starting CHALLENGE Game server...")
     app.run(debug=True)
\ No newline at end of file
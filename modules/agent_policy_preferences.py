@@ -1,99 +1,159 @@
 import random
+import numpy as np
+from modules.agent_profiles import EDUCATION_LEVELS, OCCUPATIONS, POLITICAL_STANCES
+from modules.budget_calculator import POLICY_AREAS
 
-def generate_policy_preferences(agent_profile):
+# Base tendency (preferred option on a 1-3 scale) by political stance
+STANCE_TENDENCIES = {
+    "Conservative": 1.3,  # Conservative agents tend to prefer option 1 (more restrictive)
+    "Moderate": 2.0,  # Moderate agents tend to prefer option 2 (middle ground)
+    "Liberal": 2.3,  # Liberal agents tend to prefer options 2-3 (more inclusive)
+    "Socialist": 2.7  # Socialist agents tend to prefer option 3 (most inclusive)
+}
+DEFAULT_TENDENCY = 2.0
+
+# Adjustment of the tendency by occupation
+OCCUPATION_ADJUSTMENTS = {
+    # These occupations may favor more inclusive policies
+    "NGO Worker": 0.3,
+    "Teacher": 0.3,
+    "Social Worker": 0.3,
+    # These occupations may be more balanced
+    "Civil Servant": 0.1,
+    "University Professor": 0.1,
+    # These occupations may favor more restrictive policies
+    "Business Owner": -0.2,
+    "Corporate Executive": -0.2
+}
+
+# Policy areas some occupations care about
+OCCUPATION_INTERESTS = {
+    "NGO Worker": "Psychosocial Support",  # NGO workers care about psychosocial support
+    "Civil Servant": "Certification/Accreditation",  # Civil servants care about certification
+    "University Professor": "Curriculum Adaptation"  # Professors care about curriculum
+}
+
+SPECIAL_INTEREST_BONUS = 0.5
+PREFERENCE_NOISE = 0.5
+
+
+def has_advanced_degree(education):
+    """Educated agents (PhD or Master's) have one special interest area."""
+    return education.startswith("PhD") or education.startswith("Master")
+
+
+def preference_option(preference_value):
+    """Convert a preference value to option 1, 2, or 3."""
+    if preference_value < 1.5:
+        return 1
+    elif preference_value < 2.5:
+        return 2
+    else:
+        return 3
+
+
+def generate_policy_preferences(agent_profile, rng=None):
     """
     Generate policy preferences for an agent based on their profile.
     Returns a dictionary with the agent's preferred option (1-3) for each policy area.
+    Random draws come from rng (a random.Random instance) if given, else the random module.
     """
+    rng = rng or random
     preferences = {}
     
     # Define tendency based on political stance
-    stance = agent_profile["political_stance"]
-    if stance == "Conservative":
-        # Conservative agents tend to prefer option 1 (more restrictive)
-        base_tendency = 1.3
-    elif stance == "Moderate":
-        # Moderate agents tend to prefer option 2 (middle ground)
-        base_tendency = 2.0
-    elif stance == "Liberal":
-        # Liberal agents tend to prefer options 2-3 (more inclusive)
-        base_tendency = 2.3
-    elif stance == "Socialist":
-        # Socialist agents tend to prefer option 3 (most inclusive)
-        base_tendency = 2.7
-    else:
-        base_tendency = 2.0
+    base_tendency = STANCE_TENDENCIES.get(agent_profile["political_stance"], DEFAULT_TENDENCY)
     
     # Adjust tendency based on occupation
     occupation = agent_profile["occupation"]
-    if occupation in ["NGO Worker", "Teacher", "Social Worker"]:
-        # These occupations may favor more inclusive policies
-        base_tendency += 0.3
-    elif occupation in ["Civil Servant", "University Professor"]:
-        # These occupations may be more balanced
-        base_tendency += 0.1
-    elif occupation in ["Business Owner", "Corporate Executive"]:
-        # These occupations may favor more restrictive policies
-        base_tendency -= 0.2
-        
-    # Generate preferences for each policy area
-    policy_areas = [
-        "Access to Education", 
-        "Language Instruction", 
-        "Teacher Training", 
-        "Curriculum Adaptation",
-        "Psychosocial Support", 
-        "Financial Support", 
-        "Certification/Accreditation"
-    ]
+    if occupation in OCCUPATION_ADJUSTMENTS:
+        base_tendency += OCCUPATION_ADJUSTMENTS[occupation]
     
     # Create some special interest areas based on agent profile
-    if agent_profile["education"].startswith("PhD") or agent_profile["education"].startswith("Master"):
-        special_interests = [random.choice(policy_areas)]  # Educated agents have one special interest
+    if has_advanced_degree(agent_profile["education"]):
+        special_interests = [rng.choice(POLICY_AREAS)]  # Educated agents have one special interest
     else:
         special_interests = []
     
-    # NGO workers care about psychosocial support
-    if occupation == "NGO Worker":
-        special_interests.append("Psychosocial Support")
-    
-    # Civil servants care about certification
-    if occupation == "Civil Servant":
-        special_interests.append("Certification/Accreditation")
-    
-    # Professors care about curriculum
-    if occupation == "University Professor":
-        special_interests.append("Curriculum Adaptation")
+    if occupation in OCCUPATION_INTERESTS:
+        special_interests.append(OCCUPATION_INTERESTS[occupation])
     
     # Add some randomization to make agents less predictable
-    for policy in policy_areas:
+    for policy in POLICY_AREAS:
         # Base calculation
         preference_value = base_tendency
         
         # Adjust for special interests (higher option number = more progressive)
         if policy in special_interests:
-            preference_value += 0.5
-            
+            preference_value += SPECIAL_INTEREST_BONUS
+        
         # Add some randomness
-        preference_value += random.uniform(-0.5, 0.5)
+        preference_value += rng.uniform(-PREFERENCE_NOISE, PREFERENCE_NOISE)
         
-        # Convert to option 1, 2, or 3
-        if preference_value < 1.5:
-            preferences[policy] = 1
-        elif preference_value < 2.5:
-            preferences[policy] = 2
-        else:
-            preferences[policy] = 3
+        preferences[policy] = preference_option(preference_value)
     
     return preferences
 
-def generate_all_agent_preferences(agent_profiles):
+def generate_all_agent_preferences(agent_profiles, rng=None):
     """Generate preferences for all agents."""
     all_preferences = {}
     for agent in agent_profiles:
-        all_preferences[agent["id"]] = generate_policy_preferences(agent)
+        all_preferences[agent["id"]] = generate_policy_preferences(agent, rng)
     return all_preferences
 
+# Per-index lookup tables for generate_preference_matrix, built from the rules above
+_STANCE_TENDENCY_TABLE = np.array([STANCE_TENDENCIES.get(stance, DEFAULT_TENDENCY) for stance in POLITICAL_STANCES])
+_OCCUPATION_ADJUSTMENT_TABLE = np.array([OCCUPATION_ADJUSTMENTS.get(occupation, 0.0) for occupation in OCCUPATIONS])
+_OCCUPATION_INTEREST_TABLE = np.array([
+    POLICY_AREAS.index(OCCUPATION_INTERESTS[occupation]) if occupation in OCCUPATION_INTERESTS else -1
+    for occupation in OCCUPATIONS
+])
+_ADVANCED_DEGREE_TABLE = np.array([has_advanced_degree(education) for education in EDUCATION_LEVELS])
+
+def generate_preference_matrix(cohort, rng=None):
+    """
+    Generate the preferences of every agent in an AgentCohort at once, with the same
+    rules as generate_policy_preferences().
+
+    Parameters:
+    - cohort: AgentCohort from generate_agent_cohorts()
+    - rng: numpy.random.Generator or seed (default: a fresh generator)
+
+    Returns:
+    - int8 array of shape (num_groups, agents_per_group, len(POLICY_AREAS)) holding
+      each agent's preferred option (1-3) per area, in POLICY_AREAS order
+    """
+    rng = np.random.default_rng(rng)
+    shape = cohort.ages.shape
+    num_areas = len(POLICY_AREAS)
+
+    base_tendency = _STANCE_TENDENCY_TABLE[cohort.political_stances] + _OCCUPATION_ADJUSTMENT_TABLE[cohort.occupations]
+
+    # Special interests: one random area for educated agents, plus the occupation's area
+    special_interests = np.zeros(shape + (num_areas,), dtype=bool)
+    educated = _ADVANCED_DEGREE_TABLE[cohort.educations]
+    random_areas = rng.integers(0, num_areas, size=shape)
+    special_interests |= educated[..., None] & (random_areas[..., None] == np.arange(num_areas))
+    special_interests |= _OCCUPATION_INTEREST_TABLE[cohort.occupations][..., None] == np.arange(num_areas)
+
+    # Same order of additions as the per-agent version, so values land on the same side of the thresholds
+    preference_values = np.broadcast_to(base_tendency[..., None], special_interests.shape).copy()
+    preference_values[special_interests] += SPECIAL_INTEREST_BONUS
+    preference_values += rng.uniform(-PREFERENCE_NOISE, PREFERENCE_NOISE, size=special_interests.shape)
+
+    return (1 + (preference_values >= 1.5) + (preference_values >= 2.5)).astype(np.int8)
+
+def preference_dicts(preference_matrix, group):
+    """Return one group's preferences from generate_preference_matrix() as {agent_id: {area: option}}."""
+    return {
+        f"agent_{i+1}": dict(zip(POLICY_AREAS, options))
+        for i, options in enumerate(preference_matrix[group].tolist())
+    }
+
 # Example usage:
 # all_agent_preferences = generate_all_agent_preferences(agent_profiles)
-# print(all_agent_preferences)
\ No newline at end of file
+# print(all_agent_preferences)
+#
+# cohort = generate_agent_cohorts(10000, rng=42)
+# matrix = generate_preference_matrix(cohort, rng=43)
+# print(preference_dicts(matrix, 0))
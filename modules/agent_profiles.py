@@ -1,144 +1,287 @@
 import random
+import numpy as np
 
-def create_random_agent_profiles(num_agents=4):
+# Possible values for each profile attribute
+FIRST_NAMES = [
+    "Alex", "Jordan", "Morgan", "Taylor", "Casey", "Quinn", "Riley", "Avery",
+    "Cameron", "Hayden", "Reese", "Finley", "Dakota", "Robin", "Harper", "Emerson"
+]
+
+MIN_AGE = 25
+MAX_AGE = 70
+AGES = list(range(MIN_AGE, MAX_AGE + 1))  # Ages 25-70
+
+EDUCATION_LEVELS = [
+    "High School Diploma",
+    "Technical Certificate",
+    "Associate's Degree",
+    "Bachelor's Degree in Humanities",
+    "Bachelor's Degree in Social Sciences",
+    "Bachelor's Degree in Business",
+    "Bachelor's Degree in STEM",
+    "Master's Degree in Education",
+    "Master's Degree in Public Policy",
+    "Master's Degree in Social Work",
+    "Master's Degree in Business Administration",
+    "PhD in Economics",
+    "PhD in Political Science",
+    "PhD in Sociology",
+    "PhD in Education"
+]
+
+# Number of EDUCATION_LEVELS (from the start of the list) open to agents under 30 and under 40
+EDUCATION_LIMIT_UNDER_30 = 7  # Limit younger agents to lower education levels
+EDUCATION_LIMIT_UNDER_40 = 12  # Mid-age can have up to masters
+
+OCCUPATIONS = [
+    "Teacher",
+    "School Administrator",
+    "University Professor",
+    "Civil Servant",
+    "NGO Worker",
+    "Social Worker",
+    "Lawyer",
+    "Small Business Owner",
+    "Corporate Executive",
+    "Healthcare Professional",
+    "Community Organizer",
+    "Journalist",
+    "Religious Leader",
+    "Retired Military Officer",
+    "Local Government Official"
+]
+
+# Occupations open to agents with a PhD or a Master's degree
+PHD_OCCUPATIONS = ["University Professor", "NGO Worker", "Corporate Executive", "Local Government Official"]
+MASTERS_OCCUPATIONS = ["School Administrator", "University Professor", "Civil Servant", "NGO Worker", "Corporate Executive", "Healthcare Professional", "Lawyer"]
+
+SOCIOECONOMIC_STATUSES = [
+    "Working class",
+    "Lower middle class",
+    "Middle class",
+    "Upper middle class",
+    "Affluent"
+]
+
+POLITICAL_STANCES = [
+    "Conservative",
+    "Moderate conservative",
+    "Moderate",
+    "Moderate liberal",
+    "Liberal",
+    "Progressive",
+    "Socialist",
+    "Libertarian",
+    "Centrist",
+    "Pragmatist"
+]
+
+# Every group should have at least one agent from each of these categories,
+# and the stance given to an agent to fill a missing one
+POLITICAL_CATEGORIES = ["Conservative", "Moderate", "Liberal/Progressive"]
+CATEGORY_FILL_STANCES = {
+    "Conservative": "Conservative",
+    "Moderate": "Moderate",
+    "Liberal/Progressive": "Liberal"
+}
+
+
+def occupations_for_education(education):
+    """Return the occupations an agent with the given education can have."""
+    if "PhD" in education:
+        return PHD_OCCUPATIONS
+    elif "Master's" in education:
+        return MASTERS_OCCUPATIONS
+    return OCCUPATIONS
+
+
+def political_category(stance):
+    """Return the major political category of a stance, or None if it has none."""
+    if "Conservative" in stance:
+        return "Conservative"
+    elif "Moderate" in stance:
+        return "Moderate"
+    elif "Liberal" in stance or "Progressive" in stance or "Socialist" in stance:
+        return "Liberal/Progressive"
+    return None
+
+
+def create_random_agent_profiles(num_agents=4, rng=None):
     """
     Generate random profiles for AI agents with diverse backgrounds.
     
     Parameters:
     - num_agents: Number of agents to create (default: 4)
+    - rng: random.Random instance to draw from (default: the random module), so a
+      seeded game can be regenerated exactly
     
     Returns:
     - List of agent profile dictionaries
     """
-    # Lists of possible values for each attribute
-    first_names = [
-        "Alex", "Jordan", "Morgan", "Taylor", "Casey", "Quinn", "Riley", "Avery",
-        "Cameron", "Hayden", "Reese", "Finley", "Dakota", "Robin", "Harper", "Emerson"
-    ]
-    
-    ages = list(range(25, 71))  # Ages 25-70
-    
-    education_levels = [
-        "High School Diploma",
-        "Technical Certificate",
-        "Associate's Degree",
-        "Bachelor's Degree in Humanities",
-        "Bachelor's Degree in Social Sciences",
-        "Bachelor's Degree in Business",
-        "Bachelor's Degree in STEM",
-        "Master's Degree in Education",
-        "Master's Degree in Public Policy",
-        "Master's Degree in Social Work",
-        "Master's Degree in Business Administration",
-        "PhD in Economics",
-        "PhD in Political Science",
-        "PhD in Sociology",
-        "PhD in Education"
-    ]
-    
-    occupations = [
-        "Teacher",
-        "School Administrator", 
-        "University Professor",
-        "Civil Servant",
-        "NGO Worker",
-        "Social Worker",
-        "Lawyer",
-        "Small Business Owner",
-        "Corporate Executive",
-        "Healthcare Professional",
-        "Community Organizer",
-        "Journalist",
-        "Religious Leader",
-        "Retired Military Officer",
-        "Local Government Official"
-    ]
-    
-    socioeconomic_statuses = [
-        "Working class",
-        "Lower middle class",
-        "Middle class",
-        "Upper middle class",
-        "Affluent"
-    ]
-    
-    political_stances = [
-        "Conservative",
-        "Moderate conservative",
-        "Moderate",
-        "Moderate liberal",
-        "Liberal",
-        "Progressive",
-        "Socialist",
-        "Libertarian",
-        "Centrist",
-        "Pragmatist"
-    ]
+    rng = rng or random
     
     # Ensure no duplicate names
-    chosen_names = random.sample(first_names, num_agents)
+    chosen_names = rng.sample(FIRST_NAMES, num_agents)
     
     # Create a list to hold agent profiles
     agent_profiles = []
     
     for i in range(num_agents):
         # Make age and education somewhat correlated
-        age = random.choice(ages)
+        age = rng.choice(AGES)
         if age < 30:
-            education_possibilities = education_levels[:7]  # Limit younger agents to lower education levels
+            education_possibilities = EDUCATION_LEVELS[:EDUCATION_LIMIT_UNDER_30]
         elif age < 40:
-            education_possibilities = education_levels[:12]  # Mid-age can have up to masters
+            education_possibilities = EDUCATION_LEVELS[:EDUCATION_LIMIT_UNDER_40]
         else:
-            education_possibilities = education_levels  # Older can have any education level
+            education_possibilities = EDUCATION_LEVELS  # Older can have any education level
         
         # Make occupation somewhat correlated with education
-        education = random.choice(education_possibilities)
-        if "PhD" in education:
-            occupation_possibilities = ["University Professor", "NGO Worker", "Corporate Executive", "Local Government Official"]
-        elif "Master's" in education:
-            occupation_possibilities = ["School Administrator", "University Professor", "Civil Servant", "NGO Worker", "Corporate Executive", "Healthcare Professional", "Lawyer"]
-        else:
-            occupation_possibilities = occupations
-            
+        education = rng.choice(education_possibilities)
+        occupation_possibilities = occupations_for_education(education)
+        
         # Create agent profile
         agent_profile = {
             "id": f"agent_{i+1}",
             "name": chosen_names[i],
             "age": age,
             "education": education,
-            "occupation": random.choice(occupation_possibilities),
-            "socioeconomic_status": random.choice(socioeconomic_statuses),
-            "political_stance": random.choice(political_stances)
+            "occupation": rng.choice(occupation_possibilities),
+            "socioeconomic_status": rng.choice(SOCIOECONOMIC_STATUSES),
+            "political_stance": rng.choice(POLITICAL_STANCES)
         }
         
         agent_profiles.append(agent_profile)
     
     # Ensure diversity in political stances
     # Make sure we have at least one agent from each major political category
-    political_categories = ["Conservative", "Moderate", "Liberal/Progressive"]
-    has_category = {category: False for category in political_categories}
+    has_category = {category: False for category in POLITICAL_CATEGORIES}
     
     for agent in agent_profiles:
-        stance = agent["political_stance"]
-        if "Conservative" in stance:
-            has_category["Conservative"] = True
-        elif "Moderate" in stance:
-            has_category["Moderate"] = True
-        elif "Liberal" in stance or "Progressive" in stance or "Socialist" in stance:
-            has_category["Liberal/Progressive"] = True
+        category = political_category(agent["political_stance"])
+        if category:
+            has_category[category] = True
     
     # If any category is missing, adjust an agent to fill it
     for i, category in enumerate([cat for cat, has in has_category.items() if not has]):
         if i < len(agent_profiles):
-            if category == "Conservative":
-                agent_profiles[i]["political_stance"] = "Conservative"
-            elif category == "Moderate":
-                agent_profiles[i]["political_stance"] = "Moderate"
-            elif category == "Liberal/Progressive":
-                agent_profiles[i]["political_stance"] = "Liberal"
+            agent_profiles[i]["political_stance"] = CATEGORY_FILL_STANCES[category]
     
     return agent_profiles
 
+
+class AgentCohort:
+    """
+    Profiles of many groups of agents, stored as columns.
+
+    Each attribute is an integer array of shape (num_groups, agents_per_group):
+    ages hold the age itself, the other columns hold indices into FIRST_NAMES,
+    EDUCATION_LEVELS, OCCUPATIONS, SOCIOECONOMIC_STATUSES and POLITICAL_STANCES.
+    """
+
+    def __init__(self, names, ages, educations, occupations, socioeconomic_statuses, political_stances):
+        self.names = names
+        self.ages = ages
+        self.educations = educations
+        self.occupations = occupations
+        self.socioeconomic_statuses = socioeconomic_statuses
+        self.political_stances = political_stances
+
+    @property
+    def agents_per_group(self):
+        return self.ages.shape[1]
+
+    def __len__(self):
+        return self.ages.shape[0]
+
+    def profiles(self, group):
+        """Return one group as a list of profile dictionaries, like create_random_agent_profiles()."""
+        return [
+            {
+                "id": f"agent_{i+1}",
+                "name": FIRST_NAMES[name],
+                "age": int(age),
+                "education": EDUCATION_LEVELS[education],
+                "occupation": OCCUPATIONS[occupation],
+                "socioeconomic_status": SOCIOECONOMIC_STATUSES[status],
+                "political_stance": POLITICAL_STANCES[stance]
+            }
+            for i, (name, age, education, occupation, status, stance) in enumerate(zip(
+                self.names[group].tolist(), self.ages[group].tolist(), self.educations[group].tolist(),
+                self.occupations[group].tolist(), self.socioeconomic_statuses[group].tolist(),
+                self.political_stances[group].tolist()
+            ))
+        ]
+
+
+def _occupation_table(occupations):
+    """Return the OCCUPATIONS indices of a list of occupations as an array."""
+    return np.array([OCCUPATIONS.index(occupation) for occupation in occupations])
+
+
+def generate_agent_cohorts(num_groups, agents_per_group=4, rng=None):
+    """
+    Generate profiles for many groups of agents at once.
+
+    Follows the same rules as create_random_agent_profiles(): unique names within a
+    group, education limited by age, occupation limited by education, and at least
+    one agent from each political category in every group.
+
+    Parameters:
+    - num_groups: Number of groups (games) to generate
+    - agents_per_group: Number of agents in each group (at most len(FIRST_NAMES))
+    - rng: numpy.random.Generator or seed (default: a fresh generator)
+
+    Returns:
+    - AgentCohort
+    """
+    if agents_per_group > len(FIRST_NAMES):
+        raise ValueError(f"At most {len(FIRST_NAMES)} agents per group have unique names")
+    rng = np.random.default_rng(rng)
+    shape = (num_groups, agents_per_group)
+
+    # Ensure no duplicate names: the first columns of a random permutation per group
+    names = rng.random((num_groups, len(FIRST_NAMES))).argsort(axis=1)[:, :agents_per_group]
+
+    # Make age and education somewhat correlated
+    ages = rng.integers(MIN_AGE, MAX_AGE + 1, size=shape)
+    education_limits = np.where(ages < 30, EDUCATION_LIMIT_UNDER_30,
+                                np.where(ages < 40, EDUCATION_LIMIT_UNDER_40, len(EDUCATION_LEVELS)))
+    educations = (rng.random(shape) * education_limits).astype(np.int64)
+
+    # Make occupation somewhat correlated with education
+    education_kinds = np.array([
+        2 if "PhD" in education else 1 if "Master's" in education else 0
+        for education in EDUCATION_LEVELS
+    ])[educations]
+    draws = rng.random(shape)
+    occupations = np.select(
+        [education_kinds == 2, education_kinds == 1],
+        [
+            _occupation_table(PHD_OCCUPATIONS)[(draws * len(PHD_OCCUPATIONS)).astype(np.int64)],
+            _occupation_table(MASTERS_OCCUPATIONS)[(draws * len(MASTERS_OCCUPATIONS)).astype(np.int64)]
+        ],
+        (draws * len(OCCUPATIONS)).astype(np.int64)
+    )
+
+    socioeconomic_statuses = rng.integers(0, len(SOCIOECONOMIC_STATUSES), size=shape)
+    political_stances = rng.integers(0, len(POLITICAL_STANCES), size=shape)
+
+    # Ensure diversity in political stances: the i-th missing category of a group
+    # is filled by that group's i-th agent
+    stance_categories = np.array([
+        POLITICAL_CATEGORIES.index(political_category(stance)) if political_category(stance) else -1
+        for stance in POLITICAL_STANCES
+    ])[political_stances]
+    missing = np.stack([~(stance_categories == c).any(axis=1) for c in range(len(POLITICAL_CATEGORIES))], axis=1)
+    fill_positions = np.cumsum(missing, axis=1) - 1
+    for c, category in enumerate(POLITICAL_CATEGORIES):
+        groups = np.flatnonzero(missing[:, c] & (fill_positions[:, c] < agents_per_group))
+        political_stances[groups, fill_positions[groups, c]] = POLITICAL_STANCES.index(CATEGORY_FILL_STANCES[category])
+
+    return AgentCohort(names, ages, educations, occupations, socioeconomic_statuses, political_stances)
+
 # Example usage:
 # profiles = create_random_agent_profiles(4)
-# print(profiles)
\ No newline at end of file
+# cohort = generate_agent_cohorts(10000, agents_per_group=4, rng=42)
+# print(cohort.profiles(0))
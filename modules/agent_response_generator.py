@@ -1,15 +1,99 @@
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
-import torch
-import random
+from modules.llm_backends import get_backend
+from modules.model_pool import ModelPoolTimeout, get_model_pool
+from modules.response_cache import ResponseCache, get_response_cache
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
+import re
+import threading
+import time
 
-# Note: In a real implementation, you would use your preferred LLM API
-# This is a simplified mockup using GPT-2 locally
+# Note: The LLM backend is selected with CHALLENGE_LLM_BACKEND (mock, transformer, http).
+# Backends load their dependencies on first use, see modules/llm_backends.py
+
+# Shared pool for running agent turns concurrently across all sessions. Its threads mostly
+# wait for a model instance, so it is sized for the agents of several concurrent turns.
+agent_turn_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("CHALLENGE_AGENT_WORKERS", 16)),
+                                         thread_name_prefix="agent-turn")
 
 class AgentResponseGenerator:
-    def __init__(self):
-        # In a real implementation, you would initialize your LLM client here
-        # This is just a placeholder
-        pass
+    def __init__(self, backend_name=None, pool=None, cache=None, deadline_seconds=None):
+        """
+        Initialize the generator.
+        Model instances are borrowed from a process-wide pool, so creating a generator is cheap.
+        Completions are memoized in the process-wide response cache unless another cache is given.
+        Debate turns that take longer than deadline_seconds (default: CHALLENGE_AGENT_DEADLINE
+        or 5 seconds) fall back to a canned response.
+        """
+        self.backend_name = backend_name
+        self._pool = pool
+        self.cache = cache if cache is not None else get_response_cache()
+        if deadline_seconds is None:
+            deadline_seconds = float(os.environ.get("CHALLENGE_AGENT_DEADLINE", 5))
+        self.deadline_seconds = deadline_seconds
+    
+    @property
+    def pool(self):
+        """The model pool used for generation, created on first access."""
+        if self._pool is None:
+            self._pool = get_model_pool(self.backend_name)
+        return self._pool
+    
+    def _cache_key(self, prompt, kind):
+        """Return the response cache key for a prompt, or None if it shouldn't be cached."""
+        if not self.cache.enabled:
+            return None
+        profile = self.pool.backend_profile()
+        if not profile["cacheable"]:
+            return None
+        return ResponseCache.make_key(prompt, kind, self.pool.backend_name, profile["sampling_params"])
+    
+    @staticmethod
+    def _time_left(deadline):
+        """Seconds until a time.monotonic() deadline (None for no deadline); raises ModelPoolTimeout once it has passed."""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ModelPoolTimeout("Deadline passed before generation started")
+        return remaining
+    
+    def _generate(self, prompt, kind, deadline=None):
+        """
+        Generate a completion, using the response cache or a backend instance checked out from the pool.
+        With a deadline (a time.monotonic() value), gives up with ModelPoolTimeout if no instance
+        is free by then, so late work never queues up behind the model.
+        """
+        key = self._cache_key(prompt, kind)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        with self.pool.checkout(timeout=self._time_left(deadline)) as backend:
+            response = backend.generate(prompt, kind=kind)
+        
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+    
+    def _generate_batch(self, prompts, kind, deadline=None):
+        """
+        Generate completions for several prompts, batching only the ones that aren't cached.
+        deadline works as for _generate.
+        """
+        keys = [self._cache_key(prompt, kind) for prompt in prompts]
+        responses = [self.cache.get(key) if key is not None else None for key in keys]
+        
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+            with self.pool.checkout(timeout=self._time_left(deadline)) as backend:
+                generated = backend.generate_batch([prompts[i] for i in missing], kind=kind)
+            for i, response in zip(missing, generated):
+                responses[i] = response
+                if keys[i] is not None:
+                    self.cache.put(keys[i], response)
+        
+        return responses
         
     def generate_response(self, agent_profile, policy_area, agent_preference, current_discussion, budget_remaining):
         """
@@ -19,11 +103,46 @@ class AgentResponseGenerator:
         # Construct a prompt for the LLM
         prompt = self._create_prompt(agent_profile, policy_area, agent_preference, current_discussion, budget_remaining)
         
-        # In a real implementation, you would call your LLM API here
-        response = self._mock_llm_call(prompt)
+        response = self._generate(prompt, "statement")
         
         return response
     
+    def generate_responses_batch(self, requests):
+        """
+        Generate responses for several agents at once.
+        
+        Parameters:
+        - requests: List of (agent_profile, policy_area, agent_preference, current_discussion, budget_remaining) tuples
+        
+        Returns:
+        - List of responses, in the same order as the requests
+        """
+        prompts = [self._create_prompt(*request) for request in requests]
+        return self._generate_batch(prompts, "statement")
+    
+    def stream_response(self, agent_profile, policy_area, agent_preference, current_discussion, budget_remaining):
+        """
+        Generate the same response as generate_response, yielding it piece by piece
+        as soon as each piece is available.
+        """
+        prompt = self._create_prompt(agent_profile, policy_area, agent_preference, current_discussion, budget_remaining)
+        
+        key = self._cache_key(prompt, "statement")
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            for token in re.findall(r"\S+\s*", cached):
+                yield token
+            return
+        
+        tokens = []
+        with self.pool.checkout() as backend:
+            for token in backend.stream(prompt, kind="statement"):
+                tokens.append(token)
+                yield token
+        
+        if key is not None:
+            self.cache.put(key, "".join(tokens))
+    
     def _create_prompt(self, agent_profile, policy_area, agent_preference, current_discussion, budget_remaining):
         """Create a prompt for the LLM to generate a response."""
         
@@ -57,37 +176,82 @@ class AgentResponseGenerator:
     def _mock_llm_call(self, prompt):
         """
         Mock LLM response generation.
-        In a real implementation, this would call an LLM API.
-        """
-        # These are placeholder responses - in a real implementation, 
-        # you would call a language model API
-        responses = [
-            "I understand we have budget constraints, but I believe investing in Option 3 for this policy area is essential. The long-term benefits outweigh the costs, and we can compensate by selecting Option 1 in other less critical areas.",
-            
-            "While I'd prefer Option 3, I recognize our budget limitations. Option 2 offers a reasonable compromise that addresses core needs while remaining fiscally responsible.",
-            
-            "From my experience, Option 1 is perfectly adequate here. We need to be practical about our resources and prioritize other areas that need more funding.",
-            
-            "Having worked directly with refugees, I can tell you that anything less than Option 3 for this policy would be severely inadequate. We must find the budget elsewhere.",
-            
-            "Let's be realistic about what we can afford. Option 2 gives us most of the benefits without breaking the bank. We need to be strategic with our limited resources."
-        ]
-        
-        return random.choice(responses)
+        Returns one of the canned responses of the mock backend.
+        """
+        return get_backend("mock").generate(prompt, kind="statement")
     
-    def generate_debate_argument(self, agent_profile, topic, stance, other_agent_stance):
+    def generate_debate_argument(self, agent_profile, topic, stance, other_agent_stance, current_discussion=""):
         """
         Generate a debate argument for an agent responding to another agent.
         """
         # Construct a prompt for the LLM
-        prompt = self._create_debate_prompt(agent_profile, topic, stance, other_agent_stance)
+        prompt = self._create_debate_prompt(agent_profile, topic, stance, other_agent_stance, current_discussion)
         
-        # In a real implementation, you would call your LLM API here
-        response = self._mock_llm_call_debate(prompt)
+        response = self._generate(prompt, "debate")
         
         return response
     
-    def _create_debate_prompt(self, agent_profile, topic, stance, other_agent_stance):
+    def generate_debate_arguments_batch(self, requests):
+        """
+        Generate debate arguments for several agents at once.
+        
+        Parameters:
+        - requests: List of (agent_profile, topic, stance, other_agent_stance) tuples,
+          optionally with the current discussion as a fifth element
+        
+        Returns:
+        - List of arguments, in the same order as the requests
+        """
+        prompts = [self._create_debate_prompt(*request) for request in requests]
+        return self._generate_batch(prompts, "debate")
+    
+    def generate_debate_arguments_with_deadline(self, requests, deadline_seconds=None):
+        """
+        Generate debate arguments for several agents concurrently, giving up on any
+        agent that misses the deadline.
+        
+        Backends that batch run all prompts as one task; others run one task per agent.
+        Agents whose task misses the deadline or fails get a canned response instead.
+        Late tasks are dropped: tasks not started yet are cancelled, and tasks still
+        waiting for a model instance give up at the deadline, so at most one generation
+        per pooled instance outlives the turn and later turns don't inherit a backlog.
+        
+        Parameters:
+        - requests: List of (agent_profile, topic, stance, other_agent_stance) tuples,
+          optionally with the current discussion as a fifth element
+        - deadline_seconds: Time limit for the whole turn (default: self.deadline_seconds)
+        
+        Returns:
+        - List of (argument, used_fallback) tuples, in the same order as the requests
+        """
+        if deadline_seconds is None:
+            deadline_seconds = self.deadline_seconds
+        deadline = time.monotonic() + deadline_seconds
+        prompts = [self._create_debate_prompt(*request) for request in requests]
+        
+        batched = self.pool.backend_profile()["supports_batching"]
+        if batched:
+            batch = agent_turn_executor.submit(self._generate_batch, prompts, "debate", deadline)
+            futures = [batch] * len(prompts)
+        else:
+            futures = [agent_turn_executor.submit(self._generate, prompt, "debate", deadline) for prompt in prompts]
+        
+        wait(set(futures), timeout=deadline_seconds)
+        # A generation already running finishes in the background (its result still lands
+        # in the response cache); anything not started yet is dropped
+        for future in futures:
+            future.cancel()
+        
+        arguments = []
+        for i, (prompt, future) in enumerate(zip(prompts, futures)):
+            if future.done() and not future.cancelled() and future.exception() is None:
+                result = future.result()
+                arguments.append((result[i] if batched else result, False))
+            else:
+                arguments.append((self._mock_llm_call_debate(prompt), True))
+        return arguments
+    
+    def _create_debate_prompt(self, agent_profile, topic, stance, other_agent_stance, current_discussion=""):
         """Create a prompt for generating a debate response."""
         
         profile_info = (
@@ -106,23 +270,25 @@ class AgentResponseGenerator:
             f"Your response should be natural dialogue of 2-3 sentences."
         )
         
+        # What was said before, if any (see modules/discussion_context.py)
+        if current_discussion:
+            debate_context = f"{debate_context}\n\nCurrent discussion: {current_discussion}"
+        
         prompt = f"{profile_info}\n\n{debate_context}\n\n{instruction}"
         return prompt
     
     def _mock_llm_call_debate(self, prompt):
         """Mock debate response generation."""
-        # These are placeholder responses - in a real implementation, 
-        # you would call a language model API
-        responses = [
-            "I appreciate your perspective, but I believe you're overlooking the long-term consequences. My experience has shown that more investment now prevents greater costs later.",
-            
-            "While I understand your concern about costs, we need to consider the human impact as well. These are real people whose futures depend on our decisions today.",
-            
-            "I respect your idealism, but we must be practical about implementation. The best policy is one we can actually afford to sustain over time.",
-            
-            "Having worked directly in this field, I can tell you that your approach won't address the underlying issues. We need a more comprehensive solution.",
-            
-            "Perhaps in an ideal world with unlimited resources, but we're making decisions in the real world with real constraints. We need to be strategic."
-        ]
-        
-        return random.choice(responses)
\ No newline at end of file
+        return get_backend("mock").generate(prompt, kind="debate")
+
+
+_shared_generator = None
+_shared_generator_lock = threading.Lock()
+
+def get_shared_generator():
+    """Return the process-wide response generator shared by all game sessions."""
+    global _shared_generator
+    with _shared_generator_lock:
+        if _shared_generator is None:
+            _shared_generator = AgentResponseGenerator()
+        return _shared_generator
@@ -0,0 +1,198 @@
+import hashlib
+import io
+import os
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from modules.speech_synthesis import AudioCache, get_audio_cache, synthesize_gtts, voice_for
+
+TONE_SAMPLE_RATE = 8000
+
+
+def synthesize_tone(text, voice):
+    """
+    Local stand-in for a TTS engine: one short tone per word, pitched by voice, as WAV bytes.
+    Useful for development and tests, where calling a speech service isn't wanted.
+    """
+    voice_name = voice.get("voice_name", voice.get("lang", "en"))
+    base_pitch = 160 + int(hashlib.md5(voice_name.encode("utf-8")).hexdigest(), 16) % 120
+    if voice.get("slow"):
+        word_seconds, gap_seconds = 0.12, 0.05
+    else:
+        word_seconds, gap_seconds = 0.08, 0.03
+
+    word_time = np.arange(int(TONE_SAMPLE_RATE * word_seconds)) / TONE_SAMPLE_RATE
+    envelope = np.sin(np.pi * word_time / word_seconds)  # fade each word in and out
+    gap = np.zeros(int(TONE_SAMPLE_RATE * gap_seconds))
+    samples = []
+    for word in text.split():
+        pitch = base_pitch * (1 + 0.05 * (len(word) % 5))
+        samples.append(envelope * np.sin(2 * np.pi * pitch * word_time))
+        samples.append(gap)
+    signal = np.concatenate(samples) if samples else gap
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(TONE_SAMPLE_RATE)
+        wav.writeframes((signal * 0.3 * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+# Engine name -> (synthesis function, MIME type of its audio)
+AUDIO_ENGINES = {
+    "gtts": (synthesize_gtts, "audio/mpeg"),
+    "tone": (synthesize_tone, "audio/wav")
+}
+
+
+class AudioPipeline:
+    """
+    Synthesizes agent statements in the background as soon as they are generated,
+    so their audio is ready by the time a client asks for it.
+
+    Clips are identified by a hash of the engine, voice and text, so the same line
+    in the same voice is synthesized once. Finished clips live in an AudioCache; the
+    text of recent clips is remembered so an evicted clip can be synthesized again.
+    Clips the cache can't hold (larger than its budget, or the cache is disabled) are
+    kept aside instead, so fetching them doesn't mean synthesizing them on every request.
+
+    Parameters:
+    - engine: Name of the TTS engine (see AUDIO_ENGINES)
+    - workers: Number of background synthesis threads
+    - cache: AudioCache for finished clips (default: the process-wide audio cache)
+    - max_texts: Number of clip texts remembered for re-synthesis
+    - max_uncached: Number of clips kept aside when the cache can't hold them
+    """
+
+    def __init__(self, engine="tone", workers=2, cache=None, max_texts=10000, max_uncached=32):
+        if engine not in AUDIO_ENGINES:
+            raise ValueError(f"Unknown TTS engine: {engine}")
+        self.engine_name = engine
+        self.engine, self.mimetype = AUDIO_ENGINES[engine]
+        self.cache = cache if cache is not None else get_audio_cache()
+        self.max_texts = max_texts
+        self.max_uncached = max_uncached
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="audio")
+        self._pending = {}  # clip_id -> Future
+        self._texts = OrderedDict()  # clip_id -> (text, voice), least recently submitted first
+        self._uncached = OrderedDict()  # clip_id -> audio the cache rejected, least recently used first
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.synthesized = 0
+        self.failures = 0
+
+    def submit(self, text, agent_id=None):
+        """
+        Queue a statement for synthesis in the agent's voice and return its clip ID
+        right away. Clips that are cached or already queued aren't synthesized again.
+        """
+        voice = voice_for(agent_id)
+        clip_id = AudioCache.make_key(text, voice, self.engine_name)
+        with self._lock:
+            self._texts[clip_id] = (text, voice)
+            self._texts.move_to_end(clip_id)
+            while len(self._texts) > self.max_texts:
+                self._texts.popitem(last=False)
+            if clip_id not in self.cache and clip_id not in self._uncached:
+                self._schedule(clip_id, text, voice)
+        return clip_id
+
+    def _schedule(self, clip_id, text, voice):
+        """Return the pending synthesis of a clip, starting it if needed (call with the lock held)."""
+        future = self._pending.get(clip_id)
+        if future is None:
+            self.submitted += 1
+            future = self._executor.submit(self._synthesize, clip_id, text, voice)
+            self._pending[clip_id] = future
+        return future
+
+    def _synthesize(self, clip_id, text, voice):
+        """Synthesize one clip into the cache (runs on a pipeline thread)."""
+        try:
+            audio = self.engine(text, voice)
+            cached = self.cache.put(clip_id, audio)
+            with self._lock:
+                self.synthesized += 1
+                if not cached:
+                    self._uncached[clip_id] = audio
+                    while len(self._uncached) > self.max_uncached:
+                        self._uncached.popitem(last=False)
+            return audio
+        except Exception as e:
+            print(f"Error synthesizing audio clip {clip_id}: {e}")
+            with self._lock:
+                self.failures += 1
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(clip_id, None)
+
+    def get(self, clip_id, timeout=10):
+        """
+        Return a clip's audio, waiting up to timeout seconds if it is still being
+        synthesized. A clip evicted from the cache is synthesized again.
+        Returns None for unknown clips or if synthesis failed.
+        """
+        audio = self.cache.get(clip_id)
+        if audio is not None:
+            return audio
+
+        with self._lock:
+            audio = self._uncached.get(clip_id)
+            if audio is not None:
+                self._uncached.move_to_end(clip_id)
+                return audio
+            known = self._texts.get(clip_id)
+            if known is None:
+                return None
+            future = self._schedule(clip_id, *known)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    def stats(self):
+        """Return synthesis counters and the audio cache statistics."""
+        with self._lock:
+            return {
+                "engine": self.engine_name,
+                "submitted": self.submitted,
+                "synthesized": self.synthesized,
+                "failures": self.failures,
+                "pending": len(self._pending),
+                "uncached": len(self._uncached),
+                "cache": self.cache.stats()
+            }
+
+
+_shared_pipeline = None
+_shared_pipeline_lock = threading.Lock()
+
+
+def get_audio_pipeline():
+    """
+    Return the process-wide audio pipeline, or None if speech synthesis is off.
+    Configured from the environment:
+    - CHALLENGE_TTS_ENGINE: "tone" (local stand-in), "gtts" or "none" (default: none)
+    - CHALLENGE_TTS_WORKERS: Background synthesis threads (default: 2)
+    """
+    global _shared_pipeline
+    engine = os.environ.get("CHALLENGE_TTS_ENGINE", "none")
+    if engine == "none":
+        return None
+    with _shared_pipeline_lock:
+        if _shared_pipeline is None:
+            _shared_pipeline = AudioPipeline(engine, workers=int(os.environ.get("CHALLENGE_TTS_WORKERS", 2)))
+        return _shared_pipeline
+
+# Example usage:
+# pipeline = AudioPipeline("tone", workers=2)
+# clip_id = pipeline.submit("I believe Option 3 is essential.", "agent_1")
+# audio = pipeline.get(clip_id)
+# print(len(audio), pipeline.mimetype, pipeline.stats())
@@ -1,3 +1,32 @@
+# Policy areas in package order (the order of digits in package codes)
+POLICY_AREAS = [
+    "Access to Education", 
+    "Language Instruction", 
+    "Teacher Training", 
+    "Curriculum Adaptation",
+    "Psychosocial Support", 
+    "Financial Support", 
+    "Certification/Accreditation"
+]
+
+def encode_package(options):
+    """
+    Encode a list of selected options (1-3, or 0 for not selected) as a single int.
+    Each area takes one base-4 digit, so seven areas fit in 14 bits.
+    """
+    code = 0
+    for option in reversed(options):
+        code = code * 4 + option
+    return code
+
+def decode_package(code, num_areas=7):
+    """Decode an int produced by encode_package back into a list of options."""
+    options = []
+    for _ in range(num_areas):
+        code, option = divmod(code, 4)
+        options.append(option)
+    return options
+
 class BudgetCalculator:
     def __init__(self, total_budget=14):
         """Initialize with the total available budget (default: 14 units)."""
@@ -7,97 +36,125 @@ class BudgetCalculator:
             "Option 2": 2,
             "Option 3": 3
         }
-        self.policy_areas = [
-            "Access to Education", 
-            "Language Instruction", 
-            "Teacher Training", 
-            "Curriculum Adaptation",
-            "Psychosocial Support", 
-            "Financial Support", 
-            "Certification/Accreditation"
-        ]
+        self.policy_areas = list(POLICY_AREAS)
         # Initialize selected policies dict
         self.selected_policies = {}
         for area in self.policy_areas:
             self.selected_policies[area] = None
+        
+        # Array-backed package kept in step with selected_policies, so budget
+        # queries never have to rescan the areas:
+        # - _options: selected option per area index (0 = not selected yet)
+        # - _option_costs: cost by option number
+        # - _option_counts: number of areas per option number (index 0 = not selected)
+        # - _used_budget: running total of the cost of all selected options
+        self._area_index = {area: i for i, area in enumerate(self.policy_areas)}
+        self._options = [0] * len(self.policy_areas)
+        self._option_costs = [0, self.policy_costs["Option 1"], self.policy_costs["Option 2"], self.policy_costs["Option 3"]]
+        self._option_counts = [len(self.policy_areas), 0, 0, 0]
+        self._used_budget = 0
+        # Incremented on every change to the selection, so results derived from it can be cached
+        self.version = 0
     
     def calculate_current_usage(self):
         """Calculate how much budget is currently used."""
-        total_used = 0
-        for area, option in self.selected_policies.items():
-            if option is not None:
-                total_used += self.policy_costs[f"Option {option}"]
-        return total_used
+        return self._used_budget
     
     def get_remaining_budget(self):
         """Get the remaining available budget."""
-        return self.total_budget - self.calculate_current_usage()
+        return self.total_budget - self._used_budget
     
     def can_afford_option(self, option):
         """Check if a specific option can be afforded with the remaining budget."""
-        cost = self.policy_costs[f"Option {option}"]
-        return cost <= self.get_remaining_budget()
+        if option not in [1, 2, 3]:
+            raise ValueError(f"Invalid option: {option}. Must be 1, 2, or 3.")
+        return self._option_costs[option] <= self.total_budget - self._used_budget
     
     def set_policy_option(self, area, option):
         """
         Set a policy option for a specific area.
         Returns True if successful, False if budget would be exceeded.
         """
-        if area not in self.policy_areas:
+        index = self._area_index.get(area)
+        if index is None:
             raise ValueError(f"Invalid policy area: {area}")
         
         if option not in [1, 2, 3]:
             raise ValueError(f"Invalid option: {option}. Must be 1, 2, or 3.")
         
         # Calculate new budget usage
-        current_option = self.selected_policies[area]
-        current_cost = 0 if current_option is None else self.policy_costs[f"Option {current_option}"]
-        new_cost = self.policy_costs[f"Option {option}"]
+        current_option = self._options[index]
+        budget_change = self._option_costs[option] - self._option_costs[current_option]
         
         # Check if we can afford the change
-        budget_change = new_cost - current_cost
-        if self.get_remaining_budget() < budget_change:
+        if self.total_budget - self._used_budget < budget_change:
             return False
         
-        # Update the policy
+        # Update the policy and the running totals
+        self._options[index] = option
+        self._option_counts[current_option] -= 1
+        self._option_counts[option] += 1
+        self._used_budget += budget_change
         self.selected_policies[area] = option
+        if option != current_option:
+            self.version += 1
         return True
     
-    def get_policy_summary(self):
-        """Get a summary of selected policies and budget usage."""
-        used_budget = self.calculate_current_usage()
-        remaining_budget = self.get_remaining_budget()
-        
-        # Count options by type
-        option_counts = {1: 0, 2: 0, 3: 0}
-        for option in self.selected_policies.values():
-            if option is not None:
-                option_counts[option] += 1
+    @property
+    def package_code(self):
+        """The selected options encoded as a single int (see encode_package)."""
+        return encode_package(self._options)
+    
+    def load_package_code(self, code):
+        """
+        Select the options encoded in a package code (areas encoded as 0 keep their option).
+        Returns False, changing nothing, if the code is out of range or the options exceed the budget.
+        """
+        if not 0 <= code < 4 ** len(self.policy_areas):
+            return False
+        decoded = decode_package(code, len(self.policy_areas))
+        options = [option or current for option, current in zip(decoded, self._options)]
+        if sum(self._option_costs[option] for option in options) > self.total_budget:
+            return False
         
-        # Check if we have a mix of options (rule #4)
-        has_policy_mix = len(set(self.selected_policies.values()) - {None}) > 1
+        # Cheaper changes first, so no intermediate selection goes over the budget
+        def budget_change(index):
+            return self._option_costs[options[index]] - self._option_costs[self._options[index]]
         
+        for index in sorted(range(len(options)), key=budget_change):
+            if options[index]:
+                self.set_policy_option(self.policy_areas[index], options[index])
+        return True
+    
+    def has_complete_policy_set(self):
+        """Check whether an option has been selected for every policy area."""
+        return self._option_counts[0] == 0
+    
+    def has_policy_mix(self):
+        """Check whether the selected options are not all from the same level (rule #4)."""
+        return (self._option_counts[1] > 0) + (self._option_counts[2] > 0) + (self._option_counts[3] > 0) > 1
+    
+    def get_policy_summary(self):
+        """Get a summary of selected policies and budget usage."""
         return {
-            "used_budget": used_budget,
-            "remaining_budget": remaining_budget,
+            "used_budget": self._used_budget,
+            "remaining_budget": self.total_budget - self._used_budget,
             "selected_policies": self.selected_policies.copy(),
-            "option_counts": option_counts,
-            "has_complete_policy_set": None not in self.selected_policies.values(),
-            "has_policy_mix": has_policy_mix
+            "option_counts": {1: self._option_counts[1], 2: self._option_counts[2], 3: self._option_counts[3]},
+            "has_complete_policy_set": self.has_complete_policy_set(),
+            "has_policy_mix": self.has_policy_mix()
         }
     
     def is_valid_policy_set(self):
         """Check if the current policy set is valid according to all rules."""
-        summary = self.get_policy_summary()
-        
         # Rule 1: Budget limit not exceeded
-        budget_valid = summary["used_budget"] <= self.total_budget
+        budget_valid = self._used_budget <= self.total_budget
         
         # Rule 4: Policy selection variety (cannot select all from same option)
-        variety_valid = summary["has_policy_mix"]
+        variety_valid = self.has_policy_mix()
         
         # Check if all policies have been selected
-        completeness_valid = summary["has_complete_policy_set"]
+        completeness_valid = self.has_complete_policy_set()
         
         return budget_valid and variety_valid and completeness_valid
     
@@ -115,7 +172,7 @@ class BudgetCalculator:
             feedback.append("WARNING: You have exceeded your budget limit!")
         
         # Policy mix feedback
-        if not summary["has_policy_mix"] and len(set(self.selected_policies.values()) - {None}) > 0:
+        if not summary["has_policy_mix"] and self._option_counts[0] < len(self.policy_areas):
             feedback.append("WARNING: You must choose a mix of policy options, not all from the same level.")
         
         # Completeness feedback
@@ -131,4 +188,5 @@ class BudgetCalculator:
 # calculator.set_policy_option("Language Instruction", 2)
 # print(calculator.get_remaining_budget())
 # print(calculator.get_policy_summary())
-# print(calculator.get_feedback())
\ No newline at end of file
+# print(calculator.get_feedback())
+# print(calculator.package_code)
\ No newline at end of file
@@ -0,0 +1,136 @@
+import numpy as np
+from modules.budget_calculator import POLICY_AREAS
+
+
+def satisfaction_table(preferences, weights=None, areas=POLICY_AREAS, options=(1, 2, 3)):
+    """
+    Compute how much the group as a whole would like each option in each area.
+
+    A participant is fully satisfied (1.0) by their preferred option and less so the
+    further the chosen option is from it, down to 0.0 for the opposite end of the scale.
+
+    Parameters:
+    - preferences: {participant_id: {area: preferred option}}
+    - weights: {participant_id: weight} (default: 1 for everyone)
+    - areas: Policy areas, in package order
+    - options: Available option numbers
+
+    Returns:
+    - (len(areas), len(options)) array of weighted satisfaction totals
+    """
+    participants = list(preferences)
+    if not participants:
+        return np.zeros((len(areas), len(options)))
+
+    weights = weights or {}
+    weight_vector = np.array([weights.get(participant, 1.0) for participant in participants], dtype=float)
+    preferred = np.array([[preferences[participant][area] for area in areas] for participant in participants], dtype=float)
+    option_values = np.asarray(options, dtype=float)
+    span = max(option_values.max() - option_values.min(), 1)
+
+    # (participants, areas, options) -> weighted sum over participants
+    satisfaction = 1 - np.abs(option_values[None, None, :] - preferred[:, :, None]) / span
+    return np.tensordot(weight_vector, satisfaction, axes=1)
+
+
+def solve_group_optimum(preferences, weights=None, areas=POLICY_AREAS, option_costs=None,
+                        total_budget=14, require_mix=True, fixed=None):
+    """
+    Find the package that best satisfies a group within the budget.
+
+    Dynamic programming over the areas, with the budget spent so far and the set of
+    option levels used so far (for the mixed-options rule) as the state. The cost is
+    O(areas x budget x 2^options x options), independent of the number of participants
+    once the satisfaction table is built.
+
+    Parameters:
+    - preferences: {participant_id: {area: preferred option}}
+    - weights: {participant_id: weight} (default: 1 for everyone)
+    - areas: Policy areas, in package order
+    - option_costs: {option: cost} (default: option n costs n units)
+    - total_budget: Maximum total cost
+    - require_mix: Whether the package must use more than one option level
+    - fixed: {area: option} for areas that have already been decided
+
+    Returns:
+    - Dictionary with the policies, cost, total utility and each participant's
+      satisfaction and number of matching areas, or None if no package is feasible
+    """
+    option_costs = option_costs or {1: 1, 2: 2, 3: 3}
+    options = sorted(option_costs)
+    costs = [option_costs[option] for option in options]
+    fixed = fixed or {}
+    num_masks = 1 << len(options)
+
+    utility = satisfaction_table(preferences, weights, areas, options)
+    for area_index, area in enumerate(areas):
+        if area in fixed:
+            allowed = np.array([option == fixed[area] for option in options])
+            utility[area_index, ~allowed] = -np.inf
+
+    # best[b, m]: best utility so far with b units spent and option levels m used
+    best = np.full((total_budget + 1, num_masks), -np.inf)
+    best[0, 0] = 0.0
+    # Back-pointers per area: option index chosen and mask before choosing it
+    chosen_option = np.full((len(areas), total_budget + 1, num_masks), -1, dtype=np.int16)
+    previous_mask = np.zeros((len(areas), total_budget + 1, num_masks), dtype=np.int16)
+
+    for area_index in range(len(areas)):
+        next_best = np.full_like(best, -np.inf)
+        for option_index, cost in enumerate(costs):
+            gain = utility[area_index, option_index]
+            if gain == -np.inf or cost > total_budget:
+                continue
+            bit = 1 << option_index
+            for mask in range(num_masks):
+                candidate = best[:total_budget + 1 - cost, mask] + gain
+                target_mask = mask | bit
+                improved = candidate > next_best[cost:, target_mask]
+                if improved.any():
+                    budgets = np.flatnonzero(improved) + cost
+                    next_best[budgets, target_mask] = candidate[improved]
+                    chosen_option[area_index, budgets, target_mask] = option_index
+                    previous_mask[area_index, budgets, target_mask] = mask
+        best = next_best
+
+    if require_mix:
+        # The mixed-options rule: more than one option level must be used
+        for mask in range(num_masks):
+            if bin(mask).count("1") <= 1:
+                best[:, mask] = -np.inf
+
+    if not np.isfinite(best).any():
+        return None
+
+    # Highest utility; ties go to the cheapest package (lowest budget row comes first)
+    budget, mask = np.unravel_index(np.argmax(best), best.shape)
+    total_utility = float(best[budget, mask])
+
+    package = {}
+    for area_index in range(len(areas) - 1, -1, -1):
+        option_index = chosen_option[area_index, budget, mask]
+        package[areas[area_index]] = options[option_index]
+        mask = previous_mask[area_index, budget, mask]
+        budget -= costs[option_index]
+    policies = {area: package[area] for area in areas}
+
+    weights = weights or {}
+    span = max(max(options) - min(options), 1)
+    satisfaction = {}
+    matches = {}
+    for participant, preferred in preferences.items():
+        satisfaction[participant] = sum(1 - abs(policies[area] - preferred[area]) / span for area in areas) / len(areas)
+        matches[participant] = sum(1 for area in areas if policies[area] == preferred[area])
+
+    return {
+        "policies": policies,
+        "cost": sum(option_costs[option] for option in policies.values()),
+        "utility": total_utility,
+        "satisfaction": satisfaction,
+        "matches": matches
+    }
+
+# Example usage:
+# preferences = generate_all_agent_preferences(create_random_agent_profiles(4))
+# optimum = solve_group_optimum(preferences, weights={"agent_1": 2.0})
+# print(optimum["policies"], optimum["cost"])
@@ -0,0 +1,163 @@
+import os
+
+
+def estimate_tokens(text):
+    """Rough token count for English text (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+class DiscussionContextBuilder:
+    """
+    Builds the "current discussion" passed to agent prompts, within a token budget.
+
+    The context holds, in order of priority:
+    - the most recent turns on the current topic, verbatim (up to recent_share of the budget)
+    - a summary of the older turns on the current topic (who argued for which option)
+    - the decisions already made on earlier topics (most recent first if they don't all fit)
+
+    Turns only ever move from the verbatim window into the summary, so each topic's
+    summary is updated with the new turns instead of being rebuilt, and the prompt
+    stays the same size however long the game runs.
+
+    Parameters:
+    - max_tokens: Token budget for the whole context (default: CHALLENGE_CONTEXT_TOKENS or 200)
+    - recent_share: Fraction of the budget for verbatim recent turns
+    - count_tokens: Function returning the token count of a string (default: estimate_tokens)
+    """
+
+    def __init__(self, max_tokens=None, recent_share=0.6, count_tokens=estimate_tokens):
+        if max_tokens is None:
+            max_tokens = int(os.environ.get("CHALLENGE_CONTEXT_TOKENS", 200))
+        self.max_tokens = max_tokens
+        self.recent_share = recent_share
+        self.count_tokens = count_tokens
+        self._reset(None)
+
+    def _reset(self, history):
+        self._history = history
+        self._turn_lines = {}  # history position -> (formatted turn, token count)
+        self._folds = {}  # topic -> [turns folded into the summary, {speaker: [turns, last stance]}, summary text]
+        self._topic_turns = {}  # topic -> [topic entries checked, positions of its statements]
+        self._decision_lines = []  # (formatted decision, token count), in the order they were made
+        self._scanned = 0  # history entries checked for decisions
+
+    def _turn_line(self, position):
+        """Format one turn, counting its tokens once."""
+        cached = self._turn_lines.get(position)
+        if cached is None:
+            entry = self._history[position]
+            stance = f" (Option {entry['stance']})" if entry.get("stance") else ""
+            line = f"{entry['agent_name']}{stance}: {entry['statement']}"
+            cached = (line, self.count_tokens(line))
+            self._turn_lines[position] = cached
+        return cached
+
+    def _update_decisions(self):
+        """Pick up decisions recorded since the last call."""
+        for position in range(self._scanned, len(self._history)):
+            entry = self._history[position]
+            if "decision" in entry:
+                line = f"{entry['topic']}: Option {entry['decision']}"
+                self._decision_lines.append((line, self.count_tokens(line)))
+        self._scanned = len(self._history)
+
+    def _topic_statements(self, topic):
+        """Return the positions of a topic's statements, checking only entries added since the last call."""
+        turns = self._topic_turns.setdefault(topic, [0, []])
+        positions = self._history.topic_positions(topic)
+        for position in positions[turns[0]:]:
+            if "statement" in self._history[position]:
+                turns[1].append(position)
+        turns[0] = len(positions)
+        return turns[1]
+
+    def _fold(self, topic, positions, window_start):
+        """Add the turns before window_start to the topic's summary and return the summary."""
+        fold = self._folds.setdefault(topic, [0, {}, ""])
+        if window_start > fold[0]:
+            for position in positions[fold[0]:window_start]:
+                entry = self._history[position]
+                speaker = fold[1].setdefault(entry["agent_name"], [0, None])
+                speaker[0] += 1
+                speaker[1] = entry.get("stance") or speaker[1]
+            fold[0] = window_start
+
+            parts = []
+            for name, (turns, stance) in fold[1].items():
+                position_text = f"argued for Option {stance}" if stance else "spoke"
+                parts.append(f"{name} {position_text} ({turns} {'turn' if turns == 1 else 'turns'})")
+            fold[2] = f"Earlier on {topic}: " + "; ".join(parts) + "."
+        return fold[0], fold[2]
+
+    def _truncate(self, text, max_tokens):
+        """Cut text down to roughly max_tokens tokens."""
+        words = text.split()
+        while words and self.count_tokens(" ".join(words) + " ...") > max_tokens:
+            words = words[:len(words) * 3 // 4] if len(words) > 8 else words[:-1]
+        return " ".join(words) + " ..." if words else ""
+
+    def build(self, history, topic):
+        """
+        Return the discussion context for a topic as prompt text.
+        Returns an empty string while nothing has been said or decided yet.
+        """
+        if history is not self._history or len(history) < self._scanned:
+            self._reset(history)
+        self._update_decisions()
+
+        # Statements on this topic (decisions on it are reported with the others)
+        positions = self._topic_statements(topic)
+
+        # Newest turns first, as many as fit in the recent share of the budget
+        recent_budget = int(self.max_tokens * self.recent_share) - self.count_tokens("Recent turns:")
+        recent = []
+        used = 0
+        window_start = len(positions)
+        for index in range(len(positions) - 1, -1, -1):
+            line, tokens = self._turn_line(positions[index])
+            if used + tokens > recent_budget:
+                if not recent:
+                    # A single long turn: keep its beginning
+                    line = self._truncate(line, recent_budget)
+                    recent.append(line)
+                    used += self.count_tokens(line)
+                    window_start = index
+                break
+            recent.append(line)
+            used += tokens
+            window_start = index
+
+        folded, summary = self._fold(topic, positions, window_start)
+        # Turns already summarized stay summarized
+        recent = recent[:len(positions) - max(window_start, folded)]
+        recent.reverse()
+
+        remaining = self.max_tokens - used
+        parts = []
+        if summary:
+            summary_tokens = self.count_tokens(summary)
+            if summary_tokens > remaining:
+                summary = self._truncate(summary, remaining)
+                summary_tokens = self.count_tokens(summary)
+            if summary:
+                parts.append(summary)
+                remaining -= summary_tokens
+
+        decisions = []
+        remaining -= self.count_tokens("Decided so far: .")
+        for line, tokens in reversed(self._decision_lines):
+            if tokens + 1 > remaining:
+                break
+            decisions.append(line)
+            remaining -= tokens + 1
+        if decisions:
+            parts.insert(0, "Decided so far: " + "; ".join(reversed(decisions)) + ".")
+
+        if recent:
+            parts.append("Recent turns:\n" + "\n".join(recent))
+        return "\n".join(parts)
+
+# Example usage:
+# builder = DiscussionContextBuilder(max_tokens=150)
+# context = builder.build(controller.discussion_history, controller.current_topic)
+# response = generator.generate_response(agent, topic, preference, context, budget_remaining)
@@ -0,0 +1,237 @@
+import time
+from array import array
+
+
+class DiscussionHistory:
+    """
+    Append-only record of a game's discussion, stored as columns.
+
+    Speakers (agent IDs and names), topics and phases are interned once, so each
+    entry costs a few small integers, a timestamp and its statement text. Contribution
+    counters per speaker and per topic, and the list of entries per topic, are kept
+    up to date on every append, so reports never rescan the history.
+
+    Iterating yields the entries as dictionaries, in the same shape the controller
+    has always recorded them:
+    - statements: phase, topic, agent_id, agent_name, statement, timestamp, and
+      stance (the option argued for) when it is known
+    - decisions: phase, topic, decision, timestamp
+    """
+
+    def __init__(self):
+        # Interned values
+        self._speaker_ids = []
+        self._speaker_names = []
+        self._speaker_index = {}
+        self._topics = []
+        self._topic_index = {}
+        self._phases = []
+        self._phase_index = {}
+
+        # One element per entry; speaker -1 marks a decision, decision 0 marks a statement,
+        # stance 0 marks a statement without a known stance
+        self._phase_column = array("b")
+        self._topic_column = array("b")
+        self._speaker_column = array("h")
+        self._decision_column = array("b")
+        self._stance_column = array("b")
+        self._timestamp_column = array("d")
+        self._statements = []
+
+        # Indexes, maintained on append
+        self._speaker_statements = []  # statement count per interned speaker
+        self._topic_statements = []  # statement count per interned topic
+        self._topic_entries = []  # entry positions per interned topic
+        self.statement_count = 0
+
+    def _intern_topic(self, topic):
+        index = self._topic_index.get(topic)
+        if index is None:
+            index = len(self._topics)
+            self._topic_index[topic] = index
+            self._topics.append(topic)
+            self._topic_statements.append(0)
+            self._topic_entries.append(array("i"))
+        return index
+
+    def _intern_speaker(self, agent_id, agent_name):
+        index = self._speaker_index.get(agent_id)
+        if index is None:
+            index = len(self._speaker_ids)
+            self._speaker_index[agent_id] = index
+            self._speaker_ids.append(agent_id)
+            self._speaker_names.append(agent_name)
+            self._speaker_statements.append(0)
+        return index
+
+    def _intern_phase(self, phase):
+        index = self._phase_index.get(phase)
+        if index is None:
+            index = len(self._phases)
+            self._phase_index[phase] = index
+            self._phases.append(phase)
+        return index
+
+    @staticmethod
+    def _check_option(value, name):
+        """Return value as an option number (0-3, 0 meaning none); raise ValueError otherwise."""
+        if value is None:
+            return 0
+        if value not in (0, 1, 2, 3):
+            raise ValueError(f"Invalid {name}: {value}. Must be 1, 2, or 3.")
+        return int(value)
+
+    def _append(self, phase, topic, speaker, decision, stance, statement, timestamp):
+        # Values are checked by the callers, so every column grows or none does
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        topic_index = self._intern_topic(topic)
+        self._topic_entries[topic_index].append(len(self._statements))
+        self._phase_column.append(self._intern_phase(phase))
+        self._topic_column.append(topic_index)
+        self._speaker_column.append(speaker)
+        self._decision_column.append(decision)
+        self._stance_column.append(stance)
+        self._timestamp_column.append(timestamp)
+        self._statements.append(statement)
+        return topic_index
+
+    def add_statement(self, topic, agent_id, agent_name, statement, phase="group", timestamp=None, stance=None):
+        """
+        Record something said by an agent (or by the human, as agent "human").
+        stance is the option the speaker argued for, if known.
+        Raises ValueError (recording nothing) if stance is not an option.
+        """
+        stance = self._check_option(stance, "stance")
+        speaker = self._intern_speaker(agent_id, agent_name)
+        topic_index = self._append(phase, topic, speaker, 0, stance, statement, timestamp)
+        self._speaker_statements[speaker] += 1
+        self._topic_statements[topic_index] += 1
+        self.statement_count += 1
+
+    def add_decision(self, topic, option, phase="group", timestamp=None):
+        """Record the option the group settled on for a topic. Raises ValueError if option is not 1-3."""
+        option = self._check_option(option, "option")
+        if not option:
+            raise ValueError("A decision needs an option.")
+        self._append(phase, topic, -1, option, 0, None, timestamp)
+
+    def add(self, entry):
+        """Record an entry given as a dictionary (see the class docstring)."""
+        if "decision" in entry:
+            self.add_decision(entry["topic"], entry["decision"], entry.get("phase", "group"), entry.get("timestamp"))
+        else:
+            self.add_statement(entry["topic"], entry["agent_id"], entry["agent_name"], entry["statement"],
+                               entry.get("phase", "group"), entry.get("timestamp"), entry.get("stance"))
+
+    def _entry(self, position):
+        entry = {
+            "phase": self._phases[self._phase_column[position]],
+            "topic": self._topics[self._topic_column[position]]
+        }
+        speaker = self._speaker_column[position]
+        if speaker < 0:
+            entry["decision"] = self._decision_column[position]
+        else:
+            entry["agent_id"] = self._speaker_ids[speaker]
+            entry["agent_name"] = self._speaker_names[speaker]
+            entry["statement"] = self._statements[position]
+            if self._stance_column[position]:
+                entry["stance"] = self._stance_column[position]
+        entry["timestamp"] = self._timestamp_column[position]
+        return entry
+
+    def __len__(self):
+        return len(self._statements)
+
+    def __iter__(self):
+        for position in range(len(self._statements)):
+            yield self._entry(position)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._entry(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("discussion history index out of range")
+        return self._entry(position)
+
+    def contribution_count(self, agent_id):
+        """Return how many statements a speaker has made."""
+        speaker = self._speaker_index.get(agent_id)
+        return 0 if speaker is None else self._speaker_statements[speaker]
+
+    def contribution_counts(self):
+        """Return {agent_id: number of statements} for every speaker so far."""
+        return dict(zip(self._speaker_ids, self._speaker_statements))
+
+    def topic_statement_counts(self):
+        """Return {topic: number of statements} for every topic discussed so far."""
+        return dict(zip(self._topics, self._topic_statements))
+
+    def topic_positions(self, topic):
+        """Return the positions (indices into the history) of a topic's entries, oldest first."""
+        topic_index = self._topic_index.get(topic)
+        if topic_index is None:
+            return array("i")
+        return self._topic_entries[topic_index]
+
+    def topics(self):
+        """Return the topics discussed so far, in the order they came up."""
+        return list(self._topics)
+
+    def topic_entries(self, topic):
+        """Return the entries recorded for one topic, oldest first."""
+        topic_index = self._topic_index.get(topic)
+        if topic_index is None:
+            return []
+        return [self._entry(position) for position in self._topic_entries[topic_index]]
+
+    def to_state(self):
+        """Return the history as a compact JSON-serializable dictionary of columns."""
+        return {
+            "speakers": [[agent_id, name] for agent_id, name in zip(self._speaker_ids, self._speaker_names)],
+            "topics": list(self._topics),
+            "phases": list(self._phases),
+            "phase": self._phase_column.tolist(),
+            "topic": self._topic_column.tolist(),
+            "speaker": self._speaker_column.tolist(),
+            "decision": self._decision_column.tolist(),
+            "stance": self._stance_column.tolist(),
+            "timestamp": self._timestamp_column.tolist(),
+            "statement": list(self._statements)
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuild a history from to_state() output, or from a list of entry
+        dictionaries as stored before the history was columnar.
+        """
+        history = cls()
+        if isinstance(state, list):
+            for entry in state:
+                history.add(entry)
+            return history
+
+        speakers = state["speakers"]
+        # State saved before stances were recorded has no stance column
+        stances = state.get("stance") or [0] * len(state["statement"])
+        for phase, topic, speaker, decision, stance, timestamp, statement in zip(
+            state["phase"], state["topic"], state["speaker"], state["decision"],
+            stances, state["timestamp"], state["statement"]
+        ):
+            phase = state["phases"][phase]
+            topic = state["topics"][topic]
+            if speaker < 0:
+                history.add_decision(topic, decision, phase, timestamp)
+            else:
+                agent_id, agent_name = speakers[speaker]
+                history.add_statement(topic, agent_id, agent_name, statement, phase, timestamp, stance)
+        return history
+
+# Example usage:
+# history = DiscussionHistory()
+# history.add_statement("Access to Education", "agent_1", "Alex", "Option 3 is essential.", stance=3)
+# history.add_decision("Access to Education", 3)
+# print(len(history), history.contribution_counts(), list(history))
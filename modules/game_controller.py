@@ -1,18 +1,42 @@
 from modules.agent_policy_preferences import generate_all_agent_preferences
-from modules.agent_response_generator import AgentResponseGenerator
+from modules.agent_profiles import create_random_agent_profiles
+from modules.agent_response_generator import get_shared_generator, agent_turn_executor
+from modules.audio_pipeline import get_audio_pipeline
 from modules.budget_calculator import BudgetCalculator
+from modules.consensus_solver import solve_group_optimum
+from modules.discussion_context import DiscussionContextBuilder
+from modules.discussion_history import DiscussionHistory
+from modules.policy_space import (get_policy_space, policies_to_options, SCORE_FIELDS,
+                                  BENEFIT_STATE, BENEFIT_REFUGEES)
+import queue
 import random
-import json
 import time
+import json
 
 class ChallengeGameController:
-    def __init__(self, agent_profiles):
-        """Initialize the game controller with agent profiles."""
+    def __init__(self, agent_profiles, agent_preferences=None, seed=None):
+        """
+        Initialize the game controller with agent profiles.
+        Agent preferences are generated from the profiles unless provided.
+        seed records the random seed the game was generated from, if any (see new_game).
+        """
         self.agent_profiles = agent_profiles
-        self.agent_preferences = generate_all_agent_preferences(agent_profiles)
-        self.response_generator = AgentResponseGenerator()
+        if agent_preferences is None:
+            agent_preferences = generate_all_agent_preferences(agent_profiles)
+        self.agent_preferences = agent_preferences
+        self.seed = seed
+        # Set to a list by session stores that keep a journal; state changes are appended to it
+        self.journal_events = None
+        # All sessions share one generator, which borrows models from a process-wide pool
+        self.response_generator = get_shared_generator()
+        # Synthesizes agent statements in the background when speech is enabled (None otherwise)
+        self.audio_pipeline = get_audio_pipeline()
         self.budget_calculator = BudgetCalculator()
-        self.discussion_history = []
+        self.discussion_history = DiscussionHistory()
+        # Recent turns and summaries of the discussion, kept within a token budget for prompts
+        self.discussion_context = DiscussionContextBuilder()
+        # Analyses of the package and the discussion, reused while neither changes (see _cached)
+        self._result_cache = {}
         self.human_preferences = {}
         self.current_phase = "setup"  # setup, individual, group, reflection
         self.current_topic = None
@@ -56,9 +80,91 @@ class ChallengeGameController:
             }
         }
     
+    @classmethod
+    def new_game(cls, num_agents=4, seed=None):
+        """
+        Create a controller with random agents drawn from a seeded RNG, so the
+        same seed always produces the same agents and preferences.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        rng = random.Random(seed)
+        agent_profiles = create_random_agent_profiles(num_agents, rng=rng)
+        return cls(agent_profiles, generate_all_agent_preferences(agent_profiles, rng=rng), seed=seed)
+    
+    def _record(self, event_type, **fields):
+        """Append a state change to the journal events, if a session journal is listening."""
+        if self.journal_events is not None:
+            fields["t"] = event_type
+            fields.setdefault("ts", time.time())
+            self.journal_events.append(fields)
+    
+    def _record_statements(self, count):
+        """Journal the last count statements added to the discussion history, with their timestamps."""
+        if self.journal_events is not None:
+            entries = self.discussion_history[-count:]
+            self._record("statements", topic=entries[0]["topic"], statements=[
+                [entry["agent_id"], entry["agent_name"], entry["statement"], entry.get("stance"), entry["timestamp"]]
+                for entry in entries
+            ])
+    
+    def apply_journal_event(self, event):
+        """
+        Redo a state change recorded by _record. Generated statements come from the
+        event itself, so replaying never calls the language model.
+        """
+        event_type = event["t"]
+        timestamp = event.get("ts")
+        if event_type == "start_game":
+            self.start_game()
+        elif event_type == "preference":
+            self.set_human_preference(event["area"], event["option"])
+        elif event_type == "group":
+            self.start_group_discussion()
+        elif event_type == "statements":
+            for agent_id, agent_name, statement, stance, statement_timestamp in event["statements"]:
+                self.discussion_history.add_statement(event["topic"], agent_id, agent_name, statement,
+                                                      timestamp=statement_timestamp, stance=stance)
+        elif event_type == "decision":
+            self.finalize_topic_decision(event["option"], timestamp=timestamp)
+        else:
+            raise ValueError(f"Unknown journal event: {event_type}")
+    
+    def to_state(self):
+        """Return the mutable game state as a JSON-serializable dictionary."""
+        return {
+            "seed": self.seed,
+            "agent_profiles": self.agent_profiles,
+            "agent_preferences": self.agent_preferences,
+            "package_code": self.budget_calculator.package_code,
+            "discussion_history": self.discussion_history.to_state(),
+            "human_preferences": self.human_preferences,
+            "current_phase": self.current_phase,
+            "current_topic": self.current_topic
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a controller from a dictionary produced by to_state()."""
+        controller = cls(state["agent_profiles"], agent_preferences=state["agent_preferences"], seed=state.get("seed"))
+        if "package_code" in state:
+            if not controller.budget_calculator.load_package_code(state["package_code"]):
+                raise ValueError(f"Invalid package code: {state['package_code']}")
+        else:
+            # State saved before packages were stored as a single int
+            for area, option in state["selected_policies"].items():
+                if option is not None:
+                    controller.budget_calculator.set_policy_option(area, option)
+        controller.discussion_history = DiscussionHistory.from_state(state["discussion_history"])
+        controller.human_preferences = state["human_preferences"]
+        controller.current_phase = state["current_phase"]
+        controller.current_topic = state["current_topic"]
+        return controller
+    
     def start_game(self):
         """Start the game and move to the individual decision phase."""
         self.current_phase = "individual"
+        self._record("start_game")
         return {
             "message": "Welcome to the CHALLENGE Game! You are now in the Individual Decision-Making Phase.",
             "instructions": "Please review the policy options and make your individual selections while staying within the 14-unit budget."
@@ -80,6 +186,7 @@ class ChallengeGameController:
         
         if success:
             self.human_preferences[policy_area] = option
+            self._record("preference", area=policy_area, option=option)
             remaining_budget = self.budget_calculator.get_remaining_budget()
             return {
                 "success": True, 
@@ -113,6 +220,8 @@ class ChallengeGameController:
         
         # Reset the budget calculator for the group phase
         self.budget_calculator = BudgetCalculator()
+        self._result_cache.clear()
+        self._record("group")
         
         return {
             "success": True,
@@ -121,40 +230,69 @@ class ChallengeGameController:
             "instructions": "Discuss with the AI agents to reach a consensus on each policy area."
         }
     
+    def _recorded_opening_statements(self, topic):
+        """
+        Return the opening statements already recorded on a topic as {agent_id: entry},
+        and whether the opening round is over (the human has argued on the topic since).
+        Opening statements are the agents' first statements on a topic, before any human argument.
+        """
+        recorded = {}
+        for entry in self.discussion_history.topic_entries(topic):
+            if "decision" in entry:
+                continue
+            if entry["agent_id"] == "human":
+                return recorded, True
+            recorded.setdefault(entry["agent_id"], entry)
+        return recorded, False
+    
+    def _opening_statement(self, agent, preference, statement):
+        """Build the description of an agent's opening statement returned to clients."""
+        return {
+            "agent_id": agent["id"],
+            "agent_name": agent["name"],
+            "preference": preference,
+            "statement": statement,
+            "audio_id": self._prepare_audio(agent["id"], statement)
+        }
+    
     def get_agent_opening_statements(self):
-        """Get opening statements from all agents for the current topic."""
+        """
+        Get opening statements from all agents for the current topic.
+        Each agent makes one opening statement per topic: statements already recorded
+        (e.g. by an earlier request) are returned again instead of being generated anew.
+        """
         if self.current_phase != "group":
             return {"success": False, "message": "Not in the Group Discussion Phase."}
         
-        statements = []
-        for agent in self.agent_profiles:
-            agent_id = agent["id"]
-            preference = self.agent_preferences[agent_id][self.current_topic]
-            
-            response = self.response_generator.generate_response(
-                agent,
-                self.current_topic,
-                preference,
-                "",  # No discussion yet
-                self.budget_calculator.get_remaining_budget()
-            )
-            
-            statements.append({
-                "agent_id": agent_id,
-                "agent_name": agent["name"],
-                "preference": preference,
-                "statement": response
-            })
+        recorded, closed = self._recorded_opening_statements(self.current_topic)
+        missing = [] if closed else [agent for agent in self.agent_profiles if agent["id"] not in recorded]
+        
+        # Generate the missing agents' statements in one batch
+        budget_remaining = self.budget_calculator.get_remaining_budget()
+        current_discussion = self.discussion_context.build(self.discussion_history, self.current_topic)
+        preferences = [self.agent_preferences[agent["id"]][self.current_topic] for agent in missing]
+        responses = self.response_generator.generate_responses_batch([
+            (agent, self.current_topic, preference, current_discussion, budget_remaining)
+            for agent, preference in zip(missing, preferences)
+        ]) if missing else []
+        
+        generated = {}
+        for agent, preference, response in zip(missing, preferences, responses):
+            generated[agent["id"]] = self._opening_statement(agent, preference, response)
             
             # Add to discussion history
-            self.discussion_history.append({
-                "phase": "group",
-                "topic": self.current_topic,
-                "agent_id": agent_id,
-                "agent_name": agent["name"],
-                "statement": response,
-                "timestamp": time.time()
-            })
+            self.discussion_history.add_statement(self.current_topic, agent["id"], agent["name"], response, stance=preference)
+        
+        if generated:
+            self._record_statements(len(generated))
+        
+        statements = []
+        for agent in self.agent_profiles:
+            if agent["id"] in generated:
+                statements.append(generated[agent["id"]])
+            elif agent["id"] in recorded:
+                entry = recorded[agent["id"]]
+                statements.append(self._opening_statement(agent, entry.get("stance"), entry["statement"]))
         
         return {
             "success": True,
@@ -162,50 +300,143 @@ class ChallengeGameController:
             "statements": statements
         }
     
+    def record_opening_statement(self, topic, agent, preference, statement):
+        """
+        Record an agent's opening statement on a topic and return its description for clients.
+        If the agent already has an opening statement on the topic (e.g. recorded by another
+        stream), that one is returned instead. If the topic is no longer open for opening
+        statements, nothing is recorded and None is returned.
+        """
+        if self.current_phase != "group" or self.current_topic != topic:
+            return None
+        
+        recorded, closed = self._recorded_opening_statements(topic)
+        if agent["id"] in recorded:
+            entry = recorded[agent["id"]]
+            return self._opening_statement(agent, entry.get("stance"), entry["statement"])
+        if closed:
+            return None
+        
+        self.discussion_history.add_statement(topic, agent["id"], agent["name"], statement, stance=preference)
+        self._record_statements(1)
+        return self._opening_statement(agent, preference, statement)
+    
+    def stream_agent_opening_statements(self, record=None):
+        """
+        Generate opening statements for the current topic concurrently and yield
+        events as soon as they are available. Statements already recorded on the topic
+        are sent first, and only the agents still missing one are generated, so a
+        client that reconnects doesn't add statements to the discussion again.
+        
+        Parameters:
+        - record: Called as record(topic, agent, preference, statement) for each generated
+          statement; returns what to send as the statement event, or None to send nothing.
+          Defaults to record_opening_statement on this controller. Streams that run outside
+          a session checkout pass a function that checks the session out to record it.
+        
+        Yields dictionaries with an "event" key:
+        - "token": a piece of an agent's statement ("agent_id", "token")
+        - "statement": an agent's complete statement (same fields as get_agent_opening_statements)
+        - "error": generation failed ("agent_id" if it concerns one agent, "message")
+        - "done": all agents have finished ("topic")
+        """
+        if self.current_phase != "group":
+            yield {"event": "error", "message": "Not in the Group Discussion Phase."}
+            return
+        
+        if record is None:
+            record = self.record_opening_statement
+        
+        topic = self.current_topic
+        recorded, closed = self._recorded_opening_statements(topic)
+        missing = []
+        for agent in self.agent_profiles:
+            if agent["id"] in recorded:
+                entry = recorded[agent["id"]]
+                yield dict(self._opening_statement(agent, entry.get("stance"), entry["statement"]), event="statement")
+            elif not closed:
+                missing.append(agent)
+        
+        budget_remaining = self.budget_calculator.get_remaining_budget()
+        current_discussion = self.discussion_context.build(self.discussion_history, topic)
+        events = queue.Queue()
+        
+        def run_agent(agent, preference):
+            tokens = []
+            try:
+                for token in self.response_generator.stream_response(agent, topic, preference, current_discussion, budget_remaining):
+                    tokens.append(token)
+                    events.put(("token", agent, preference, token))
+                events.put(("statement", agent, preference, "".join(tokens)))
+            except Exception as e:
+                events.put(("error", agent, preference, str(e)))
+        
+        for agent in missing:
+            preference = self.agent_preferences[agent["id"]][topic]
+            agent_turn_executor.submit(run_agent, agent, preference)
+        
+        # Agents finish in any order; only this thread records their statements
+        pending = len(missing)
+        while pending:
+            kind, agent, preference, payload = events.get()
+            if kind == "token":
+                yield {"event": "token", "agent_id": agent["id"], "token": payload}
+                continue
+            
+            pending -= 1
+            if kind == "error":
+                yield {"event": "error", "agent_id": agent["id"], "message": payload}
+                continue
+            
+            statement = record(topic, agent, preference, payload)
+            if statement is not None:
+                yield dict(statement, event="statement")
+        
+        yield {"event": "done", "topic": topic}
+    
+    def _prepare_audio(self, agent_id, statement):
+        """Start synthesizing a statement in the agent's voice and return its clip ID (None if speech is off)."""
+        if self.audio_pipeline is None:
+            return None
+        return self.audio_pipeline.submit(statement, agent_id)
+    
     def submit_human_argument(self, argument, preferred_option):
         """Process a human argument during the group discussion."""
         if self.current_phase != "group":
             return {"success": False, "message": "Not in the Group Discussion Phase."}
         
+        if preferred_option not in [1, 2, 3]:
+            return {"success": False, "message": f"Invalid option: {preferred_option}. Must be 1, 2, or 3."}
+        
         # Record human argument
-        self.discussion_history.append({
-            "phase": "group",
-            "topic": self.current_topic,
-            "agent_id": "human",
-            "agent_name": "Human Player",
-            "statement": argument,
-            "timestamp": time.time()
-        })
+        self.discussion_history.add_statement(self.current_topic, "human", "Human Player", argument, stance=preferred_option)
+        
+        # Generate counterarguments from all agents concurrently, based on each agent's stance.
+        # Agents that miss the deadline answer with a canned response so one slow call can't stall the turn.
+        agent_preferences = [self.agent_preferences[agent["id"]][self.current_topic] for agent in self.agent_profiles]
+        current_discussion = self.discussion_context.build(self.discussion_history, self.current_topic)
+        arguments = self.response_generator.generate_debate_arguments_with_deadline([
+            (agent, self.current_topic, agent_preference, preferred_option, current_discussion)
+            for agent, agent_preference in zip(self.agent_profiles, agent_preferences)
+        ])
         
-        # Generate responses from agents
         responses = []
-        for agent in self.agent_profiles:
+        for agent, agent_preference, (response, used_fallback) in zip(self.agent_profiles, agent_preferences, arguments):
             agent_id = agent["id"]
-            agent_preference = self.agent_preferences[agent_id][self.current_topic]
-            
-            # Generate a counterargument based on the agent's stance
-            response = self.response_generator.generate_debate_argument(
-                agent,
-                self.current_topic,
-                agent_preference,
-                preferred_option
-            )
             
             responses.append({
                 "agent_id": agent_id,
                 "agent_name": agent["name"],
-                "statement": response
+                "statement": response,
+                "fallback": used_fallback,
+                "audio_id": self._prepare_audio(agent_id, response)
             })
             
             # Add to discussion history
-            self.discussion_history.append({
-                "phase": "group",
-                "topic": self.current_topic,
-                "agent_id": agent_id,
-                "agent_name": agent["name"],
-                "statement": response,
-                "timestamp": time.time()
-            })
+            self.discussion_history.add_statement(self.current_topic, agent_id, agent["name"], response, stance=agent_preference)
+        
+        # The human argument and the agents' responses
+        self._record_statements(len(responses) + 1)
         
         return {
             "success": True,
@@ -213,8 +444,11 @@ class ChallengeGameController:
             "responses": responses
         }
     
-    def finalize_topic_decision(self, option):
-        """Finalize the decision for the current topic and move to the next one."""
+    def finalize_topic_decision(self, option, timestamp=None):
+        """
+        Finalize the decision for the current topic and move to the next one.
+        timestamp overrides the time recorded for the decision (used when replaying a journal).
+        """
         if self.current_phase != "group":
             return {"success": False, "message": "Not in the Group Discussion Phase."}
         
@@ -229,12 +463,10 @@ class ChallengeGameController:
             }
         
         # Record the decision
-        self.discussion_history.append({
-            "phase": "group",
-            "topic": self.current_topic,
-            "decision": option,
-            "timestamp": time.time()
-        })
+        if timestamp is None:
+            timestamp = time.time()
+        self.discussion_history.add_decision(self.current_topic, option, timestamp=timestamp)
+        self._record("decision", option=option, ts=timestamp)
         
         # Move to the next topic
         current_index = list(self.policy_areas.keys()).index(self.current_topic)
@@ -282,7 +514,7 @@ class ChallengeGameController:
         
         # Analyze the policy decisions
         final_policies = self.budget_calculator.selected_policies
-        policy_analysis = self._analyze_policy_package(final_policies)
+        policy_analysis = self._cached("policy_analysis", lambda: self._analyze_policy_package(final_policies))
         
         return {
             "success": True,
@@ -294,40 +526,29 @@ class ChallengeGameController:
             "budget_remaining": self.budget_calculator.get_remaining_budget()
         }
     
+    def result_version(self):
+        """
+        Version of the state the reports are computed from: the budget calculator's
+        version and the length of the (append-only) discussion history.
+        """
+        return (self.budget_calculator.version, len(self.discussion_history))
+    
+    def _cached(self, name, compute):
+        """
+        Return compute(), reusing the previous result while result_version() is unchanged.
+        Cached results are shared between calls, so callers must not modify them.
+        """
+        version = self.result_version()
+        cached = self._result_cache.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, compute())
+            self._result_cache[name] = cached
+        return cached[1]
+    
     def _analyze_policy_package(self, policies):
         """Analyze the chosen policy package for equity, justice, and coherence."""
-        # Count policy levels
-        level_counts = {1: 0, 2: 0, 3: 0}
-        for area, option in policies.items():
-            level_counts[option] += 1
-        
-        # Calculate equity score (higher = more equitable)
-        equity_score = (level_counts[3] * 3 + level_counts[2] * 2 + level_counts[1]) / 7
-        
-        # Calculate justice score based on certain critical areas
-        justice_critical_areas = {
-            "Access to Education": policies["Access to Education"],
-            "Psychosocial Support": policies["Psychosocial Support"],
-            "Certification/Accreditation": policies["Certification/Accreditation"]
-        }
-        justice_score = sum(justice_critical_areas.values()) / (3 * 3)  # Max possible is 1.0
-        
-        # Calculate coherence (are policy choices aligned?)
-        coherence_pairs = [
-            ("Access to Education", "Language Instruction"),
-            ("Teacher Training", "Curriculum Adaptation"),
-            ("Financial Support", "Psychosocial Support")
-        ]
-        
-        coherence_score = 0
-        for area1, area2 in coherence_pairs:
-            # Closer options = more coherent
-            difference = abs(policies[area1] - policies[area2])
-            if difference == 0:
-                coherence_score += 1
-            elif difference == 1:
-                coherence_score += 0.5
-        coherence_score = coherence_score / len(coherence_pairs)
+        # Every package's counts and scores are precomputed, so this is a table lookup
+        level_counts, equity_score, justice_score, coherence_score, benefit = get_policy_space().scores(policies)
         
         # Overall analysis
         if equity_score > 0.7:
@@ -352,10 +573,9 @@ class ChallengeGameController:
             coherence_analysis = "Your policy choices contain significant contradictions that may undermine effectiveness."
         
         # Identify who benefits most
-        benefit_analysis = ""
-        if equity_score < 0.4:
+        if benefit == BENEFIT_STATE:
             benefit_analysis = "Your policy package primarily serves the interests of the state and existing citizens."
-        elif justice_score > 0.7 and equity_score > 0.6:
+        elif benefit == BENEFIT_REFUGEES:
             benefit_analysis = "Your policy package strongly centers refugee needs and rights."
         else:
             benefit_analysis = "Your policy package attempts to balance state interests with some refugee needs."
@@ -381,6 +601,97 @@ class ChallengeGameController:
             }
         }
     
+    def get_policy_hints(self, objective="equity"):
+        """
+        Suggest how to improve the current package on one of the scores.
+        For a complete package this is the best single-area change; otherwise it is
+        the best way to complete the areas that are still open.
+        """
+        if objective not in SCORE_FIELDS:
+            return {"success": False, "message": f"Invalid objective: {objective}. Must be one of {', '.join(SCORE_FIELDS)}."}
+        
+        space = get_policy_space()
+        options = policies_to_options(self.budget_calculator.selected_policies)
+        
+        if self.budget_calculator.has_complete_policy_set():
+            current = space.lookup(self.budget_calculator.selected_policies)
+            suggestion = space.best_upgrade(options, objective)
+            hint_type = "upgrade"
+        else:
+            current = None
+            suggestion = space.best_completion(options, objective)
+            hint_type = "completion"
+        
+        if suggestion is None:
+            return {
+                "success": True,
+                "hint_type": hint_type,
+                "objective": objective,
+                "message": f"No valid change improves the {objective} score.",
+                "suggestion": None
+            }
+        
+        changes = {
+            area: option for area, option in suggestion["policies"].items()
+            if self.budget_calculator.selected_policies[area] != option
+        }
+        return {
+            "success": True,
+            "hint_type": hint_type,
+            "objective": objective,
+            "current": current,
+            "suggestion": suggestion,
+            "changes": changes
+        }
+
+    def compute_group_optimum(self, weights=None, include_human=True):
+        """
+        Find the package that best satisfies the agents (and the human, once all of
+        their preferences are set) within the budget and the mixed-options rule.
+        During the group discussion, topics already decided are kept as they are.
+        
+        Parameters:
+        - weights: Optional {participant_id: weight}; the human's id is "human"
+        - include_human: Whether the human's preferences count towards the optimum
+        """
+        if weights is not None:
+            if not isinstance(weights, dict):
+                return {"success": False, "message": "weights must map participant IDs to numbers."}
+            for participant_id, weight in weights.items():
+                if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < float("inf"):
+                    return {"success": False, "message": f"Invalid weight for {participant_id}: {weight}. Must be a non-negative number."}
+        
+        preferences = dict(self.agent_preferences)
+        if include_human and len(self.human_preferences) == len(self.policy_areas):
+            preferences["human"] = self.human_preferences
+        
+        if not preferences:
+            return {"success": False, "message": "No participant preferences to optimize for."}
+        
+        fixed = {}
+        if self.current_phase == "group":
+            fixed = {
+                area: option for area, option in self.budget_calculator.selected_policies.items()
+                if option is not None
+            }
+        
+        optimum = solve_group_optimum(
+            preferences,
+            weights=weights,
+            areas=list(self.policy_areas.keys()),
+            total_budget=self.budget_calculator.total_budget,
+            fixed=fixed
+        )
+        if optimum is None:
+            return {"success": False, "message": "No valid package satisfies the budget with the decisions made so far."}
+        
+        return {
+            "success": True,
+            "fixed_areas": list(fixed.keys()),
+            "participants": list(preferences.keys()),
+            **optimum
+        }
+
     def get_agent_reflections(self):
         """Get reflective comments from AI agents on the final policy package."""
         if self.current_phase != "reflection":
@@ -432,15 +743,22 @@ class ChallengeGameController:
         }
     
     def generate_final_report(self):
-        """Generate a comprehensive final report on the game outcomes."""
+        """
+        Generate a comprehensive final report on the game outcomes.
+        The report is built once per result_version() and shared between calls.
+        """
         if self.current_phase != "reflection":
             return {"success": False, "message": "Not in the Reflection Phase."}
-            
+        
+        return self._cached("final_report", self._build_final_report)
+    
+    def _build_final_report(self):
+        """Build the report returned by generate_final_report."""
         final_policies = self.budget_calculator.selected_policies
-        policy_analysis = self._analyze_policy_package(final_policies)
+        policy_analysis = self._cached("policy_analysis", lambda: self._analyze_policy_package(final_policies))
         
         # Analyze the discussion dynamics
-        discussion_analysis = self._analyze_discussion_dynamics()
+        discussion_analysis = self._cached("discussion_analysis", self._analyze_discussion_dynamics)
         
         return {
             "success": True,
@@ -459,14 +777,10 @@ class ChallengeGameController:
         # This would be more sophisticated in a full implementation
         # Here's a simplified version
         
-        # Count contributions by each agent
-        contribution_counts = {"human": 0}
+        # Count contributions by each agent (kept up to date by the history)
+        contribution_counts = {"human": self.discussion_history.contribution_count("human")}
         for agent in self.agent_profiles:
-            contribution_counts[agent["id"]] = 0
-            
-        for entry in self.discussion_history:
-            if entry.get("agent_id") and "statement" in entry:
-                contribution_counts[entry["agent_id"]] += 1
+            contribution_counts[agent["id"]] = self.discussion_history.contribution_count(agent["id"])
         
         # Identify dominant voices
         max_contributions = max(contribution_counts.values())
@@ -482,5 +796,5 @@ class ChallengeGameController:
             "contribution_counts": contribution_counts,
             "dominant_voices": dominant_voices,
             "silenced_voices": silenced_voices,
-            "total_exchanges": len([e for e in self.discussion_history if "statement" in e])
+            "total_exchanges": self.discussion_history.statement_count
         }
\ No newline at end of file
@@ -0,0 +1,356 @@
+import os
+import random
+import re
+import threading
+import time
+
+# Registry of LLM backends. Heavy dependencies (torch, transformers, requests)
+# are only imported when a backend that needs them is first loaded, so workers
+# that run the mock backend never pay for them.
+
+
+class LLMBackend:
+    """Base class for text generation backends."""
+
+    name = None
+
+    # True if generate_batch runs all prompts together rather than one after another
+    supports_batching = False
+
+    # False for backends whose completions aren't worth caching
+    cacheable = True
+
+    def __init__(self):
+        self.import_seconds = 0.0
+
+    def load(self):
+        """Import dependencies and load any models. Called once before first use."""
+        pass
+
+    def sampling_params(self):
+        """Return the settings that affect completions, used as part of response cache keys."""
+        return {}
+
+    def generate(self, prompt, kind="statement"):
+        """
+        Generate a completion for a prompt.
+        kind is "statement" for opening statements and "debate" for counterarguments.
+        """
+        raise NotImplementedError
+
+    def generate_batch(self, prompts, kind="statement"):
+        """Generate completions for several prompts, in the same order (one by one by default)."""
+        return [self.generate(prompt, kind) for prompt in prompts]
+
+    def stream(self, prompt, kind="statement"):
+        """Yield a completion piece by piece (whitespace-delimited tokens by default)."""
+        for token in re.findall(r"\S+\s*", self.generate(prompt, kind)):
+            yield token
+
+
+class MockBackend(LLMBackend):
+    """Returns canned responses without calling a model."""
+
+    name = "mock"
+
+    # Canned responses cost nothing, and caching would always pick the same one for a prompt
+    cacheable = False
+
+    # These are placeholder responses - in a real implementation,
+    # you would call a language model API
+    responses = {
+        "statement": [
+            "I understand we have budget constraints, but I believe investing in Option 3 for this policy area is essential. The long-term benefits outweigh the costs, and we can compensate by selecting Option 1 in other less critical areas.",
+
+            "While I'd prefer Option 3, I recognize our budget limitations. Option 2 offers a reasonable compromise that addresses core needs while remaining fiscally responsible.",
+
+            "From my experience, Option 1 is perfectly adequate here. We need to be practical about our resources and prioritize other areas that need more funding.",
+
+            "Having worked directly with refugees, I can tell you that anything less than Option 3 for this policy would be severely inadequate. We must find the budget elsewhere.",
+
+            "Let's be realistic about what we can afford. Option 2 gives us most of the benefits without breaking the bank. We need to be strategic with our limited resources."
+        ],
+        "debate": [
+            "I appreciate your perspective, but I believe you're overlooking the long-term consequences. My experience has shown that more investment now prevents greater costs later.",
+
+            "While I understand your concern about costs, we need to consider the human impact as well. These are real people whose futures depend on our decisions today.",
+
+            "I respect your idealism, but we must be practical about implementation. The best policy is one we can actually afford to sustain over time.",
+
+            "Having worked directly in this field, I can tell you that your approach won't address the underlying issues. We need a more comprehensive solution.",
+
+            "Perhaps in an ideal world with unlimited resources, but we're making decisions in the real world with real constraints. We need to be strategic."
+        ]
+    }
+
+    def generate(self, prompt, kind="statement"):
+        return random.choice(self.responses[kind])
+
+
+class TransformerBackend(LLMBackend):
+    """
+    Generates text with a local GPT-2-class model from the transformers library.
+
+    Prompts for a whole turn can be generated together: generate_batch left-pads
+    them into one batch so all agents share a single generate() call.
+
+    Parameters:
+    - model_name: Hugging Face model name or local path (default: CHALLENGE_LLM_MODEL or "gpt2")
+    - max_new_tokens: Maximum number of tokens to generate per response
+    """
+
+    name = "transformer"
+    supports_batching = True
+
+    def __init__(self, model_name=None, max_new_tokens=80, temperature=0.9, top_p=0.95):
+        super().__init__()
+        self.model_name = model_name or os.environ.get("CHALLENGE_LLM_MODEL", "gpt2")
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.torch = None
+        self.model = None
+        self.tokenizer = None
+
+    def load(self):
+        start = time.perf_counter()
+        import torch
+        from transformers import GPT2LMHeadModel, GPT2Tokenizer
+        self.import_seconds = time.perf_counter() - start
+
+        self.torch = torch
+        self.tokenizer = GPT2Tokenizer.from_pretrained(self.model_name)
+        self.model = GPT2LMHeadModel.from_pretrained(self.model_name)
+        self._prepare()
+
+    def _prepare(self):
+        """Configure the tokenizer for batching and put the model in inference mode."""
+        # GPT-2 has no padding token; pad on the left so every prompt ends at the same position
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+        self.model.eval()
+
+    def sampling_params(self):
+        return {
+            "model": self.model_name,
+            "max_new_tokens": self.max_new_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p
+        }
+
+    def generate(self, prompt, kind="statement"):
+        return self.generate_batch([prompt], kind)[0]
+
+    def generate_batch(self, prompts, kind="statement"):
+        if not prompts:
+            return []
+
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        with self.torch.no_grad():
+            output = self.model.generate(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_new_tokens=self.max_new_tokens,
+                do_sample=True,
+                top_p=self.top_p,
+                temperature=self.temperature,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+
+        # Every row has the same padded prompt length, so the new tokens start at the same index
+        prompt_length = inputs["input_ids"].shape[1]
+        return [
+            self.tokenizer.decode(row[prompt_length:], skip_special_tokens=True).strip()
+            for row in output
+        ]
+
+
+class _ByteTokenizer:
+    """
+    Minimal byte-level tokenizer with the parts of the transformers tokenizer API
+    used by TransformerBackend. Token IDs 0-255 are bytes, 256 is end-of-text.
+    """
+
+    def __init__(self, max_length=512):
+        self.max_length = max_length
+        self.eos_token_id = 256
+        self.eos_token = "<|endoftext|>"
+        self.pad_token = None
+        self.padding_side = "left"
+        self.torch = None
+
+    @property
+    def pad_token_id(self):
+        return self.eos_token_id
+
+    def __call__(self, texts, return_tensors="pt", padding=True):
+        # Keep the end of long prompts, which holds the instruction
+        encoded = [list(text.encode("utf-8"))[-self.max_length:] for text in texts]
+        length = max(len(ids) for ids in encoded)
+        input_ids = []
+        attention_mask = []
+        for ids in encoded:
+            pad = length - len(ids)
+            input_ids.append([self.pad_token_id] * pad + ids)
+            attention_mask.append([0] * pad + [1] * len(ids))
+        return {
+            "input_ids": self.torch.tensor(input_ids),
+            "attention_mask": self.torch.tensor(attention_mask)
+        }
+
+    def decode(self, ids, skip_special_tokens=True):
+        data = bytes(int(i) for i in ids if int(i) < 256)
+        return data.decode("utf-8", errors="replace")
+
+
+class TinyTransformerBackend(TransformerBackend):
+    """
+    A tiny, randomly initialized GPT-2 with a byte-level tokenizer.
+
+    Produces meaningless text, but exercises the same batched generation path as
+    TransformerBackend without downloading weights. Useful for tests and for
+    measuring batching overhead on CPU.
+    """
+
+    name = "tiny-transformer"
+
+    def __init__(self, max_new_tokens=40, seed=0):
+        super().__init__(model_name="tiny-random-gpt2", max_new_tokens=max_new_tokens)
+        self.seed = seed
+
+    def load(self):
+        start = time.perf_counter()
+        import torch
+        from transformers import GPT2Config, GPT2LMHeadModel
+        self.import_seconds = time.perf_counter() - start
+
+        self.torch = torch
+        torch.manual_seed(self.seed)
+        self.tokenizer = _ByteTokenizer()
+        self.tokenizer.torch = torch
+        config = GPT2Config(
+            vocab_size=257,
+            n_positions=self.tokenizer.max_length + self.max_new_tokens,
+            n_embd=64,
+            n_layer=2,
+            n_head=2,
+            bos_token_id=256,
+            eos_token_id=256
+        )
+        self.model = GPT2LMHeadModel(config)
+        self._prepare()
+
+
+class HTTPBackend(LLMBackend):
+    """
+    Sends prompts to a text generation HTTP service.
+
+    The service receives {"prompt", "kind", "max_new_tokens"} as JSON and must
+    answer with {"text": ...}.
+
+    Parameters:
+    - url: Endpoint URL (default: CHALLENGE_LLM_URL or http://localhost:8080/generate)
+    - timeout: Request timeout in seconds
+    """
+
+    name = "http"
+
+    def __init__(self, url=None, timeout=30, max_new_tokens=80):
+        super().__init__()
+        self.url = url or os.environ.get("CHALLENGE_LLM_URL", "http://localhost:8080/generate")
+        self.timeout = timeout
+        self.max_new_tokens = max_new_tokens
+        self.session = None
+
+    def sampling_params(self):
+        return {"url": self.url, "max_new_tokens": self.max_new_tokens}
+
+    def load(self):
+        start = time.perf_counter()
+        import requests
+        self.import_seconds = time.perf_counter() - start
+        self.session = requests.Session()
+
+    def generate(self, prompt, kind="statement"):
+        response = self.session.post(
+            self.url,
+            json={"prompt": prompt, "kind": kind, "max_new_tokens": self.max_new_tokens},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()["text"].strip()
+
+
+_backend_classes = {}
+_backends = {}
+_backend_stats = {}
+_registry_lock = threading.Lock()
+_load_lock = threading.Lock()
+
+
+def register_backend(backend_class, name=None):
+    """Register a backend class under its name so it can be selected by configuration."""
+    _backend_classes[name or backend_class.name] = backend_class
+    return backend_class
+
+
+def default_backend_name():
+    """Return the backend selected by CHALLENGE_LLM_BACKEND (default: mock)."""
+    return os.environ.get("CHALLENGE_LLM_BACKEND", "mock")
+
+
+def create_backend(name=None, **kwargs):
+    """Create and load a new backend instance, recording how long loading took."""
+    name = name or default_backend_name()
+    if name not in _backend_classes:
+        raise ValueError(f"Unknown LLM backend: {name}. Available: {', '.join(sorted(_backend_classes))}")
+
+    start = time.perf_counter()
+    backend = _backend_classes[name](**kwargs)
+    backend.load()
+    load_seconds = time.perf_counter() - start
+
+    with _registry_lock:
+        stats = _backend_stats.setdefault(name, {"instances": 0, "import_seconds": 0.0, "load_seconds": 0.0})
+        stats["instances"] += 1
+        # Imports are cached by Python, so only the first instance pays for them
+        stats["import_seconds"] = max(stats["import_seconds"], backend.import_seconds)
+        stats["load_seconds"] += load_seconds
+
+    print(f"Loaded LLM backend '{name}' in {load_seconds:.3f}s (imports: {backend.import_seconds:.3f}s)")
+    return backend
+
+
+def get_backend(name=None):
+    """Return the shared instance of a backend, loading it on first use."""
+    name = name or default_backend_name()
+    backend = _backends.get(name)
+    if backend is None:
+        # Only one thread loads a given backend; the others wait for it
+        with _load_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = create_backend(name)
+                _backends[name] = backend
+    return backend
+
+
+def backend_stats():
+    """Return the registered backends and the load/import cost of each loaded one."""
+    with _registry_lock:
+        return {
+            "default_backend": default_backend_name(),
+            "registered": sorted(_backend_classes),
+            "loaded": {name: dict(stats) for name, stats in _backend_stats.items()}
+        }
+
+
+register_backend(MockBackend)
+register_backend(TransformerBackend)
+register_backend(TinyTransformerBackend)
+register_backend(HTTPBackend)
+
+# Example usage:
+# backend = get_backend("mock")
+# print(backend.generate("You are Alex...", kind="debate"))
+# print(backend_stats())
@@ -0,0 +1,153 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from modules.llm_backends import create_backend, default_backend_name
+
+
+class ModelPoolTimeout(Exception):
+    """Raised when no backend instance becomes available within a checkout's timeout."""
+
+
+class ModelPool:
+    """
+    A fixed-size pool of loaded LLM backend instances shared by all sessions in a process.
+
+    Requests check an instance out for the duration of a generation and check it
+    back in afterwards, so any number of sessions share `size` model copies.
+
+    Parameters:
+    - backend_name: Backend to load (default: CHALLENGE_LLM_BACKEND)
+    - size: Number of backend instances to keep loaded
+    """
+
+    def __init__(self, backend_name=None, size=1):
+        self.backend_name = backend_name or default_backend_name()
+        self.size = max(1, size)
+        self._available = queue.Queue()
+        self._instances = []
+        self._lock = threading.Lock()
+        self._backend_profile = None
+
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+
+    def _add_instance(self):
+        """Load one more instance if the pool isn't full. Returns True if one was added."""
+        with self._lock:
+            if len(self._instances) >= self.size:
+                return False
+            # Reserve the slot before loading so concurrent callers don't overshoot
+            self._instances.append(None)
+            slot = len(self._instances) - 1
+
+        try:
+            backend = create_backend(self.backend_name)
+        except Exception:
+            with self._lock:
+                self._instances.pop(slot)
+            raise
+
+        with self._lock:
+            self._instances[slot] = backend
+        self._available.put(backend)
+        return True
+
+    def warmup(self):
+        """Load every instance up front so the first requests don't pay the load cost."""
+        start = time.perf_counter()
+        while self._add_instance():
+            pass
+        print(f"Model pool warmed up: {self.size} x '{self.backend_name}' in {time.perf_counter() - start:.3f}s")
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """
+        Borrow a backend instance, loading one lazily if the pool isn't full yet.
+        Raises ModelPoolTimeout if every instance stays busy for timeout seconds.
+        """
+        try:
+            backend = self._available.get_nowait()
+        except queue.Empty:
+            if self._add_instance():
+                backend = self._available.get()
+            else:
+                # Every instance is busy, wait for one to be checked back in
+                start = time.perf_counter()
+                try:
+                    backend = self._available.get(timeout=timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise ModelPoolTimeout(f"No '{self.backend_name}' instance available within {timeout:.2f}s")
+                with self._lock:
+                    self.waits += 1
+                    self.total_wait_seconds += time.perf_counter() - start
+
+        with self._lock:
+            self.checkouts += 1
+        try:
+            yield backend
+        finally:
+            self._available.put(backend)
+
+    def backend_profile(self):
+        """
+        Return the pooled backend's capabilities: cacheable, supports_batching and sampling_params.
+        All instances share one configuration, so this is read once from any of them.
+        """
+        if self._backend_profile is None:
+            with self.checkout() as backend:
+                self._backend_profile = {
+                    "cacheable": backend.cacheable,
+                    "supports_batching": backend.supports_batching,
+                    "sampling_params": backend.sampling_params()
+                }
+        return self._backend_profile
+
+    def stats(self):
+        """Return pool occupancy and contention statistics."""
+        with self._lock:
+            return {
+                "backend": self.backend_name,
+                "size": self.size,
+                "loaded": len([instance for instance in self._instances if instance is not None]),
+                "available": self._available.qsize(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": self.total_wait_seconds
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_model_pool(backend_name=None):
+    """
+    Return the process-wide pool for a backend, creating it on first use.
+    The pool size is read from CHALLENGE_MODEL_POOL_SIZE (default: 1).
+    """
+    backend_name = backend_name or default_backend_name()
+    with _pools_lock:
+        pool = _pools.get(backend_name)
+        if pool is None:
+            pool = ModelPool(backend_name, size=int(os.environ.get("CHALLENGE_MODEL_POOL_SIZE", 1)))
+            _pools[backend_name] = pool
+        return pool
+
+
+def model_pool_stats():
+    """Return statistics for every pool created in this process."""
+    with _pools_lock:
+        return {name: pool.stats() for name, pool in _pools.items()}
+
+# Example usage:
+# pool = get_model_pool("mock")
+# pool.warmup()
+# with pool.checkout() as backend:
+#     print(backend.generate("You are Alex...", kind="statement"))
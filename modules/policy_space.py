@@ -0,0 +1,315 @@
+import os
+import threading
+import numpy as np
+from modules.budget_calculator import POLICY_AREAS
+
+# Areas that weigh on the justice score
+JUSTICE_CRITICAL_AREAS = ["Access to Education", "Psychosocial Support", "Certification/Accreditation"]
+
+# Pairs of areas whose options should be aligned for the package to be coherent
+COHERENCE_PAIRS = [
+    ("Access to Education", "Language Instruction"),
+    ("Teacher Training", "Curriculum Adaptation"),
+    ("Financial Support", "Psychosocial Support")
+]
+
+# Who a package primarily benefits, as stored in the benefit column
+BENEFIT_STATE = 0
+BENEFIT_BALANCED = 1
+BENEFIT_REFUGEES = 2
+BENEFIT_LABELS = ["state", "balanced", "refugees"]
+
+SCORE_FIELDS = ["equity", "justice", "coherence"]
+TABLE_FIELDS = ["options", "cost", "valid", "option_counts", "equity", "justice", "coherence", "benefit"]
+
+NUM_OPTIONS = 3
+
+
+def package_index(options):
+    """
+    Return the table row of a complete package, given its options (1-3) in POLICY_AREAS order.
+    Each area is one base-3 digit, so there are 3^7 = 2187 rows.
+    """
+    index = 0
+    for option in reversed(options):
+        index = index * NUM_OPTIONS + (option - 1)
+    return index
+
+
+def policies_to_options(policies):
+    """Convert a {policy area: option} dictionary into a list of options in POLICY_AREAS order (0 = not selected)."""
+    return [policies.get(area) or 0 for area in POLICY_AREAS]
+
+
+def score_columns(options):
+    """
+    Compute the package scores for an (N, 7) array of options.
+
+    Uses the same arithmetic, in the same order, as the per-package analysis,
+    so the results are identical to it.
+
+    Returns:
+    - Dictionary of arrays: option_counts (N, 3), equity, justice, coherence and benefit
+    """
+    options = np.asarray(options)
+    option_counts = np.stack([(options == level).sum(axis=1) for level in (1, 2, 3)], axis=1)
+
+    # Equity score (higher = more equitable)
+    equity = (option_counts[:, 2] * 3 + option_counts[:, 1] * 2 + option_counts[:, 0]) / 7
+
+    # Justice score based on certain critical areas (max possible is 1.0)
+    justice_columns = [POLICY_AREAS.index(area) for area in JUSTICE_CRITICAL_AREAS]
+    justice = options[:, justice_columns].sum(axis=1) / (3 * 3)
+
+    # Coherence: closer options in each pair = more coherent
+    coherence = np.zeros(len(options))
+    for area1, area2 in COHERENCE_PAIRS:
+        difference = np.abs(options[:, POLICY_AREAS.index(area1)].astype(np.int64) - options[:, POLICY_AREAS.index(area2)])
+        coherence = coherence + np.where(difference == 0, 1.0, np.where(difference == 1, 0.5, 0.0))
+    coherence = coherence / len(COHERENCE_PAIRS)
+
+    # Who benefits most
+    benefit = np.full(len(options), BENEFIT_BALANCED, dtype=np.int8)
+    benefit[(justice > 0.7) & (equity > 0.6)] = BENEFIT_REFUGEES
+    benefit[equity < 0.4] = BENEFIT_STATE
+
+    return {
+        "option_counts": option_counts.astype(np.int8),
+        "equity": equity,
+        "justice": justice,
+        "coherence": coherence,
+        "benefit": benefit
+    }
+
+
+class PolicySpace:
+    """
+    Precomputed table of every possible policy package (3^7 = 2187 rows).
+
+    Each row holds the package's options, cost, validity (within budget and using
+    a mix of options), option counts and its equity, justice, coherence and benefit
+    scores. Row i is the package with package_index(options) == i.
+    """
+
+    def __init__(self, columns, total_budget):
+        self.total_budget = total_budget
+        for field in TABLE_FIELDS:
+            setattr(self, field, columns[field])
+        self._score_lists = None
+
+    @classmethod
+    def build(cls, total_budget=14):
+        """Compute the table for all packages."""
+        num_areas = len(POLICY_AREAS)
+        indices = np.arange(NUM_OPTIONS ** num_areas)
+        options = np.stack(
+            [(indices // NUM_OPTIONS ** area) % NUM_OPTIONS + 1 for area in range(num_areas)],
+            axis=1
+        ).astype(np.int8)
+
+        columns = score_columns(options)
+        columns["options"] = options
+        # Option n costs n units
+        columns["cost"] = options.sum(axis=1, dtype=np.int16)
+        mixed = (columns["option_counts"] > 0).sum(axis=1) > 1
+        columns["valid"] = (columns["cost"] <= total_budget) & mixed
+        return cls(columns, total_budget)
+
+    def save(self, directory):
+        """Save the table as .npy files so it can be memory-mapped by other processes."""
+        os.makedirs(directory, exist_ok=True)
+        for field in TABLE_FIELDS:
+            np.save(os.path.join(directory, f"{field}.npy"), getattr(self, field))
+        with open(os.path.join(directory, "total_budget.txt"), "w") as f:
+            f.write(str(self.total_budget))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Load a table saved with save(), memory-mapped read-only by default."""
+        with open(os.path.join(directory, "total_budget.txt")) as f:
+            total_budget = int(f.read())
+        columns = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r" if mmap else None)
+            for field in TABLE_FIELDS
+        }
+        return cls(columns, total_budget)
+
+    def __len__(self):
+        return len(self.options)
+
+    def row(self, index):
+        """Return one package as a dictionary of plain Python values."""
+        return {
+            "index": int(index),
+            "policies": {area: int(option) for area, option in zip(POLICY_AREAS, self.options[index])},
+            "cost": int(self.cost[index]),
+            "valid": bool(self.valid[index]),
+            "option_counts": {level: int(count) for level, count in zip((1, 2, 3), self.option_counts[index])},
+            "equity": float(self.equity[index]),
+            "justice": float(self.justice[index]),
+            "coherence": float(self.coherence[index]),
+            "benefit": int(self.benefit[index])
+        }
+
+    def lookup(self, policies):
+        """Return the row of a complete {policy area: option} package."""
+        return self.row(package_index(policies_to_options(policies)))
+
+    def scores(self, policies):
+        """
+        Return (option_counts, equity, justice, coherence, benefit) for a complete package.
+        Reads from plain Python lists, which is cheaper than indexing the arrays for single lookups.
+        """
+        if self._score_lists is None:
+            counts = [{1: c1, 2: c2, 3: c3} for c1, c2, c3 in self.option_counts.tolist()]
+            self._score_lists = (counts, self.equity.tolist(), self.justice.tolist(),
+                                 self.coherence.tolist(), self.benefit.tolist())
+
+        index = 0
+        for area in reversed(POLICY_AREAS):
+            index = index * NUM_OPTIONS + (policies[area] - 1)
+        counts, equity, justice, coherence, benefit = self._score_lists
+        return dict(counts[index]), equity[index], justice[index], coherence[index], benefit[index]
+
+    def feasible_packages(self):
+        """Return the indices of all packages that are within budget and use a mix of options."""
+        return np.flatnonzero(self.valid)
+
+    def pareto_frontier(self, objectives=SCORE_FIELDS, feasible_only=True):
+        """
+        Return the indices of packages not dominated on the given objectives (all maximized).
+        A package is dominated if another is at least as good on every objective and better on one.
+        """
+        candidates = self.feasible_packages() if feasible_only else np.arange(len(self))
+        values = np.stack([np.asarray(getattr(self, objective))[candidates] for objective in objectives], axis=1)
+
+        # Compare every candidate with every other one: (N, N, objectives)
+        at_least_as_good = (values[:, None, :] >= values[None, :, :]).all(axis=2)
+        better = (values[:, None, :] > values[None, :, :]).any(axis=2)
+        dominated = (at_least_as_good & better).any(axis=0)
+        return candidates[~dominated]
+
+    def best_upgrade(self, options, objective="equity", budget=None):
+        """
+        Find the best single-area change to a complete package.
+
+        Parameters:
+        - options: Options (1-3) in POLICY_AREAS order
+        - objective: Score to improve ("equity", "justice" or "coherence")
+        - budget: Spending limit (default: the table's total budget)
+
+        Returns:
+        - Row of the best valid package that differs in one area and improves the
+          objective (ties broken by lower cost), or None if no change helps
+        """
+        budget = self.total_budget if budget is None else budget
+        current = package_index(options)
+        scores = np.asarray(getattr(self, objective))
+
+        neighbours = []
+        for area, option in enumerate(options):
+            for new_option in range(1, NUM_OPTIONS + 1):
+                if new_option != option:
+                    neighbours.append(current + (new_option - option) * NUM_OPTIONS ** area)
+        neighbours = np.array(neighbours)
+
+        neighbours = neighbours[self.valid[neighbours] & (self.cost[neighbours] <= budget)]
+        neighbours = neighbours[scores[neighbours] > scores[current]]
+        if len(neighbours) == 0:
+            return None
+
+        best = neighbours[np.lexsort((self.cost[neighbours], -scores[neighbours]))[0]]
+        return self.row(best)
+
+    def best_completion(self, options, objective="equity", budget=None):
+        """
+        Find the best valid package that keeps every area already selected.
+
+        Parameters:
+        - options: Options in POLICY_AREAS order, 0 for areas not selected yet
+        - objective: Score to maximize ("equity", "justice" or "coherence")
+        - budget: Spending limit (default: the table's total budget)
+
+        Returns:
+        - Row of the best matching package (ties broken by lower cost), or None if none is valid
+        """
+        budget = self.total_budget if budget is None else budget
+        mask = np.asarray(self.valid) & (np.asarray(self.cost) <= budget)
+        for area, option in enumerate(options):
+            if option:
+                mask &= self.options[:, area] == option
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return None
+
+        scores = np.asarray(getattr(self, objective))[candidates]
+        best = candidates[np.lexsort((self.cost[candidates], -scores))[0]]
+        return self.row(best)
+
+
+def packages_to_array(packages):
+    """Convert a list of complete {policy area: option} dictionaries into an (N, 7) int8 array."""
+    return np.array([[package[area] for area in POLICY_AREAS] for package in packages], dtype=np.int8).reshape(-1, len(POLICY_AREAS))
+
+
+def score_packages(options, space=None):
+    """
+    Score many complete packages at once.
+
+    Parameters:
+    - options: (N, 7) array-like of options (1-3), columns in POLICY_AREAS order
+      (see packages_to_array for converting dictionaries)
+    - space: PolicySpace to read from (default: the shared table)
+
+    Returns:
+    - Dictionary of length-N arrays: equity, justice, coherence, benefit (BENEFIT_* codes,
+      see BENEFIT_LABELS), cost and valid. The scores are identical to the ones
+      ChallengeGameController._analyze_policy_package reports.
+    """
+    options = np.asarray(options)
+    if options.ndim != 2 or options.shape[1] != len(POLICY_AREAS):
+        raise ValueError(f"Expected an (N, {len(POLICY_AREAS)}) array of options, got shape {options.shape}")
+    if options.size and (options.min() < 1 or options.max() > NUM_OPTIONS):
+        raise ValueError(f"Options must be between 1 and {NUM_OPTIONS}")
+
+    space = space or get_policy_space()
+    powers = NUM_OPTIONS ** np.arange(len(POLICY_AREAS), dtype=np.int64)
+    indices = ((options.astype(np.int64) - 1) * powers).sum(axis=1)
+
+    return {
+        field: np.asarray(getattr(space, field))[indices]
+        for field in ["equity", "justice", "coherence", "benefit", "cost", "valid"]
+    }
+
+
+_shared_space = None
+_shared_space_lock = threading.Lock()
+
+
+def get_policy_space():
+    """
+    Return the process-wide policy space table, building it on first use.
+    If CHALLENGE_POLICY_TABLE_DIR is set, the table is memory-mapped from that
+    directory (and written there first if it doesn't exist yet), so all worker
+    processes share one copy.
+    """
+    global _shared_space
+    with _shared_space_lock:
+        if _shared_space is None:
+            directory = os.environ.get("CHALLENGE_POLICY_TABLE_DIR")
+            if directory and os.path.exists(os.path.join(directory, "total_budget.txt")):
+                _shared_space = PolicySpace.load(directory)
+            else:
+                _shared_space = PolicySpace.build()
+                if directory:
+                    _shared_space.save(directory)
+                    _shared_space = PolicySpace.load(directory)
+        return _shared_space
+
+# Example usage:
+# space = get_policy_space()
+# print(len(space.feasible_packages()))
+# print(space.pareto_frontier())
+# print(space.best_upgrade([1, 1, 2, 2, 3, 1, 2], objective="justice"))
+# print(score_packages(np.random.randint(1, 4, size=(100000, 7)))["equity"].mean())
@@ -0,0 +1,173 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM completions keyed on the normalized prompt and sampling parameters.
+
+    Parameters:
+    - max_entries: Maximum number of cached completions (0 disables the cache)
+    - ttl_seconds: Age after which a completion is regenerated (0 = never)
+    - persist_path: Optional JSON file the cache is loaded from and saved to
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=0, persist_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+
+        # key -> (completion, created_at), ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if persist_path and os.path.exists(persist_path):
+            self.load()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(prompt, kind, backend_name, sampling_params=None):
+        """Build a cache key from a prompt (with whitespace normalized) and its generation settings."""
+        normalized_prompt = re.sub(r"\s+", " ", prompt).strip()
+        payload = json.dumps(
+            [backend_name, kind, sampling_params or {}, normalized_prompt],
+            sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached completion for a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            completion, created_at = entry
+            if self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return completion
+
+    def put(self, key, completion, created_at=None):
+        """Cache a completion, evicting the least recently used entries if over the limit."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (completion, created_at or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached completions."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, path=None):
+        """Write the cache to disk (atomically, via a temporary file)."""
+        path = path or self.persist_path
+        if not path:
+            return False
+
+        with self._lock:
+            entries = list(self._entries.items())
+
+        # A temporary file of its own, so workers saving to the same path never write into one file
+        directory, name = os.path.split(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=f"{name}.",
+                                         suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            try:
+                json.dump([[key, completion, created_at] for key, (completion, created_at) in entries], f)
+            except BaseException:
+                f.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, path)
+        return True
+
+    def load(self, path=None):
+        """Load cached completions from disk, keeping their original order and age."""
+        path = path or self.persist_path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading response cache from {path}: {e}")
+            return 0
+
+        for key, completion, created_at in entries:
+            self.put(key, completion, created_at)
+        return len(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return size limits, hit/miss counters and the hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persist_path": self.persist_path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide response cache, configured from the environment:
+    - CHALLENGE_RESPONSE_CACHE_SIZE: Maximum cached completions (default: 10000, 0 disables)
+    - CHALLENGE_RESPONSE_CACHE_TTL: Completion lifetime in seconds (default: 0 = never expires)
+    - CHALLENGE_RESPONSE_CACHE_PATH: JSON file to persist the cache in (default: none)
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                max_entries=int(os.environ.get("CHALLENGE_RESPONSE_CACHE_SIZE", 10000)),
+                ttl_seconds=float(os.environ.get("CHALLENGE_RESPONSE_CACHE_TTL", 0)),
+                persist_path=os.environ.get("CHALLENGE_RESPONSE_CACHE_PATH") or None
+            )
+            if _shared_cache.persist_path:
+                atexit.register(_shared_cache.save)
+        return _shared_cache
+
+# Example usage:
+# cache = ResponseCache(max_entries=100)
+# key = ResponseCache.make_key("You are Alex...", "statement", "transformer", {"max_new_tokens": 80})
+# cache.put(key, "I believe Option 3 is essential.")
+# print(cache.get(key), cache.stats())
@@ -0,0 +1,377 @@
+import json
+import queue
+import threading
+import time
+import uuid
+
+# Classroom rooms: many human players share one game session. Every change to the
+# shared game is published once to the room and fanned out to all participants over
+# Server-Sent Events, so one round of agent generation serves the whole class.
+# Rooms live in the memory of the worker that created them, so all participants of
+# a room must reach the same worker process.
+
+# Actions only the room's host may take; everyone can argue
+HOST_ACTIONS = ["set-preference", "start-group-discussion", "finalize-topic", "start-reflection"]
+PLAYER_ACTIONS = ["argument"]
+
+
+def encode_event(event_id, event_type, data):
+    """Encode an event as a Server-Sent Events message."""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscriber:
+    """
+    One participant's connection to a room: a bounded queue of encoded messages.
+    A subscriber that falls max_queue messages behind is closed; its client
+    reconnects and starts again from a fresh snapshot of the room.
+    """
+
+    def __init__(self, player_id, max_queue=256):
+        self.player_id = player_id
+        self.closed = False
+        self._queue = queue.Queue(max_queue)
+
+    def push(self, message):
+        """Queue a message without blocking. Returns False (and closes) if the queue is full."""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.close()
+            return False
+
+    def close(self):
+        """Stop the subscriber; a reader waiting for messages returns."""
+        self.closed = True
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                return
+            except queue.Full:
+                # Make room for the end marker
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def messages(self, heartbeat=15):
+        """Yield queued messages until closed, with a keepalive comment every heartbeat seconds of silence."""
+        while True:
+            try:
+                message = self._queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            yield message
+
+
+class RoomBroadcaster:
+    """
+    Publish/subscribe hub for one room. Each event is encoded once and the same
+    message is queued for every subscriber, so publishing never waits on a slow client.
+
+    Parameters:
+    - max_queue: Messages a subscriber may fall behind before it is disconnected
+    """
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._last_event_id = 0
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, player_id, snapshot=None):
+        """Add a subscriber, optionally queueing a snapshot event as its first message."""
+        subscriber = Subscriber(player_id, self.max_queue)
+        with self._lock:
+            if snapshot is not None:
+                subscriber.push(encode_event(self._last_event_id, "snapshot", snapshot))
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a subscriber and close it."""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        subscriber.close()
+
+    def publish(self, event_type, data):
+        """Send an event to every subscriber. Returns the number of subscribers it was queued for."""
+        with self._lock:
+            # Encoding and queueing under the lock keeps every subscriber's events in publish order
+            self._last_event_id += 1
+            message = encode_event(self._last_event_id, event_type, data)
+            delivered = 0
+            for subscriber in self._subscribers:
+                if subscriber.push(message):
+                    delivered += 1
+            if delivered < len(self._subscribers):
+                dropped = [subscriber for subscriber in self._subscribers if subscriber.closed]
+                self._subscribers = [subscriber for subscriber in self._subscribers if not subscriber.closed]
+                self.dropped += len(dropped)
+            self.published += 1
+            self.delivered += delivered
+        return delivered
+
+    def close(self):
+        """Disconnect every subscriber."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def stats(self):
+        """Return publish and delivery counters."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped_subscribers": self.dropped
+            }
+
+
+class Room:
+    """
+    A classroom game: participants sharing the game session session_id.
+    The host (the participant who created the room) moves the game through its
+    phases and decides each topic; every participant can argue in the discussion.
+    """
+
+    def __init__(self, room_id, session_id, host_name, max_queue=256):
+        self.room_id = room_id
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_activity = self.created_at  # last join, leave, connection or action
+        self.participants = {}  # player_id -> name
+        self.broadcaster = RoomBroadcaster(max_queue)
+        self._lock = threading.Lock()
+        self.host_id = self.join(host_name)
+
+    def join(self, name):
+        """Add a participant and return their player ID."""
+        player_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self.last_activity = time.time()
+            self.participants[player_id] = name
+            count = len(self.participants)
+        self.broadcaster.publish("joined", {"player_id": player_id, "name": name, "participants": count})
+        return player_id
+
+    def leave(self, player_id):
+        """Remove a participant. Returns False if they weren't in the room."""
+        with self._lock:
+            self.last_activity = time.time()
+            name = self.participants.pop(player_id, None)
+            count = len(self.participants)
+        if name is None:
+            return False
+        self.broadcaster.publish("left", {"player_id": player_id, "name": name, "participants": count})
+        return True
+
+    def snapshot(self, controller):
+        """Return the current state of the room's game, sent to each participant when they connect."""
+        with self._lock:
+            self.last_activity = time.time()
+            participants = [{"player_id": player_id, "name": name} for player_id, name in self.participants.items()]
+        return {
+            "room_id": self.room_id,
+            "host_id": self.host_id,
+            "participants": participants,
+            "phase": controller.current_phase,
+            "current_topic": controller.current_topic,
+            "policies": controller.budget_calculator.selected_policies,
+            "remaining_budget": controller.budget_calculator.get_remaining_budget(),
+            "agent_profiles": controller.agent_profiles,
+            "recent_discussion": controller.discussion_history[-20:]
+        }
+
+    def perform(self, controller, player_id, action, params):
+        """
+        Apply a participant's action to the room's game and publish what changed.
+
+        Parameters:
+        - controller: The room's ChallengeGameController, checked out from the session store
+        - player_id: The acting participant
+        - action: One of HOST_ACTIONS or PLAYER_ACTIONS
+        - params: The action's parameters (as for the matching single-player endpoint)
+
+        Returns:
+        - The controller's result, as returned to the acting participant
+        """
+        name = self.participants.get(player_id)
+        if name is None:
+            return {"success": False, "message": "You are not in this room."}
+        if action in HOST_ACTIONS and player_id != self.host_id:
+            return {"success": False, "message": "Only the host can do that."}
+        if action not in HOST_ACTIONS and action not in PLAYER_ACTIONS:
+            return {"success": False, "message": f"Unknown action: {action}"}
+        self.last_activity = time.time()
+
+        # Options are checked here, so a missing or malformed one is an error result
+        option_field = {"set-preference": "option", "argument": "preferred_option", "finalize-topic": "option"}.get(action)
+        if option_field is not None:
+            try:
+                option = int(params.get(option_field))
+            except (TypeError, ValueError):
+                return {"success": False, "message": f"{option_field} must be 1, 2, or 3."}
+
+        if action == "set-preference":
+            result = controller.set_human_preference(params.get("policy_area"), option)
+            if result["success"]:
+                self.broadcaster.publish("preference", {
+                    "policy_area": params.get("policy_area"),
+                    "option": option,
+                    "remaining_budget": result["remaining_budget"]
+                })
+
+        elif action == "start-group-discussion":
+            result = controller.start_group_discussion()
+            if result["success"]:
+                self.broadcaster.publish("phase", {"phase": "group", "current_topic": result["current_topic"],
+                                                   "message": result["message"]})
+                result.update(self._publish_opening_statements(controller))
+
+        elif action == "argument":
+            argument = params.get("argument")
+            topic = controller.current_topic
+            result = controller.submit_human_argument(argument, option)
+            if result["success"]:
+                self.broadcaster.publish("argument", {"player_id": player_id, "name": name, "topic": topic,
+                                                      "argument": argument, "preferred_option": option})
+                self.broadcaster.publish("statements", {"topic": topic, "statements": result["responses"]})
+
+        elif action == "finalize-topic":
+            topic = controller.current_topic
+            result = controller.finalize_topic_decision(option)
+            if result["success"]:
+                self.broadcaster.publish("decision", {
+                    "topic": topic,
+                    "option": option,
+                    "next_topic": result.get("next_topic"),
+                    "remaining_budget": result["remaining_budget"],
+                    "is_final_topic": result["is_final_topic"]
+                })
+                if not result["is_final_topic"]:
+                    result.update(self._publish_opening_statements(controller))
+
+        else:  # start-reflection
+            result = controller.start_reflection_phase()
+            if result["success"]:
+                result.update(controller.get_agent_reflections())
+                self.broadcaster.publish("reflection", result)
+
+        return result
+
+    def _publish_opening_statements(self, controller):
+        """Generate the agents' opening statements on the current topic once and send them to everyone."""
+        statements = controller.get_agent_opening_statements()
+        if statements["success"]:
+            self.broadcaster.publish("statements", {"topic": statements["topic"], "statements": statements["statements"]})
+        return statements
+
+    def close(self):
+        """Disconnect all participants."""
+        self.broadcaster.publish("closed", {"room_id": self.room_id})
+        self.broadcaster.close()
+
+    def stats(self):
+        """Return participant and broadcast counters."""
+        return {"room_id": self.room_id, "participants": len(self.participants), **self.broadcaster.stats()}
+
+
+class RoomManager:
+    """
+    The rooms of this worker process.
+
+    Parameters:
+    - max_rooms: Maximum number of open rooms
+    - max_queue: Messages a participant may fall behind before being disconnected
+    - idle_timeout: Seconds without joins, leaves, connections or actions after which
+      an abandoned room is closed (0 keeps rooms until they are closed)
+    - on_close: Called with each room after it is closed or expires, e.g. to delete its game session
+    """
+
+    def __init__(self, max_rooms=100, max_queue=256, idle_timeout=3600, on_close=None):
+        self.max_rooms = max_rooms
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.on_close = on_close
+        self._rooms = {}
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def _discard_idle(self, now):
+        """Remove idle rooms (call with the lock held) and return them, to be closed after releasing the lock."""
+        if not self.idle_timeout:
+            return []
+        idle = [room for room in self._rooms.values() if now - room.last_activity > self.idle_timeout]
+        for room in idle:
+            del self._rooms[room.room_id]
+        self.expired += len(idle)
+        return idle
+
+    def create(self, session_id, host_name):
+        """Open a room for an existing game session. Returns None when the room limit is reached."""
+        room = None
+        with self._lock:
+            idle = self._discard_idle(time.time())
+            if len(self._rooms) < self.max_rooms:
+                room_id = uuid.uuid4().hex[:8]
+                room = Room(room_id, session_id, host_name, self.max_queue)
+                self._rooms[room_id] = room
+        for expired_room in idle:
+            self._close(expired_room)
+        return room
+
+    def get(self, room_id):
+        """Return a room, or None if it does not exist."""
+        with self._lock:
+            return self._rooms.get(room_id)
+
+    def close(self, room_id):
+        """Close a room and disconnect its participants. Returns False if it didn't exist."""
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+        if room is None:
+            return False
+        self._close(room)
+        return True
+
+    def _close(self, room):
+        """Disconnect a room that was removed from the open rooms and let on_close clean up after it."""
+        room.close()
+        if self.on_close is not None:
+            try:
+                self.on_close(room)
+            except Exception as e:
+                print(f"Error cleaning up room {room.room_id}: {e}")
+
+    def stats(self):
+        """Return the statistics of every open room."""
+        with self._lock:
+            rooms = list(self._rooms.values())
+        return {"rooms": len(rooms), "max_rooms": self.max_rooms, "expired": self.expired,
+                "room_stats": [room.stats() for room in rooms]}
+
+# Example usage:
+# rooms = RoomManager()
+# room = rooms.create(session_id, "Teacher")
+# student_id = room.join("Sam")
+# subscriber = room.broadcaster.subscribe(student_id, room.snapshot(controller))
+# room.perform(controller, student_id, "argument", {"argument": "Everyone deserves access.", "preferred_option": 3})
+# for message in subscriber.messages():
+#     print(message)
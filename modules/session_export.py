@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from modules.policy_space import get_policy_space, BENEFIT_LABELS
+from modules.session_journal import SessionJournal
+from modules.session_store import SQLiteSessionStore
+
+# Export streams of session records for offline analysis. Records are built and
+# encoded one session at a time and written out in chunks of about CHUNK_SIZE
+# bytes, so memory use doesn't grow with the number of sessions exported.
+
+EXPORT_FORMATS = ["ndjson", "gzip"]
+EXPORT_PHASES = ["setup", "individual", "group", "reflection"]
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_time(value):
+    """
+    Parse a time filter given as a Unix timestamp or an ISO 8601 date/time (local time
+    unless it has an offset). Returns None for an empty value.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def session_record(session_id, controller, updated_at):
+    """
+    Summarize one session as a JSON-serializable dictionary: the current package and its
+    scores, the human's and agents' preferences, and discussion statistics.
+    In the group and reflection phases the package is the group's; before that it is the human's.
+    """
+    budget_calculator = controller.budget_calculator
+    policies = dict(budget_calculator.selected_policies)
+    complete = budget_calculator.has_complete_policy_set()
+
+    scores = None
+    if complete:
+        option_counts, equity, justice, coherence, benefit = get_policy_space().scores(policies)
+        scores = {
+            "equity": equity,
+            "justice": justice,
+            "coherence": coherence,
+            "benefit": BENEFIT_LABELS[benefit],
+            "option_counts": option_counts
+        }
+
+    agents = []
+    for agent in controller.agent_profiles:
+        preferences = controller.agent_preferences[agent["id"]]
+        agents.append({
+            "id": agent["id"],
+            "name": agent["name"],
+            "political_stance": agent["political_stance"],
+            "occupation": agent["occupation"],
+            "preferences": preferences,
+            # Areas where the package matches the agent's preference (only once every area is decided)
+            "matches": sum(1 for area, option in policies.items() if preferences[area] == option) if complete else None
+        })
+
+    history = controller.discussion_history
+    return {
+        "session_id": session_id,
+        "seed": controller.seed,
+        "phase": controller.current_phase,
+        "updated_at": updated_at,
+        "policies": policies,
+        "complete": complete,
+        "cost": budget_calculator.calculate_current_usage(),
+        "valid": budget_calculator.is_valid_policy_set(),
+        "scores": scores,
+        "human_preferences": controller.human_preferences,
+        "agents": agents,
+        "discussion": {
+            "current_topic": controller.current_topic,
+            "statements": history.statement_count,
+            "decisions": len(history) - history.statement_count,
+            "contribution_counts": history.contribution_counts(),
+            "topic_statement_counts": history.topic_statement_counts()
+        }
+    }
+
+
+def export_records(source, phase=None, since=None, until=None):
+    """
+    Yield a record (see session_record) for every session in a source: a session
+    store, or a SessionJournal for sessions journaled by a server that isn't running.
+    """
+    for session_id, controller, updated_at in source.iter_sessions(phase=phase, since=since, until=until):
+        yield session_record(session_id, controller, updated_at)
+
+
+def ndjson_chunks(records, chunk_size=CHUNK_SIZE):
+    """Encode records as NDJSON, yielding bytes in chunks of about chunk_size."""
+    lines = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(lines)
+            lines = []
+            size = 0
+    if lines:
+        yield b"".join(lines)
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip stream, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_sessions(source, format="ndjson", phase=None, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream the records of a source's sessions as bytes.
+
+    Parameters:
+    - source: Session store or SessionJournal
+    - format: "ndjson" or "gzip" (gzip-compressed NDJSON)
+    - phase: Only sessions in this game phase
+    - since, until: Only sessions last updated in [since, until) (Unix timestamps)
+
+    Returns:
+    - Generator of byte chunks
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    if phase is not None and phase not in EXPORT_PHASES:
+        raise ValueError(f"Unknown phase: {phase}")
+
+    chunks = ndjson_chunks(export_records(source, phase, since, until), chunk_size)
+    if format == "gzip":
+        chunks = gzip_chunks(chunks)
+    return chunks
+
+
+def open_export_source(config, db_path=None, journal_dir=None):
+    """
+    Open the sessions of a server from outside it: the SQLite session database or,
+    for the memory backend, its journal directory.
+    """
+    journal_dir = journal_dir or (None if db_path else config.get("CHALLENGE_SESSION_JOURNAL_DIR"))
+    if journal_dir:
+        return SessionJournal(journal_dir)
+    if db_path or config.get("CHALLENGE_SESSION_BACKEND") == "sqlite":
+        db_path = db_path or config.get("CHALLENGE_SESSION_DB", "challenge_sessions.db")
+        if not os.path.exists(db_path):
+            raise ValueError(f"Session database not found: {db_path}")
+        return SQLiteSessionStore(db_path, ttl_seconds=0, sweep_interval=0)
+    raise ValueError("Sessions of the memory backend can only be exported from the server "
+                     "(GET /api/export-sessions) unless CHALLENGE_SESSION_JOURNAL_DIR is set")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export CHALLENGE game sessions as NDJSON for offline analysis.")
+    parser.add_argument("--output", default="-", help="Output file (default: standard output)")
+    parser.add_argument("--format", default=None, choices=EXPORT_FORMATS,
+                        help="Output format (default: gzip if the output file ends in .gz, else ndjson)")
+    parser.add_argument("--phase", default=None, choices=EXPORT_PHASES, help="Only sessions in this phase")
+    parser.add_argument("--since", default=None, help="Only sessions updated at or after this time (Unix time or ISO 8601)")
+    parser.add_argument("--until", default=None, help="Only sessions updated before this time (Unix time or ISO 8601)")
+    parser.add_argument("--db", default=None, help="SQLite session database (default: from CHALLENGE_SESSION_DB)")
+    parser.add_argument("--journal-dir", default=None, help="Session journal directory (default: from CHALLENGE_SESSION_JOURNAL_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_export_source(os.environ, args.db, args.journal_dir)
+        since, until = parse_time(args.since), parse_time(args.until)
+    except ValueError as e:
+        parser.error(str(e))
+
+    export_format = args.format or ("gzip" if args.output.endswith(".gz") else "ndjson")
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    try:
+        for chunk in export_sessions(source, export_format, args.phase, since, until):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    print(f"Exported {written} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+# Example usage:
+# python -m modules.session_export --db challenge_sessions.db --phase reflection --since 2024-05-01 --output sessions.ndjson.gz
+#
+# for record in export_records(store, phase="reflection"):
+#     print(record["session_id"], record["scores"])
@@ -0,0 +1,228 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import quote, unquote
+from modules.game_controller import ChallengeGameController
+
+
+class SessionJournal:
+    """
+    Append-only journal of game sessions, so a restarted worker can restore them.
+
+    Each session has an NDJSON file whose first line is a snapshot of the
+    controller state, followed by one line per state change (see
+    ChallengeGameController._record). Events carry everything needed to redo
+    them, including generated statements, so replaying never calls the model.
+    After snapshot_every events the file is compacted into a fresh snapshot,
+    which keeps replay to a bounded number of events per session.
+
+    Parameters:
+    - directory: Directory holding one journal file per session
+    - snapshot_every: Events after which a session's journal is compacted
+    - fsync: Whether to fsync after every write (slower, but survives power loss)
+    """
+
+    SUFFIX = ".ndjson"
+
+    def __init__(self, directory, snapshot_every=50, fsync=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        # session_id -> events written since the last snapshot
+        self._event_counts = {}
+        self._lock = threading.Lock()
+
+        self.events_written = 0
+        self.snapshots_written = 0
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, quote(session_id, safe="") + self.SUFFIX)
+
+    def _write(self, file, lines):
+        file.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+
+    def snapshot(self, session_id, controller):
+        """Replace a session's journal with a snapshot of its current state."""
+        path = self._path(session_id)
+        # A temporary file of its own, so concurrent snapshots of a session never write into one file
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory,
+                                         prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            try:
+                self._write(f, [{"t": "snapshot", "session_id": session_id, "ts": time.time(), "state": controller.to_state()}])
+            except BaseException:
+                f.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._event_counts[session_id] = 0
+            self.snapshots_written += 1
+
+    def append(self, session_id, controller):
+        """
+        Write the controller's pending journal events, compacting the journal into a
+        new snapshot once enough events have built up.
+        """
+        events = controller.journal_events
+        if not events:
+            return 0
+
+        with self._lock:
+            count = self._event_counts.get(session_id)
+        if count is None or count + len(events) >= self.snapshot_every:
+            # No journal yet in this process, or time to compact
+            self.snapshot(session_id, controller)
+        else:
+            with open(self._path(session_id), "a", encoding="utf-8") as f:
+                self._write(f, events)
+            with self._lock:
+                self._event_counts[session_id] = count + len(events)
+
+        written = len(events)
+        with self._lock:
+            self.events_written += written
+        del events[:]
+        return written
+
+    def delete(self, session_id):
+        """Remove a session's journal."""
+        with self._lock:
+            self._event_counts.pop(session_id, None)
+        try:
+            os.remove(self._path(session_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def load(self, session_id):
+        """
+        Rebuild one session from its journal.
+
+        Returns:
+        - (controller, last_change_timestamp, events_replayed), or None if the session
+          has no journal. A partially written last line (from a crash mid-write) is ignored.
+        """
+        path = self._path(session_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+
+        snapshot = json.loads(lines[0])
+        controller = ChallengeGameController.from_state(snapshot["state"])
+        last_change = snapshot["ts"]
+        replayed = 0
+        for line in lines[1:]:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            controller.apply_journal_event(event)
+            last_change = event["ts"]
+            replayed += 1
+
+        with self._lock:
+            self._event_counts[session_id] = replayed
+        return controller, last_change, replayed
+
+    def session_ids(self):
+        """Return the IDs of all sessions with a journal."""
+        return [
+            unquote(name[:-len(self.SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(self.SUFFIX)
+        ]
+
+    def iter_sessions(self, phase=None, since=None, until=None):
+        """
+        Yield (session_id, controller, last_change) for every journaled session, rebuilding
+        one at a time, with the same filters as SessionStore.iter_sessions.
+        """
+        for session_id in self.session_ids():
+            # A journal is written on every change, so its mtime bounds the last change
+            try:
+                if since is not None and os.path.getmtime(self._path(session_id)) < since:
+                    continue
+                loaded = self.load(session_id)
+            except (OSError, ValueError) as e:
+                print(f"Error reading the journal of session {session_id}: {e}")
+                continue
+            if loaded is None:
+                continue
+
+            controller, last_change, _ = loaded
+            if since is not None and last_change < since:
+                continue
+            if until is not None and last_change >= until:
+                continue
+            if phase is None or controller.current_phase == phase:
+                yield session_id, controller, last_change
+
+    def restore(self, store, max_age=0):
+        """
+        Load every journaled session into a session store.
+
+        Sessions idle for longer than max_age seconds (0 = no limit) are removed
+        instead, as are journals that can't be read. Sessions the store already
+        has are left alone. Each session keeps the time of its last journaled change
+        as its last access, so it expires (and is evicted) as if the server had kept running.
+
+        Returns:
+        - Number of sessions restored
+        """
+        start = time.perf_counter()
+        now = time.time()
+        loaded_sessions = []
+        for session_id in self.session_ids():
+            if session_id in store:
+                continue
+            try:
+                loaded = self.load(session_id)
+            except Exception as e:
+                print(f"Error restoring session {session_id} from its journal: {e}")
+                self.delete(session_id)
+                continue
+            if loaded is None:
+                continue
+
+            controller, last_change, _ = loaded
+            if max_age > 0 and now - last_change > max_age:
+                self.delete(session_id)
+                continue
+            loaded_sessions.append((last_change, session_id, controller))
+
+        # Least recently changed first, so the store's LRU order matches the sessions' ages
+        loaded_sessions.sort(key=lambda loaded: loaded[0])
+        for last_change, session_id, controller in loaded_sessions:
+            store.put(session_id, controller, journal=False, last_access=last_change)
+        restored = len(loaded_sessions)
+
+        print(f"Restored {restored} sessions from {self.directory} in {time.perf_counter() - start:.3f}s")
+        return restored
+
+    def stats(self):
+        """Return journal write counters."""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "snapshot_every": self.snapshot_every,
+                "sessions": len(self._event_counts),
+                "events_written": self.events_written,
+                "snapshots_written": self.snapshots_written
+            }
+
+# Example usage:
+# journal = SessionJournal("journal", snapshot_every=50)
+# store = MemorySessionStore(sweep_interval=0)
+# store.journal = journal
+# journal.restore(store, max_age=3600)
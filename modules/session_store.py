@@ -0,0 +1,618 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from modules.game_controller import ChallengeGameController
+from modules.session_journal import SessionJournal
+
+
+class SessionLockTimeout(Exception):
+    """Raised when a session stays locked by another request for too long."""
+    pass
+
+
+def serialize_controller(controller):
+    """Serialize a controller's state into a compact compressed JSON blob."""
+    state = json.dumps(controller.to_state(), separators=(",", ":"))
+    return zlib.compress(state.encode("utf-8"))
+
+
+def deserialize_controller(blob):
+    """Rebuild a controller from a blob produced by serialize_controller()."""
+    state = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return ChallengeGameController.from_state(state)
+
+
+class SessionStore:
+    """
+    Base class for game session storage backends.
+
+    A store maps session IDs to ChallengeGameController instances. Routes should
+    use the session() context manager so that backends can lock the session
+    and persist any changes made while it is checked out.
+
+    If a SessionJournal is attached as journal, the changes made to each
+    checked-out controller are appended to its journal when it is saved.
+    """
+
+    _sweeper_thread = None
+    sweep_interval = 0
+    journal = None
+
+    def get(self, session_id):
+        """Return the controller for a session, or None if it does not exist."""
+        raise NotImplementedError
+
+    def put(self, session_id, controller):
+        """Store a controller under the given session ID."""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        """Remove a session. Returns True if the session existed."""
+        raise NotImplementedError
+
+    def save(self, session_id, controller, token=None):
+        """
+        Persist changes made to a checked-out controller (no-op by default).
+        token is the lock token returned by _lock_session for the checkout.
+        """
+        pass
+
+    def sweep(self):
+        """Remove expired sessions. Returns the number of sessions removed."""
+        return 0
+
+    def iter_sessions(self, phase=None, since=None, until=None):
+        """
+        Yield (session_id, controller, updated_at) for every stored session, one at a time.
+
+        Parameters:
+        - phase: Only sessions in this game phase (setup, individual, group, reflection)
+        - since, until: Only sessions last updated in [since, until) (Unix timestamps)
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """Return a dictionary of store statistics."""
+        return {}
+
+    def start_sweeper(self):
+        """Start the background thread that periodically removes expired sessions."""
+        if self._sweeper_thread and self._sweeper_thread.is_alive():
+            return False
+
+        self._stop_sweeper.clear()
+        self._sweeper_thread = threading.Thread(target=self._sweep_loop)
+        self._sweeper_thread.daemon = True
+        self._sweeper_thread.start()
+        return True
+
+    def stop_sweeper(self):
+        """Stop the background sweeper thread."""
+        self._stop_sweeper.set()
+        if self._sweeper_thread:
+            self._sweeper_thread.join(timeout=1)
+            self._sweeper_thread = None
+        return True
+
+    def _sweep_loop(self):
+        """Background loop for the sweeper thread."""
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
+
+    def _lock_session(self, session_id):
+        """Acquire the per-session lock and return a token for releasing it (no-op by default)."""
+        return None
+
+    def _unlock_session(self, session_id, token):
+        """Release a per-session lock acquired by _lock_session (no-op by default)."""
+        pass
+
+    @contextmanager
+    def session(self, session_id):
+        """
+        Check out a session for the duration of a request.
+        Yields the controller (or None if the session does not exist) and
+        saves it back when the block exits without an error, or when a streaming
+        response using it is closed early because its client disconnected.
+        If the block raises, _abort decides what happens to the changes made so far.
+        """
+        token = self._lock_session(session_id)
+        controller = None
+        try:
+            controller = self.get(session_id)
+            if controller is not None and self.journal is not None:
+                controller.journal_events = []
+            try:
+                yield controller
+            except GeneratorExit:
+                # Keep the changes made before the client went away
+                self._commit(session_id, controller, token)
+                raise
+            except Exception:
+                self._abort(session_id, controller)
+                raise
+            self._commit(session_id, controller, token)
+        finally:
+            if controller is not None:
+                controller.journal_events = None
+            self._unlock_session(session_id, token)
+
+    def _commit(self, session_id, controller, token=None):
+        """Save a checked-out session and journal its changes."""
+        if controller is not None:
+            self.save(session_id, controller, token)
+            if self.journal is not None:
+                self.journal.append(session_id, controller)
+
+    def _abort(self, session_id, controller):
+        """
+        Handle a checkout whose block raised. By default the changes are dropped: the
+        controller is a copy that is neither saved nor journaled.
+        """
+        pass
+
+    def _forget_journals(self, session_ids):
+        """Remove the journals of sessions that were evicted or expired."""
+        if self.journal is not None:
+            for session_id in session_ids:
+                self.journal.delete(session_id)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def __getitem__(self, session_id):
+        controller = self.get(session_id)
+        if controller is None:
+            raise KeyError(session_id)
+        return controller
+
+    def __setitem__(self, session_id, controller):
+        self.put(session_id, controller)
+
+    def __delitem__(self, session_id):
+        if not self.delete(session_id):
+            raise KeyError(session_id)
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process session store with a size cap, idle TTL and LRU eviction.
+
+    Parameters:
+    - max_sessions: Maximum number of sessions kept in memory (0 = unlimited)
+    - ttl_seconds: Idle time after which a session expires (0 = never)
+    - sweep_interval: Seconds between background sweeps (0 = no sweeper thread)
+    """
+
+    def __init__(self, max_sessions=1000, ttl_seconds=3600, sweep_interval=60):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+
+        # session_id -> (controller, last_access), ordered from least to most recently used
+        self._sessions = OrderedDict()
+        self._lock = threading.RLock()
+        self._session_locks = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._stop_sweeper = threading.Event()
+        if sweep_interval > 0:
+            self.start_sweeper()
+
+    def _is_expired(self, last_access, now):
+        return self.ttl_seconds > 0 and now - last_access > self.ttl_seconds
+
+    def _abort(self, session_id, controller):
+        """
+        Journal the changes made before a checkout's block raised. The controller is the
+        live one, so it keeps those changes, and the journal has to as well for a restart
+        to restore the session as it is in memory.
+        """
+        if controller is None or self.journal is None:
+            return
+        try:
+            self.journal.append(session_id, controller)
+        except Exception as e:
+            print(f"Error journaling session {session_id} after a failed request: {e}")
+
+    def get(self, session_id):
+        """Return the controller for a session and mark it as recently used."""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            controller, last_access = entry
+            if not self._is_expired(last_access, now):
+                self._sessions[session_id] = (controller, now)
+                self._sessions.move_to_end(session_id)
+                self.hits += 1
+                return controller
+
+            del self._sessions[session_id]
+            self.expirations += 1
+            self.misses += 1
+        self._forget_journals([session_id])
+        return None
+
+    def put(self, session_id, controller, journal=True, last_access=None):
+        """
+        Store a controller, evicting the least recently used sessions if over the cap.
+        With a journal attached, the new session is snapshotted unless journal is False.
+        last_access sets the time the session was last used (default: now), e.g. for a restored session.
+        """
+        evicted = []
+        with self._lock:
+            self._sessions[session_id] = (controller, time.time() if last_access is None else last_access)
+            self._sessions.move_to_end(session_id)
+
+            if self.max_sessions > 0:
+                while len(self._sessions) > self.max_sessions:
+                    evicted_id, _ = self._sessions.popitem(last=False)
+                    self._session_locks.pop(evicted_id, None)
+                    self.evictions += 1
+                    evicted.append(evicted_id)
+
+        self._forget_journals(evicted)
+        if journal and self.journal is not None:
+            self.journal.snapshot(session_id, controller)
+
+    def delete(self, session_id):
+        """Remove a session. Returns True if the session existed."""
+        with self._lock:
+            self._session_locks.pop(session_id, None)
+            existed = self._sessions.pop(session_id, None) is not None
+        self._forget_journals([session_id])
+        return existed
+
+    def sweep(self):
+        """Remove all sessions that have been idle for longer than the TTL."""
+        if self.ttl_seconds <= 0:
+            return 0
+
+        now = time.time()
+        removed = []
+        with self._lock:
+            # Entries are in LRU order, so stop at the first one that is still fresh
+            while self._sessions:
+                session_id, (_, last_access) = next(iter(self._sessions.items()))
+                if not self._is_expired(last_access, now):
+                    break
+                del self._sessions[session_id]
+                self._session_locks.pop(session_id, None)
+                removed.append(session_id)
+            self.expirations += len(removed)
+        self._forget_journals(removed)
+        return len(removed)
+
+    def iter_sessions(self, phase=None, since=None, until=None):
+        """
+        Yield (session_id, controller, last_access) for the sessions in this worker.
+        Controllers are the live objects and are not locked, so a session that is
+        being played may be seen between two changes.
+        """
+        now = time.time()
+        with self._lock:
+            entries = [
+                (session_id, controller, last_access)
+                for session_id, (controller, last_access) in self._sessions.items()
+                if not self._is_expired(last_access, now)
+                and (since is None or last_access >= since)
+                and (until is None or last_access < until)
+            ]
+
+        for session_id, controller, last_access in entries:
+            if phase is None or controller.current_phase == phase:
+                yield session_id, controller, last_access
+
+    def _lock_session(self, session_id):
+        with self._lock:
+            lock = self._session_locks.setdefault(session_id, threading.RLock())
+        lock.acquire()
+        return lock
+
+    def _unlock_session(self, session_id, token):
+        token.release()
+        with self._lock:
+            # Don't keep locks around for sessions that no longer exist
+            if session_id not in self._sessions and self._session_locks.get(session_id) is token:
+                del self._session_locks[session_id]
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+        if self.journal is not None:
+            stats["journal"] = self.journal.stats()
+        return stats
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store shared by all worker processes on a node, backed by SQLite in WAL mode.
+
+    Controllers are serialized into compressed JSON blobs. While a session is
+    checked out, a lease on its row keeps other requests (in any process)
+    from working on the same session.
+
+    Parameters:
+    - path: Path to the SQLite database file
+    - ttl_seconds: Idle time after which a session expires (0 = never)
+    - sweep_interval: Seconds between background sweeps (0 = no sweeper thread)
+    - lock_timeout: Seconds to wait for a locked session before giving up
+    - lock_lease: Seconds after which a lock held by a crashed worker is considered stale
+    """
+
+    def __init__(self, path="challenge_sessions.db", ttl_seconds=3600, sweep_interval=60,
+                 lock_timeout=10, lock_lease=30):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.lock_timeout = lock_timeout
+        self.lock_lease = lock_lease
+
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self._counter_lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, "
+            "state BLOB NOT NULL, "
+            "updated_at REAL NOT NULL, "
+            "lock_owner TEXT, "
+            "lock_expires REAL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+        self._stop_sweeper = threading.Event()
+        if sweep_interval > 0:
+            self.start_sweeper()
+
+    def _connection(self):
+        """Return this thread's database connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.lock_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter, amount=1):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, session_id):
+        """Load and deserialize a session, or return None if it does not exist or has expired."""
+        row = self._connection().execute(
+            "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        state, updated_at = row
+        if self.ttl_seconds > 0 and time.time() - updated_at > self.ttl_seconds:
+            self.delete(session_id)
+            self._count("expirations")
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return deserialize_controller(state)
+
+    def put(self, session_id, controller):
+        """Store a controller under the given session ID, replacing any existing session."""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+            (session_id, serialize_controller(controller), time.time())
+        )
+
+    def save(self, session_id, controller, token=None):
+        """
+        Write a checked-out controller back to the database.
+        With a lock token, the write only happens while that lease is still held; if the
+        lease ran out and another request took the session, SessionLockTimeout is raised
+        instead of overwriting its changes.
+        """
+        if token is None:
+            self._connection().execute(
+                "UPDATE sessions SET state = ?, updated_at = ? WHERE session_id = ?",
+                (serialize_controller(controller), time.time(), session_id)
+            )
+            return
+
+        cursor = self._connection().execute(
+            "UPDATE sessions SET state = ?, updated_at = ? WHERE session_id = ? AND lock_owner = ?",
+            (serialize_controller(controller), time.time(), session_id, token)
+        )
+        if cursor.rowcount == 0:
+            raise SessionLockTimeout(f"Session {session_id} was taken over by another request before it was saved")
+
+    def delete(self, session_id):
+        """Remove a session. Returns True if the session existed."""
+        cursor = self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def sweep(self):
+        """Remove all sessions that have been idle for longer than the TTL."""
+        if self.ttl_seconds <= 0:
+            return 0
+
+        cursor = self._connection().execute(
+            "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self._count("expirations", cursor.rowcount)
+        return cursor.rowcount
+
+    def iter_sessions(self, phase=None, since=None, until=None, batch_size=100):
+        """
+        Yield (session_id, controller, updated_at) for every session, oldest update first.
+        Rows are read batch_size at a time, so no read transaction stays open while
+        the caller works through the sessions.
+        """
+        connection = self._connection()
+        position = (float("-inf") if since is None else since, "")
+        while True:
+            query = ("SELECT session_id, state, updated_at FROM sessions "
+                     "WHERE (updated_at, session_id) > (?, ?)")
+            params = list(position)
+            if until is not None:
+                query += " AND updated_at < ?"
+                params.append(until)
+            rows = connection.execute(
+                query + " ORDER BY updated_at, session_id LIMIT ?", params + [batch_size]
+            ).fetchall()
+
+            for session_id, state, updated_at in rows:
+                controller = deserialize_controller(state)
+                if phase is None or controller.current_phase == phase:
+                    yield session_id, controller, updated_at
+
+            if len(rows) < batch_size:
+                return
+            position = (rows[-1][2], rows[-1][0])
+
+    def _lock_session(self, session_id):
+        """Take the lease on a session row, waiting while another request holds it."""
+        owner = f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex}"
+        connection = self._connection()
+        deadline = time.time() + self.lock_timeout
+        delay = 0.002
+
+        while True:
+            now = time.time()
+            cursor = connection.execute(
+                "UPDATE sessions SET lock_owner = ?, lock_expires = ? "
+                "WHERE session_id = ? AND (lock_owner IS NULL OR lock_expires < ?)",
+                (owner, now + self.lock_lease, session_id, now)
+            )
+            if cursor.rowcount > 0:
+                return owner
+
+            # Nothing to lock if the session doesn't exist
+            exists = connection.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if exists is None:
+                return None
+
+            if now >= deadline:
+                raise SessionLockTimeout(f"Session {session_id} is locked by another request")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def _unlock_session(self, session_id, token):
+        if token is None:
+            return
+        self._connection().execute(
+            "UPDATE sessions SET lock_owner = NULL, lock_expires = NULL "
+            "WHERE session_id = ? AND lock_owner = ?",
+            (session_id, token)
+        )
+
+    def __contains__(self, session_id):
+        row = self._connection().execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self):
+        """Return hit/miss counters (for this process) and the shared session count."""
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "sessions": len(self),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": 0,
+                "expirations": self.expirations
+            }
+
+
+def create_session_store(config=None):
+    """
+    Create a session store from a configuration dictionary (typically os.environ).
+
+    Recognized keys:
+    - CHALLENGE_SESSION_BACKEND: "memory" (default) or "sqlite"
+    - CHALLENGE_SESSION_DB: SQLite database path (default: challenge_sessions.db)
+    - CHALLENGE_MAX_SESSIONS: Maximum sessions per worker, memory backend only (default: 1000)
+    - CHALLENGE_SESSION_TTL: Idle session lifetime in seconds (default: 3600)
+    - CHALLENGE_SESSION_SWEEP_INTERVAL: Seconds between sweeps (default: 60)
+    - CHALLENGE_SESSION_JOURNAL_DIR: Directory for session journals, memory backend only;
+      sessions found there are restored when the store is created (default: no journal)
+    - CHALLENGE_SESSION_SNAPSHOT_EVERY: Journal events after which a session is compacted (default: 50)
+    """
+    config = config or {}
+    backend = config.get("CHALLENGE_SESSION_BACKEND", "memory")
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            path=config.get("CHALLENGE_SESSION_DB", "challenge_sessions.db"),
+            ttl_seconds=float(config.get("CHALLENGE_SESSION_TTL", 3600)),
+            sweep_interval=float(config.get("CHALLENGE_SESSION_SWEEP_INTERVAL", 60))
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown session backend: {backend}")
+
+    store = MemorySessionStore(
+        max_sessions=int(config.get("CHALLENGE_MAX_SESSIONS", 1000)),
+        ttl_seconds=float(config.get("CHALLENGE_SESSION_TTL", 3600)),
+        sweep_interval=float(config.get("CHALLENGE_SESSION_SWEEP_INTERVAL", 60))
+    )
+
+    journal_dir = config.get("CHALLENGE_SESSION_JOURNAL_DIR")
+    if journal_dir:
+        store.journal = SessionJournal(journal_dir, snapshot_every=int(config.get("CHALLENGE_SESSION_SNAPSHOT_EVERY", 50)))
+        store.journal.restore(store, max_age=store.ttl_seconds)
+    return store
+
+# Example usage:
+# store = MemorySessionStore(max_sessions=2, ttl_seconds=60, sweep_interval=0)
+# store["a"] = controller_a
+# with store.session("a") as controller:
+#     controller.start_game()
+# print(store.stats())
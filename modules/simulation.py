@@ -0,0 +1,414 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from modules.agent_profiles import generate_agent_cohorts
+from modules.agent_policy_preferences import generate_preference_matrix, preference_dicts
+from modules.game_controller import ChallengeGameController
+from modules.policy_space import get_policy_space, SCORE_FIELDS, BENEFIT_LABELS
+
+# Headless driver for the full game lifecycle. Games run in batches ("chunks") on a
+# process pool; each chunk is seeded from the run seed and its own index, so a run is
+# reproducible no matter how chunks are spread over the workers.
+
+
+class HumanStrategy:
+    """
+    Base class for scripted human players.
+
+    A strategy picks the human's individual preferences and the group's decision on
+    each topic. Strategies are sent to worker processes, so they must be picklable.
+    Random choices are drawn from rng (a random.Random instance, or the random module),
+    so a seeded game plays the same way every time.
+    """
+
+    name = None
+
+    def choose_preferences(self, controller, rng=random):
+        """Return the human's {policy area: option} package for the individual phase."""
+        return random_feasible_package(rng)
+
+    def choose_decision(self, controller, topic, rng=random):
+        """Return the option the group settles on for a topic."""
+        raise NotImplementedError
+
+
+class RandomStrategy(HumanStrategy):
+    """Picks a random valid package and random affordable decisions."""
+
+    name = "random"
+
+    def choose_decision(self, controller, topic, rng=random):
+        return rng.randint(1, 3)
+
+
+class SincereStrategy(HumanStrategy):
+    """Gets the human's own preference adopted on every topic."""
+
+    name = "sincere"
+
+    def choose_decision(self, controller, topic, rng=random):
+        return controller.human_preferences[topic]
+
+
+class MajorityStrategy(HumanStrategy):
+    """Adopts the most common preference among the agents and the human (lowest option on ties)."""
+
+    name = "majority"
+
+    def choose_decision(self, controller, topic, rng=random):
+        votes = Counter(preferences[topic] for preferences in controller.agent_preferences.values())
+        votes[controller.human_preferences[topic]] += 1
+        return max(sorted(votes), key=lambda option: votes[option])
+
+
+class GroupOptimumStrategy(HumanStrategy):
+    """Adopts the group optimum for the topics still open (see modules.consensus_solver)."""
+
+    name = "optimum"
+
+    def __init__(self):
+        self._controller = None
+        self._plan = None
+
+    def choose_decision(self, controller, topic, rng=random):
+        # Following the plan keeps it optimal for the remaining topics, so it is
+        # solved once per game and only re-solved if a decision had to deviate from it
+        decided = controller.budget_calculator.selected_policies
+        if (controller is not self._controller or self._plan is None or
+                any(option is not None and option != self._plan[area] for area, option in decided.items())):
+            optimum = controller.compute_group_optimum()
+            self._controller = controller
+            self._plan = optimum["policies"] if optimum["success"] else None
+        if self._plan is None:
+            return 1
+        return self._plan[topic]
+
+
+class ScriptedStrategy(HumanStrategy):
+    """
+    Plays a fixed script.
+
+    Parameters:
+    - preferences: {policy area: option} for the individual phase
+    - decisions: Optional {policy area: option} for the group phase (default: the preferences)
+    """
+
+    name = "scripted"
+
+    def __init__(self, preferences, decisions=None):
+        self.preferences = preferences
+        self.decisions = decisions or preferences
+
+    def choose_preferences(self, controller, rng=random):
+        return dict(self.preferences)
+
+    def choose_decision(self, controller, topic, rng=random):
+        return self.decisions[topic]
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in [RandomStrategy, SincereStrategy, MajorityStrategy, GroupOptimumStrategy]
+}
+
+
+_feasible_packages = None
+
+
+def random_feasible_package(rng=random):
+    """Return a random package that is within budget and uses a mix of options, drawn from rng."""
+    global _feasible_packages
+    space = get_policy_space()
+    if _feasible_packages is None:
+        _feasible_packages = space.feasible_packages().tolist()
+    return space.row(rng.choice(_feasible_packages))["policies"]
+
+
+def affordable_option(controller, option):
+    """Lower an option until the remaining topics can still get at least Option 1 each."""
+    calculator = controller.budget_calculator
+    topics_left = sum(1 for selected in calculator.selected_policies.values() if selected is None) - 1
+    return max(1, min(option, calculator.get_remaining_budget() - topics_left))
+
+
+def play_game(strategy, agent_profiles, agent_preferences=None, dialogue=False, rng=random):
+    """
+    Play one game through the controller, from setup to the final report.
+
+    Parameters:
+    - strategy: HumanStrategy instance
+    - agent_profiles: Profiles of the AI agents
+    - agent_preferences: Their preferences (default: generated from the profiles)
+    - dialogue: Whether agents make opening statements and answer the human on each
+      topic (uses the configured LLM backend, so much slower)
+    - rng: random.Random instance for the strategy's choices (default: the random module)
+
+    Returns:
+    - Dictionary describing the outcome
+    """
+    controller = ChallengeGameController(agent_profiles, agent_preferences)
+    controller.start_game()
+
+    for area, option in strategy.choose_preferences(controller, rng).items():
+        controller.set_human_preference(area, option)
+    result = controller.start_group_discussion()
+    if not result["success"]:
+        raise ValueError(f"Strategy '{strategy.name}' chose an incomplete package: {result['message']}")
+
+    while controller.current_phase == "group":
+        topic = controller.current_topic
+        if dialogue:
+            controller.get_agent_opening_statements()
+            controller.submit_human_argument("I think we should follow my preference here.", controller.human_preferences[topic])
+        option = affordable_option(controller, strategy.choose_decision(controller, topic, rng))
+        controller.finalize_topic_decision(option)
+
+    controller.start_reflection_phase()
+    reflections = controller.get_agent_reflections()["reflections"]
+    report = controller.generate_final_report()
+
+    policies = report["final_policies"]
+    analysis = report["policy_analysis"]
+    stances = {agent["id"]: agent["political_stance"] for agent in controller.agent_profiles}
+    return {
+        "policies": policies,
+        "cost": report["budget_summary"]["used_budget"],
+        "valid": controller.budget_calculator.is_valid_policy_set(),
+        "scores": {field: analysis[field]["score"] for field in SCORE_FIELDS},
+        "benefit": BENEFIT_LABELS[get_policy_space().scores(policies)[4]],
+        "human_matches": sum(1 for area, option in policies.items() if controller.human_preferences[area] == option),
+        # (political stance, areas matching the agent's preferences, mean preferred option) per agent
+        "agents": [
+            (
+                stances[agent_id],
+                sum(1 for area, option in policies.items() if preferences[area] == option),
+                sum(preferences.values()) / len(preferences)
+            )
+            for agent_id, preferences in controller.agent_preferences.items()
+        ],
+        "sentiments": [reflection["sentiment"] for reflection in reflections]
+    }
+
+
+class SimulationSummary:
+    """
+    Running totals over many games. Summaries from different chunks are combined
+    with merge(), so workers only send these small objects back, never raw games.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.valid = 0
+        self.score_sums = {field: 0.0 for field in SCORE_FIELDS}
+        self.score_squares = {field: 0.0 for field in SCORE_FIELDS}
+        self.benefits = Counter()
+        self.costs = Counter()
+        self.option_counts = {}
+        self.human_matches = Counter()
+        self.sentiments = Counter()
+        # Political stance -> [agents, sum of matched areas, sum of mean preferred option]
+        self.stances = {}
+        self.seconds = 0.0
+
+    def add(self, outcome):
+        """Add one game outcome from play_game()."""
+        self.games += 1
+        self.valid += outcome["valid"]
+        for field, score in outcome["scores"].items():
+            self.score_sums[field] += score
+            self.score_squares[field] += score * score
+        self.benefits[outcome["benefit"]] += 1
+        self.costs[outcome["cost"]] += 1
+        for area, option in outcome["policies"].items():
+            self.option_counts.setdefault(area, [0, 0, 0])[option - 1] += 1
+        self.human_matches[outcome["human_matches"]] += 1
+        self.sentiments.update(outcome["sentiments"])
+        for stance, matches, preference in outcome["agents"]:
+            totals = self.stances.setdefault(stance, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += matches
+            totals[2] += preference
+
+    def merge(self, other):
+        """Add another summary's totals to this one."""
+        self.games += other.games
+        self.valid += other.valid
+        for field in SCORE_FIELDS:
+            self.score_sums[field] += other.score_sums[field]
+            self.score_squares[field] += other.score_squares[field]
+        self.benefits.update(other.benefits)
+        self.costs.update(other.costs)
+        for area, counts in other.option_counts.items():
+            totals = self.option_counts.setdefault(area, [0, 0, 0])
+            for i, count in enumerate(counts):
+                totals[i] += count
+        self.human_matches.update(other.human_matches)
+        self.sentiments.update(other.sentiments)
+        for stance, (agents, matches, preference) in other.stances.items():
+            totals = self.stances.setdefault(stance, [0, 0, 0.0])
+            totals[0] += agents
+            totals[1] += matches
+            totals[2] += preference
+        self.seconds += other.seconds
+
+    def to_dict(self):
+        """Return means, standard deviations and distributions as plain values."""
+        games = max(self.games, 1)
+        scores = {}
+        for field in SCORE_FIELDS:
+            mean = self.score_sums[field] / games
+            variance = max(self.score_squares[field] / games - mean * mean, 0.0)
+            scores[field] = {"mean": mean, "std": variance ** 0.5}
+
+        return {
+            "games": self.games,
+            "valid_rate": self.valid / games,
+            "scores": scores,
+            "benefit": {label: self.benefits[label] / games for label in BENEFIT_LABELS},
+            "cost_distribution": {cost: self.costs[cost] / games for cost in sorted(self.costs)},
+            "option_distribution": {
+                area: [count / games for count in counts] for area, counts in self.option_counts.items()
+            },
+            "human_matches": {matches: self.human_matches[matches] / games for matches in sorted(self.human_matches)},
+            "agent_sentiments": {sentiment: count / max(sum(self.sentiments.values()), 1) for sentiment, count in self.sentiments.items()},
+            "stances": {
+                stance: {
+                    "agents": agents,
+                    "mean_matches": matches / agents,
+                    "mean_preferred_option": preference / agents
+                }
+                for stance, (agents, matches, preference) in sorted(self.stances.items())
+            },
+            "cpu_seconds": self.seconds
+        }
+
+
+def chunk_seed(seed, chunk_index):
+    """Derive a chunk's random seed from the run seed."""
+    return seed * 1000003 + chunk_index
+
+
+def simulate_chunk(strategy, num_games, seed, num_agents=4, dialogue=False):
+    """Play num_games games with the RNGs seeded, returning their SimulationSummary."""
+    start = time.process_time()
+    # The strategies' own RNG, so running in the caller's process leaves its global RNG alone
+    strategy_rng = random.Random(seed)
+    # Generate every game's agents and preferences in one go
+    rng = np.random.default_rng(seed)
+    cohort = generate_agent_cohorts(num_games, num_agents, rng)
+    preference_matrix = generate_preference_matrix(cohort, rng)
+
+    summary = SimulationSummary()
+    for game in range(num_games):
+        summary.add(play_game(strategy, cohort.profiles(game), preference_dicts(preference_matrix, game), dialogue,
+                              strategy_rng))
+    summary.seconds = time.process_time() - start
+    return summary
+
+
+def _init_worker():
+    """Load the policy table once per worker process instead of on the first game."""
+    get_policy_space()
+
+
+def make_strategy(strategy):
+    """Return a strategy instance, given one or the name of a built-in strategy."""
+    if isinstance(strategy, HumanStrategy):
+        return strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}. Available: {', '.join(sorted(STRATEGIES))}")
+    return STRATEGIES[strategy]()
+
+
+def run_simulation(num_games, strategy="random", workers=None, chunk_size=1000, seed=0,
+                   num_agents=4, dialogue=False):
+    """
+    Play many games in parallel and stream the aggregated results.
+
+    Parameters:
+    - num_games: Total number of games
+    - strategy: HumanStrategy instance or built-in strategy name (see STRATEGIES)
+    - workers: Number of worker processes (default: CPU count; 0 runs in this process)
+    - chunk_size: Games per task sent to a worker
+    - seed: Run seed; chunk i is seeded with chunk_seed(seed, i)
+    - num_agents: Number of AI agents per game
+    - dialogue: Whether agents talk on each topic (see play_game)
+
+    Yields:
+    - The running SimulationSummary after each chunk completes
+    """
+    strategy = make_strategy(strategy)
+    chunks = [
+        (index, min(chunk_size, num_games - start))
+        for index, start in enumerate(range(0, num_games, chunk_size))
+    ]
+    total = SimulationSummary()
+
+    if workers == 0:
+        for index, count in chunks:
+            total.merge(simulate_chunk(strategy, count, chunk_seed(seed, index), num_agents, dialogue))
+            yield total
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = set()
+        chunks = iter(chunks)
+        while True:
+            # Keep a couple of chunks queued per worker rather than submitting the whole run
+            while len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                index, count = chunk
+                pending.add(executor.submit(simulate_chunk, strategy, count, chunk_seed(seed, index), num_agents, dialogue))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                total.merge(future.result())
+                yield total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless CHALLENGE games and report outcome distributions.")
+    parser.add_argument("--games", type=int, default=10000, help="Number of games to play")
+    parser.add_argument("--strategy", default="random", choices=sorted(STRATEGIES), help="Human player strategy")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0 = no pool)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Games per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="Run seed")
+    parser.add_argument("--agents", type=int, default=4, help="AI agents per game")
+    parser.add_argument("--dialogue", action="store_true", help="Generate agent statements and debate on each topic")
+    parser.add_argument("--stream", action="store_true", help="Print the running summary as a JSON line after each chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary = None
+    for summary in run_simulation(args.games, args.strategy, args.workers, args.chunk_size,
+                                  args.seed, args.agents, args.dialogue):
+        elapsed = time.perf_counter() - start
+        if args.stream:
+            print(json.dumps({"elapsed_seconds": elapsed, **summary.to_dict()}), flush=True)
+        else:
+            print(f"{summary.games}/{args.games} games in {elapsed:.1f}s "
+                  f"({summary.games / elapsed:.0f} games/s)", file=sys.stderr, flush=True)
+
+    if summary is not None and not args.stream:
+        print(json.dumps(summary.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Example usage:
+# python -m modules.simulation --games 1000000 --strategy majority --chunk-size 5000
+#
+# for summary in run_simulation(10000, "sincere", workers=4):
+#     print(summary.games, summary.to_dict()["scores"]["equity"])
@@ -0,0 +1,304 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Streaming speech input: clients send small chunks of 16-bit mono PCM as they record.
+# An energy-based voice activity detector finds where each utterance ends, and each
+# utterance is handed to a recognizer in the background while more audio arrives, so
+# the transcript is ready shortly after the speaker stops.
+
+SAMPLE_WIDTH = 2  # bytes per sample (16-bit little-endian PCM)
+
+
+class EnergyVAD:
+    """
+    Voice activity detector that splits a PCM stream into utterances by frame energy.
+
+    A frame counts as speech when its RMS energy is well above the background noise
+    level, which is tracked from the frames that aren't speech. An utterance starts
+    after start_frames speech frames in a row and ends after hangover_ms of non-speech,
+    so short pauses between words don't split it.
+
+    Parameters:
+    - sample_rate: Samples per second of the PCM stream
+    - frame_ms: Frame length in milliseconds
+    - min_energy: RMS energy below which a frame is never speech (on the 16-bit scale)
+    - noise_ratio: How far above the noise level a frame must be to count as speech
+    - start_frames: Consecutive speech frames that start an utterance
+    - hangover_ms: Non-speech time that ends an utterance
+    - preroll_ms: Audio kept from before the utterance started (so the first syllable isn't cut)
+    - max_utterance_ms: Utterances longer than this are cut, so long speeches are recognized in parts
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, min_energy=300, noise_ratio=3.0, start_frames=3,
+                 hangover_ms=300, preroll_ms=200, max_utterance_ms=10000):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        if self.frame_samples < 1:
+            raise ValueError(f"Sample rate {sample_rate} is too low for {frame_ms} ms frames")
+        self.min_energy = min_energy
+        self.noise_ratio = noise_ratio
+        self.start_frames = start_frames
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.preroll_frames = preroll_ms // frame_ms
+        self.max_utterance_frames = max_utterance_ms // frame_ms
+
+        self.noise_level = float(min_energy) / noise_ratio
+        self.in_speech = False
+        self._remainder = b""
+        self._frames = []  # frames of the current utterance (or the pre-roll while silent)
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def _is_speech(self, frame):
+        energy = float(np.sqrt(np.mean(frame.astype(np.float64) ** 2)))
+        speech = energy > max(self.min_energy, self.noise_level * self.noise_ratio)
+        if not speech:
+            # Follow the background noise level slowly
+            self.noise_level = 0.95 * self.noise_level + 0.05 * energy
+        return speech
+
+    def process(self, pcm):
+        """
+        Feed PCM bytes. Returns the utterances that ended within them, each as an
+        int16 array of samples.
+        """
+        data = self._remainder + pcm
+        frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        usable = len(data) - len(data) % frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return []
+
+        utterances = []
+        frames = np.frombuffer(data[:usable], dtype="<i2").reshape(-1, self.frame_samples)
+        for frame in frames:
+            speech = self._is_speech(frame)
+            self._frames.append(frame)
+
+            if not self.in_speech:
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= self.start_frames:
+                    self.in_speech = True
+                    self._silence_run = 0
+                else:
+                    # Keep only the pre-roll plus the frames that might start an utterance
+                    del self._frames[:-(self.preroll_frames + self.start_frames)]
+                continue
+
+            self._silence_run = 0 if speech else self._silence_run + 1
+            if self._silence_run >= self.hangover_frames or len(self._frames) >= self.max_utterance_frames:
+                utterances.append(self._end_utterance())
+        return utterances
+
+    def _end_utterance(self):
+        # Drop the trailing silence
+        frames = self._frames[:len(self._frames) - self._silence_run]
+        self.in_speech = False
+        self._frames = []
+        self._speech_run = 0
+        self._silence_run = 0
+        return np.concatenate(frames)
+
+    def flush(self):
+        """End the stream. Returns the utterance in progress (if any) as a list of zero or one arrays."""
+        self._remainder = b""
+        if self.in_speech:
+            return [self._end_utterance()]
+        self._frames = []
+        return []
+
+
+class OfflineRecognizer:
+    """
+    Stand-in recognizer for development and tests, which needs no network or model.
+    Returns the given transcripts in order, then a description of each utterance.
+    """
+
+    name = "offline"
+
+    def __init__(self, transcripts=None):
+        self.transcripts = list(transcripts or [])
+        self._lock = threading.Lock()
+
+    def recognize(self, samples, sample_rate):
+        with self._lock:
+            if self.transcripts:
+                return self.transcripts.pop(0)
+        return f"[{len(samples) / sample_rate:.1f} seconds of speech]"
+
+
+class GoogleRecognizer:
+    """Recognizer backed by the Google Web Speech API through the speech_recognition package."""
+
+    name = "google"
+
+    def __init__(self, recognizer=None, language="en-US"):
+        # Imported on first use, so the module loads without speech_recognition installed
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def recognize(self, samples, sample_rate):
+        audio = self._sr.AudioData(samples.astype("<i2").tobytes(), sample_rate, SAMPLE_WIDTH)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""  # Speech was unintelligible
+
+
+RECOGNIZERS = {
+    "offline": OfflineRecognizer,
+    "google": GoogleRecognizer
+}
+
+# Recognition runs here, so feeding audio never waits for a recognizer
+recognition_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recognition")
+
+
+class SpeechStream:
+    """
+    One streamed recording: detects utterances as audio arrives and recognizes each
+    in the background.
+
+    Parameters:
+    - recognizer: Object with recognize(samples, sample_rate) -> text
+    - sample_rate: Samples per second of the incoming PCM
+    - session_id: Game session the speech belongs to, if any
+    - vad_options: Keyword arguments for EnergyVAD
+    """
+
+    def __init__(self, recognizer, sample_rate=16000, session_id=None, **vad_options):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.session_id = session_id
+        self.vad = EnergyVAD(sample_rate, **vad_options)
+        self.last_activity = time.time()
+        self.received_bytes = 0
+        self._pending = []  # futures of utterances being recognized, in order
+        self._transcripts = []  # recognized utterances, in order
+        self._returned = 0  # transcripts already returned by feed()
+        self._lock = threading.Lock()
+
+    def _submit(self, utterances):
+        for samples in utterances:
+            self._pending.append(recognition_executor.submit(self._recognize, samples))
+
+    def _recognize(self, samples):
+        try:
+            return self.recognizer.recognize(samples, self.sample_rate)
+        except Exception as e:
+            print(f"Error in speech recognition: {e}")
+            return ""
+
+    def _collect(self, timeout=None):
+        """Move finished recognitions, in order, from pending to transcripts."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._pending:
+            future = self._pending[0]
+            if not future.done() and timeout is None:
+                break
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            try:
+                text = future.result(timeout=remaining)
+            except Exception:
+                break
+            self._pending.pop(0)
+            if text:
+                self._transcripts.append(text)
+
+    def feed(self, pcm):
+        """
+        Add a chunk of PCM audio.
+
+        Returns:
+        - Dictionary with speaking (whether an utterance is in progress), pending
+          (utterances still being recognized) and transcripts (utterances recognized
+          since the last call)
+        """
+        with self._lock:
+            self.last_activity = time.time()
+            self.received_bytes += len(pcm)
+            self._submit(self.vad.process(pcm))
+            self._collect()
+            transcripts = self._transcripts[self._returned:]
+            self._returned = len(self._transcripts)
+            return {
+                "speaking": self.vad.in_speech,
+                "pending": len(self._pending),
+                "transcripts": transcripts
+            }
+
+    def finish(self, timeout=10):
+        """End the recording, wait up to timeout seconds for recognition and return the full transcript."""
+        with self._lock:
+            self._submit(self.vad.flush())
+            self._collect(timeout)
+            return " ".join(self._transcripts)
+
+
+class SpeechStreamManager:
+    """
+    The open speech streams of this worker process.
+
+    Parameters:
+    - recognizer: Name of the recognizer (see RECOGNIZERS)
+    - max_streams: Maximum number of open streams
+    - idle_timeout: Seconds after which an abandoned stream is discarded
+    """
+
+    def __init__(self, recognizer="google", max_streams=100, idle_timeout=60):
+        if recognizer not in RECOGNIZERS:
+            raise ValueError(f"Unknown speech recognizer: {recognizer}")
+        self.recognizer_name = recognizer
+        self._recognizer = None
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def _discard_idle(self, now):
+        for stream_id, stream in list(self._streams.items()):
+            if now - stream.last_activity > self.idle_timeout:
+                del self._streams[stream_id]
+
+    def open(self, sample_rate=16000, session_id=None):
+        """Open a stream and return its ID, or None when the stream limit is reached."""
+        with self._lock:
+            self._discard_idle(time.time())
+            if len(self._streams) >= self.max_streams:
+                return None
+            if self._recognizer is None:
+                self._recognizer = RECOGNIZERS[self.recognizer_name]()
+            stream_id = uuid.uuid4().hex
+            self._streams[stream_id] = SpeechStream(self._recognizer, sample_rate, session_id)
+        return stream_id
+
+    def get(self, stream_id):
+        """Return an open stream, or None."""
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def close(self, stream_id):
+        """Close a stream and return it (None if it wasn't open)."""
+        with self._lock:
+            return self._streams.pop(stream_id, None)
+
+
+def create_speech_stream_manager(config=None):
+    """
+    Create the speech stream manager from a configuration dictionary (typically os.environ):
+    - CHALLENGE_SPEECH_RECOGNIZER: "google" (default) or "offline" (stand-in for development and
+      tests, whose made-up transcripts must never reach real games)
+    """
+    config = config or {}
+    return SpeechStreamManager(recognizer=config.get("CHALLENGE_SPEECH_RECOGNIZER", "google"))
+
+# Example usage:
+# stream = SpeechStream(OfflineRecognizer(["I support option three"]), sample_rate=16000)
+# for chunk in pcm_chunks:  # e.g. 100 ms of 16-bit mono audio each
+#     print(stream.feed(chunk))
+# print(stream.finish())
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Voice settings per agent; voice_name is kept for engines that support named voices
+AGENT_VOICES = {
+    "agent_1": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-B"},
+    "agent_2": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-C"},
+    "agent_3": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-D"},
+    "agent_4": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-E"}
+}
+DEFAULT_VOICE = {"lang": "en", "slow": False}
+
+
+def voice_for(agent_id):
+    """Return the voice settings of an agent (the default voice for anyone else)."""
+    return AGENT_VOICES.get(agent_id, DEFAULT_VOICE)
+
+
+def synthesize_gtts(text, voice):
+    """Synthesize speech with gTTS into an in-memory MP3 and return its bytes."""
+    # Imported on first use, so the module loads without gTTS installed
+    from gtts import gTTS
+
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=voice.get("lang", "en"), slow=voice.get("slow", False)).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+class AudioCache:
+    """
+    LRU cache of synthesized audio, keyed on the text and the voice settings and
+    bounded by the total size of the cached clips.
+
+    Parameters:
+    - max_bytes: Maximum total size of the cached audio (0 disables the cache)
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        # key -> audio bytes, ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text, voice, engine="gtts"):
+        """Build a content address from the text (with whitespace normalized), voice settings and engine."""
+        payload = json.dumps([engine, voice, " ".join(text.split())], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached audio for a key, or None."""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, key, audio):
+        """
+        Cache a clip, evicting the least recently used clips until the cache fits in max_bytes.
+        Returns False if the clip is larger than the whole cache (or the cache is disabled).
+        """
+        if len(audio) > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = audio
+            self._size += len(audio)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """Remove all cached clips."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return size, hit/miss counters and the hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "clips": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+class SpeechSynthesizer:
+    """
+    Text-to-speech with an audio cache: each (text, voice) is synthesized once and
+    repeated lines are served from memory.
+
+    Parameters:
+    - cache: AudioCache to use (default: the process-wide cache)
+    - engine: Function (text, voice) -> audio bytes (default: gTTS)
+    - engine_name: Name of the engine, part of the cache key
+    """
+
+    def __init__(self, cache=None, engine=synthesize_gtts, engine_name="gtts"):
+        self.cache = cache if cache is not None else get_audio_cache()
+        self.engine = engine
+        self.engine_name = engine_name
+
+    def synthesize(self, text, voice=None):
+        """Return the audio (MP3 bytes for gTTS) for text spoken with the given voice settings."""
+        voice = voice or DEFAULT_VOICE
+        key = AudioCache.make_key(text, voice, self.engine_name)
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.engine(text, voice)
+            self.cache.put(key, audio)
+        return audio
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """
+    Return the process-wide audio cache, configured from the environment:
+    - CHALLENGE_AUDIO_CACHE_MB: Maximum size of the cached audio in megabytes (default: 32, 0 disables)
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            max_megabytes = float(os.environ.get("CHALLENGE_AUDIO_CACHE_MB", 32))
+            _shared_cache = AudioCache(max_bytes=int(max_megabytes * 1024 * 1024))
+        return _shared_cache
+
+# Example usage:
+# synthesizer = SpeechSynthesizer()
+# audio = synthesizer.synthesize("I believe Option 3 is essential.", voice_for("agent_1"))
+# print(len(audio), synthesizer.cache.stats())
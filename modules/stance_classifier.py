@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+# Guesses which option (1-3) a player's argument supports from weighted keywords.
+# Every lexicon is compiled into a single regular expression, factored into a prefix
+# tree, so a text is scanned once however many keywords there are. Keywords match at
+# the start of a word and cover its inflections ("equal" also matches "equality");
+# a phrase is matched in preference to the single words inside it.
+
+# Keyword -> (option it argues for, weight), used in every policy area
+GLOBAL_LEXICON = {
+    "comprehensive": (3, 1.0),
+    "inclusive": (3, 1.0),
+    "equal": (3, 1.0),
+    "rights": (3, 1.0),
+    "justice": (3, 1.0),
+    "transform": (3, 1.0),
+    "integrate": (3, 0.5),
+    "moderate": (2, 1.0),
+    "balance": (2, 1.0),
+    "compromise": (2, 1.0),
+    "middle": (2, 1.0),
+    "reasonable": (2, 1.0),
+    "step by step": (2, 1.0),
+    "minimal": (1, 1.0),
+    "cost": (1, 1.0),
+    "budget": (1, 1.0),
+    "restrict": (1, 1.0),
+    "limit": (1, 1.0),
+    "control": (1, 1.0),
+    "too expensive": (1, 1.5),
+    "can't afford": (1, 1.5),
+    "cannot afford": (1, 1.5)
+}
+
+# Policy area -> keywords that mean something particular in that area. They are added
+# to the global lexicon and override its entries (a weight of 0 removes a keyword).
+TOPIC_LEXICONS = {
+    "Access to Education": {
+        "mainstream": (3, 1.5),
+        "equal access": (3, 2.0),
+        "same schools": (3, 1.5),
+        "separate schools": (2, 2.0),
+        "learning centers": (2, 1.5),
+        "limit access": (1, 2.0),
+        "small percentage": (1, 1.5),
+        "quota": (1, 1.5)
+    },
+    "Language Instruction": {
+        "bilingual": (3, 2.0),
+        "mother tongue": (3, 1.5),
+        "native language": (3, 1.5),
+        "language courses": (2, 1.5),
+        "learn teanish": (2, 1.0),
+        "only teanish": (1, 2.0),
+        "teanish only": (1, 2.0),
+        "current policy": (1, 1.0)
+    },
+    "Teacher Training": {
+        "ongoing training": (3, 2.0),
+        "professional development": (3, 1.5),
+        "basic training": (2, 2.0),
+        "workshop": (2, 1.0),
+        "no training": (1, 2.0),
+        "already qualified": (1, 1.5)
+    },
+    "Curriculum Adaptation": {
+        "diverse perspectives": (3, 2.0),
+        "multicultural": (3, 1.5),
+        "cultural": (3, 1.0),
+        "supplementary": (2, 2.0),
+        "existing curriculum": (1, 2.0),
+        "national curriculum": (1, 1.0),
+        "national identity": (1, 1.5)
+    },
+    "Psychosocial Support": {
+        "trauma": (3, 1.5),
+        "specialized": (3, 1.5),
+        "counseling": (2, 1.5),
+        "peer support": (2, 1.5),
+        "not the school's job": (1, 2.0),
+        "families": (1, 0.5)
+    },
+    "Financial Support": {
+        # Every argument here is about money, so "cost" and "budget" say little on their own
+        "cost": (1, 0.25),
+        "budget": (1, 0.25),
+        "invest": (3, 1.5),
+        "adequate funding": (3, 2.0),
+        "significant": (3, 1.0),
+        "increase": (2, 1.0),
+        "more funding": (2, 1.5),
+        "minimal funds": (1, 2.0),
+        "taxpayer": (1, 1.5),
+        "waste": (1, 1.0)
+    },
+    "Certification/Accreditation": {
+        "tailored": (3, 2.0),
+        "additional training": (3, 1.5),
+        "recognize": (3, 0.5),
+        "evaluation": (2, 1.5),
+        "assess": (2, 1.0),
+        "only recognize": (1, 2.0),
+        "our own standards": (1, 1.5),
+        "within the republic": (1, 1.5)
+    }
+}
+
+DEFAULT_STANCE = 2  # Returned when no option clearly wins
+NUM_OPTIONS = 3
+
+
+def normalize_keyword(keyword):
+    """Lowercase a keyword and collapse its whitespace, as matches are looked up."""
+    return " ".join(keyword.lower().split())
+
+
+def trie_pattern(keywords):
+    """
+    Build a regular expression matching any of the keywords, factored into a prefix
+    tree so the regex engine follows one branch per character instead of trying every
+    keyword in turn. Longer keywords win over their prefixes, and a space in a
+    keyword matches any run of whitespace.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a keyword
+
+    def build(node):
+        branches = []
+        for char in sorted(node):
+            if char == "":
+                continue
+            token = r"\s+" if char == " " else re.escape(char)
+            branches.append(token + build(node[char]))
+        if not branches:
+            return ""
+        if "" in node:
+            # Trying the longer keywords first keeps matches as long as possible
+            return "(?:" + "|".join(branches) + ")?" if len(branches) > 1 else "(?:" + branches[0] + ")?"
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class LexiconMatcher:
+    """
+    One compiled lexicon: a regular expression matching all of its keywords in a
+    single pass, and the (option, weight) of each keyword.
+    """
+
+    def __init__(self, lexicon):
+        self.weights = {}
+        for keyword, (option, weight) in lexicon.items():
+            if weight > 0:
+                self.weights[normalize_keyword(keyword)] = (int(option), float(weight))
+
+        # Keywords start at a word boundary and may continue into the rest of the word
+        self.pattern = re.compile(r"\b(" + trie_pattern(self.weights) + r")\w*") if self.weights else None
+
+    def matches(self, text):
+        """Return the distinct keywords found in text (lowercased), in order of appearance."""
+        if self.pattern is None:
+            return []
+        weights = self.weights
+        # Phrases matched across a line break or several spaces are looked up with single spaces
+        return list(dict.fromkeys(keyword if keyword in weights else " ".join(keyword.split())
+                                  for keyword in self.pattern.findall(text.lower())))
+
+
+class StanceClassifier:
+    """
+    Keyword-based stance detection with per-topic lexicons.
+
+    Each keyword found in a text adds its weight to the option it argues for
+    (a keyword counts once however often it is repeated). The option with the
+    highest score wins; if none scores highest on its own, the default stance is returned.
+
+    Parameters:
+    - lexicon: Global {keyword: (option, weight)}
+    - topic_lexicons: {policy area: {keyword: (option, weight)}}, merged over the global lexicon
+    - default_stance: Stance returned when the text doesn't favor one option
+    """
+
+    def __init__(self, lexicon=None, topic_lexicons=None, default_stance=DEFAULT_STANCE):
+        self.lexicon = dict(GLOBAL_LEXICON if lexicon is None else lexicon)
+        self.topic_lexicons = {area: dict(entries) for area, entries in
+                               (TOPIC_LEXICONS if topic_lexicons is None else topic_lexicons).items()}
+        self.default_stance = default_stance
+
+        # Compiled once: the global matcher and one matcher per policy area
+        self._global_matcher = LexiconMatcher(self.lexicon)
+        self._topic_matchers = {area: LexiconMatcher({**self.lexicon, **entries})
+                                for area, entries in self.topic_lexicons.items()}
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        self.seconds = 0.0
+
+    def _matcher(self, policy_area):
+        # Unknown areas fall back to the global lexicon
+        return self._topic_matchers.get(policy_area, self._global_matcher)
+
+    def _analyze(self, text, policy_area):
+        matcher = self._matcher(policy_area)
+        keywords = matcher.matches(text or "")
+        weights = matcher.weights
+        scores = [0.0] * NUM_OPTIONS
+        for keyword in keywords:
+            option, weight = weights[keyword]
+            scores[option - 1] += weight
+
+        best = max(scores)
+        if best > 0 and scores.count(best) == 1:
+            stance = scores.index(best) + 1
+        else:
+            stance = self.default_stance
+        return stance, scores, keywords
+
+    def _timed(self, count, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.calls += 1
+            self.texts += count
+            self.seconds += elapsed
+        return elapsed
+
+    def classify(self, text, policy_area=None):
+        """Return the option (1-3) a text argues for, using the lexicon of policy_area if it has one."""
+        started = time.perf_counter()
+        stance = self._analyze(text, policy_area)[0]
+        self._timed(1, started)
+        return stance
+
+    def explain(self, text, policy_area=None):
+        """
+        Classify a text and show why.
+
+        Returns:
+        - Dictionary with stance, scores (per option, 1-3) and keywords (the keywords found)
+        """
+        started = time.perf_counter()
+        stance, scores, keywords = self._analyze(text, policy_area)
+        self._timed(1, started)
+        return {"stance": stance, "scores": scores, "keywords": keywords}
+
+    def classify_batch(self, texts, policy_areas=None):
+        """
+        Classify many texts in one call.
+
+        Parameters:
+        - texts: List of texts
+        - policy_areas: One policy area for every text, a list with one area per text, or None
+
+        Returns:
+        - Dictionary with stances (in the order of texts), count and elapsed_ms
+        """
+        if policy_areas is None or isinstance(policy_areas, str):
+            policy_areas = [policy_areas] * len(texts)
+        elif len(policy_areas) != len(texts):
+            raise ValueError("policy_areas must have one entry per text")
+
+        started = time.perf_counter()
+        analyze = self._analyze
+        stances = [analyze(text, area)[0] for text, area in zip(texts, policy_areas)]
+        elapsed = self._timed(len(texts), started)
+        return {"stances": stances, "count": len(texts), "elapsed_ms": elapsed * 1000}
+
+    def stats(self):
+        """Return call and text counters and the average time per text."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "texts": self.texts,
+                "seconds": self.seconds,
+                "microseconds_per_text": self.seconds / self.texts * 1e6 if self.texts else 0.0,
+                "keywords": len(self._global_matcher.weights),
+                "topic_lexicons": len(self._topic_matchers)
+            }
+
+
+def load_lexicon_file(path):
+    """
+    Read extra keywords from a JSON file of the form
+    {"global": {keyword: [option, weight]}, "topics": {policy area: {keyword: [option, weight]}}}
+    and return the global and topic lexicons with those keywords merged in.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    lexicon = dict(GLOBAL_LEXICON)
+    lexicon.update({keyword: tuple(entry) for keyword, entry in data.get("global", {}).items()})
+    topic_lexicons = {area: dict(entries) for area, entries in TOPIC_LEXICONS.items()}
+    for area, entries in data.get("topics", {}).items():
+        topic_lexicons.setdefault(area, {}).update({keyword: tuple(entry) for keyword, entry in entries.items()})
+    return lexicon, topic_lexicons
+
+
+_shared_classifier = None
+_shared_classifier_lock = threading.Lock()
+
+
+def get_stance_classifier():
+    """
+    Return the process-wide stance classifier, compiled on first use. Configured from the environment:
+    - CHALLENGE_STANCE_LEXICON: JSON file with extra or reweighted keywords (see load_lexicon_file)
+    """
+    global _shared_classifier
+    with _shared_classifier_lock:
+        if _shared_classifier is None:
+            path = os.environ.get("CHALLENGE_STANCE_LEXICON")
+            if path:
+                lexicon, topic_lexicons = load_lexicon_file(path)
+                _shared_classifier = StanceClassifier(lexicon, topic_lexicons)
+            else:
+                _shared_classifier = StanceClassifier()
+        return _shared_classifier
+
+
+def rescore_sessions(source, classifier, phase=None, since=None, until=None):
+    """
+    Classify the stored arguments of the human players again and compare the result
+    with the option each player said they argued for.
+
+    Parameters:
+    - source: Session store or SessionJournal (see session_export.open_export_source)
+    - classifier: StanceClassifier to score with
+
+    Returns:
+    - Dictionary with the number of sessions and arguments, the agreement rate,
+      agreement per policy area and the classification time
+    """
+    sessions = 0
+    texts, areas, stated = [], [], []
+    for _, controller, _ in source.iter_sessions(phase=phase, since=since, until=until):
+        sessions += 1
+        for entry in controller.discussion_history:
+            if entry.get("agent_id") == "human" and entry.get("stance"):
+                texts.append(entry["statement"])
+                areas.append(entry["topic"])
+                stated.append(entry["stance"])
+
+    result = classifier.classify_batch(texts, areas)
+    per_area = {}
+    for area, stance, expected in zip(areas, result["stances"], stated):
+        counts = per_area.setdefault(area, [0, 0])
+        counts[0] += stance == expected
+        counts[1] += 1
+
+    agreed = sum(counts[0] for counts in per_area.values())
+    return {
+        "sessions": sessions,
+        "arguments": len(texts),
+        "agreement": agreed / len(texts) if texts else None,
+        "agreement_by_area": {area: agreed_in_area / total for area, (agreed_in_area, total) in per_area.items()},
+        "elapsed_ms": result["elapsed_ms"]
+    }
+
+
+def main(argv=None):
+    # Imported here, so the classifier loads without the session modules
+    from modules.session_export import EXPORT_PHASES, open_export_source, parse_time
+
+    parser = argparse.ArgumentParser(description="Re-score the stored arguments of CHALLENGE game sessions.")
+    parser.add_argument("--phase", default=None, choices=EXPORT_PHASES, help="Only sessions in this phase")
+    parser.add_argument("--since", default=None, help="Only sessions updated at or after this time (Unix time or ISO 8601)")
+    parser.add_argument("--until", default=None, help="Only sessions updated before this time (Unix time or ISO 8601)")
+    parser.add_argument("--db", default=None, help="SQLite session database (default: from CHALLENGE_SESSION_DB)")
+    parser.add_argument("--journal-dir", default=None, help="Session journal directory (default: from CHALLENGE_SESSION_JOURNAL_DIR)")
+    parser.add_argument("--lexicon", default=None, help="JSON file with extra or reweighted keywords")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_export_source(os.environ, args.db, args.journal_dir)
+        since, until = parse_time(args.since), parse_time(args.until)
+    except ValueError as e:
+        parser.error(str(e))
+
+    classifier = StanceClassifier(*load_lexicon_file(args.lexicon)) if args.lexicon else get_stance_classifier()
+    print(json.dumps(rescore_sessions(source, classifier, args.phase, since, until), indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Example usage:
+# classifier = get_stance_classifier()
+# print(classifier.classify("We must invest in adequate funding for every school.", "Financial Support"))
+# print(classifier.explain("A balanced, reasonable compromise."))
+# print(classifier.classify_batch(["Equal rights for all.", "It costs too much."], "Access to Education"))
+#
+# python -m modules.stance_classifier --db challenge_sessions.db --phase reflection
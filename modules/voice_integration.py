@@ -1,29 +1,178 @@
 import speech_recognition as sr
-from gtts import gTTS
-import os
-import pygame
+import io
+import itertools
 import threading
 import queue
-import time
+from modules.speech_synthesis import AGENT_VOICES, DEFAULT_VOICE, SpeechSynthesizer
+from modules.speech_stream import GoogleRecognizer, SpeechStream
+
+# Playback priorities (lower plays first; equal priorities play in the order queued)
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+_mixer = None
+_mixer_lock = threading.Lock()
+
+def get_mixer():
+    """Import pygame and initialize its mixer on first use, and return pygame.mixer."""
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            import pygame
+            pygame.mixer.init()
+            _mixer = pygame.mixer
+        return _mixer
+
+def play_audio(audio, interrupt=None):
+    """
+    Play an audio clip (bytes) and return when it ends.
+    Waits on the interrupt event for the length of the clip, so setting it stops
+    playback early and nothing polls the mixer in the meantime.
+    Returns False if playback was interrupted.
+    """
+    sound = get_mixer().Sound(io.BytesIO(audio))
+    interrupt = interrupt or threading.Event()
+    sound.play()
+    if interrupt.wait(sound.get_length()):
+        sound.stop()
+        return False
+    return True
+
+class PlaybackWorker:
+    """
+    One long-lived thread that plays queued speech in priority order.
+
+    The thread starts with the first queued clip and then blocks on the queue
+    while there is nothing to play. The clip playing can be skipped, and
+    skip_to_latest() drops everything but the most recently queued clip.
+
+    Parameters:
+    - synthesizer: SpeechSynthesizer turning text into audio
+    """
+    
+    _STOP = (-1, -1, None, None)
+    
+    def __init__(self, synthesizer):
+        self.synthesizer = synthesizer
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._interrupt = threading.Event()
+        self._playing = None  # sequence number of the clip being synthesized or played
+        self._thread = None
+        self._lock = threading.Lock()
+        
+        self.played = 0
+        self.skipped = 0
+        self.failures = 0
+    
+    def enqueue(self, text, voice=None, priority=PRIORITY_NORMAL):
+        """Queue text to be spoken with the given voice settings."""
+        self._queue.put((priority, next(self._sequence), text, voice or DEFAULT_VOICE))
+        self._start()
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+    
+    def _run(self):
+        """Play queued clips until stopped."""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            
+            _, sequence, text, voice = item
+            # From here on a skip applies to this clip, even while it is still being synthesized
+            with self._lock:
+                self._interrupt.clear()
+                self._playing = sequence
+            try:
+                audio = self.synthesizer.synthesize(text, voice)
+                if self._interrupt.is_set():
+                    outcome = "skipped"  # skipped during synthesis
+                elif play_audio(audio, self._interrupt):
+                    outcome = "played"
+                else:
+                    outcome = "skipped"
+            except Exception as e:
+                print(f"Error in text-to-speech: {e}")
+                outcome = "failures"
+            with self._lock:
+                self._playing = None
+                setattr(self, outcome, getattr(self, outcome) + 1)
+    
+    def _drain(self):
+        """Remove and return everything still queued."""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+    
+    def skip(self):
+        """Stop the clip that is being synthesized or played; the next queued clip starts."""
+        with self._lock:
+            if self._playing is not None:
+                self._interrupt.set()
+    
+    def skip_to_latest(self):
+        """
+        Keep only the most recently queued clip: queued clips older than it are dropped, and
+        the clip playing is stopped only if a newer one was queued after it.
+        """
+        with self._lock:
+            # The queue is empty until the latest clip is put back, so the worker can't
+            # start on it before the clip playing has been dealt with
+            items = [item for item in self._drain() if item is not self._STOP]
+            latest = max(items, key=lambda item: item[1]) if items else None
+            if latest is not None and self._playing is not None and latest[1] < self._playing:
+                latest = None  # the clip playing is the latest one
+            if latest is not None and self._playing is not None:
+                self._interrupt.set()
+            self.skipped += len(items) - (latest is not None)
+            if latest is not None:
+                self._queue.put(latest)
+    
+    def clear(self):
+        """Stop the clip that is playing and drop everything queued."""
+        dropped = len(self._drain())
+        with self._lock:
+            self.skipped += dropped
+        self.skip()
+    
+    def stop(self):
+        """Stop playback and end the worker thread."""
+        self.clear()
+        self._queue.put(self._STOP)
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout=1)
+    
+    def pending(self):
+        """Return the number of clips waiting to be played."""
+        return self._queue.qsize()
 
 class VoiceInteractionModule:
     def __init__(self):
         """Initialize the voice interaction module."""
         self.recognizer = sr.Recognizer()
-        self.speech_queue = queue.Queue()
         self.is_listening = False
         self.speech_thread = None
         
-        # Initialize pygame for audio playback
-        pygame.mixer.init()
-        
         # Agent voice characteristics - can be customized
-        self.agent_voices = {
-            "agent_1": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-B"},
-            "agent_2": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-C"},
-            "agent_3": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-D"},
-            "agent_4": {"lang": "en", "slow": False, "voice_name": "en-US-Wavenet-E"}
-        }
+        self.agent_voices = {agent_id: dict(voice) for agent_id, voice in AGENT_VOICES.items()}
+        
+        # Synthesizes into memory and caches clips, so repeated lines play without synthesis
+        self.synthesizer = SpeechSynthesizer()
+        
+        # Plays queued speech; its thread (and pygame's mixer) start with the first clip
+        self.playback = PlaybackWorker(self.synthesizer)
     
     def start_listening(self, callback_function):
         """
@@ -48,72 +197,58 @@ class VoiceInteractionModule:
         return True
     
     def _listen_thread(self, callback_function):
-        """Background thread for continuous speech recognition."""
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        """
+        Background thread for continuous speech recognition.
+        Microphone audio is read in small chunks and split into utterances as it
+        arrives; each utterance is recognized in the background while listening goes on.
+        """
+        with sr.Microphone(sample_rate=16000) as source:
+            stream = SpeechStream(GoogleRecognizer(self.recognizer), sample_rate=source.SAMPLE_RATE)
             
             while self.is_listening:
                 try:
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                    text = self.recognizer.recognize_google(audio)
-                    if text:
+                    chunk = source.stream.read(source.CHUNK)
+                    for text in stream.feed(chunk)["transcripts"]:
                         callback_function(text)
-                except sr.WaitTimeoutError:
-                    pass  # No speech detected, continue listening
-                except sr.UnknownValueError:
-                    pass  # Speech was unintelligible
-                except sr.RequestError as e:
-                    print(f"Speech recognition service error: {e}")
                 except Exception as e:
                     print(f"Error in speech recognition: {e}")
+            
+            # Deliver what was said before listening stopped
+            stream.finish()
+            for text in stream.feed(b"")["transcripts"]:
+                callback_function(text)
     
     def speak_text(self, text, agent_id=None):
         """
-        Convert text to speech and play it.
+        Convert text to speech and play it, returning when playback ends.
         If agent_id is provided, use the corresponding voice settings.
         """
-        voice_settings = self.agent_voices.get(agent_id, {"lang": "en", "slow": False})
+        voice_settings = self.agent_voices.get(agent_id, DEFAULT_VOICE)
         
         try:
-            # Generate speech
-            tts = gTTS(text=text, lang=voice_settings["lang"], slow=voice_settings["slow"])
-            
-            # Save to temporary file
-            temp_file = f"temp_speech_{int(time.time())}.mp3"
-            tts.save(temp_file)
-            
-            # Play the audio
-            pygame.mixer.music.load(temp_file)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            # Clean up the temporary file
-            os.remove(temp_file)
-            
+            # Generate speech in memory (or reuse a cached clip) and play it from the buffer
+            audio = self.synthesizer.synthesize(text, voice_settings)
+            play_audio(audio)
             return True
         except Exception as e:
             print(f"Error in text-to-speech: {e}")
             return False
     
-    def queue_speech(self, text, agent_id=None):
-        """Add text to the speech queue to be spoken."""
-        self.speech_queue.put((text, agent_id))
-        
-        # If not already processing the queue, start a new thread
-        if not hasattr(self, 'queue_thread') or not self.queue_thread.is_alive():
-            self.queue_thread = threading.Thread(target=self._process_speech_queue)
-            self.queue_thread.daemon = True
-            self.queue_thread.start()
-    
-    def _process_speech_queue(self):
-        """Process the speech queue in the background."""
-        while not self.speech_queue.empty():
-            text, agent_id = self.speech_queue.get()
-            self.speak_text(text, agent_id)
-            self.speech_queue.task_done()
+    def queue_speech(self, text, agent_id=None, priority=PRIORITY_NORMAL):
+        """Add text to the speech queue to be spoken (lower priority values play first)."""
+        self.playback.enqueue(text, self.agent_voices.get(agent_id, DEFAULT_VOICE), priority)
+    
+    def skip_speech(self):
+        """Skip the utterance that is playing."""
+        self.playback.skip()
+    
+    def skip_to_latest(self):
+        """Skip to the most recently queued utterance (e.g. the latest agent to speak)."""
+        self.playback.skip_to_latest()
+    
+    def stop_speaking(self):
+        """Stop speaking and clear the speech queue."""
+        self.playback.clear()
 
 # Alternative implementation using web-based speech APIs
 # For a web application deployment
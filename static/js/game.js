@@ -10,6 +10,9 @@ let gameState = {
     discussionHistory: []
 };
 
+// Stream agent statements over Server-Sent Events when the browser supports it
+const supportsStreaming = typeof EventSource !== 'undefined';
+
 // Wait for the DOM to be fully loaded
 document.addEventListener('DOMContentLoaded', function() {
     console.log("DOM fully loaded");
@@ -238,7 +241,8 @@ document.addEventListener('DOMContentLoaded', function() {
         completeIndividualPhaseBtn.addEventListener('click', async function() {
             try {
                 const response = await axios.post('/api/start-group-discussion', {
-                    session_id: gameState.sessionId
+                    session_id: gameState.sessionId,
+                    stream_statements: supportsStreaming
                 });
                 
                 if (response.data.success) {
@@ -258,7 +262,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     currentTopicEl.textContent = `Current Topic: ${gameState.currentTopic}`;
                     
                     // Display opening statements
-                    displayAgentStatements(response.data.statements);
+                    showOpeningStatements(response.data);
                     
                     // Reset budget
                     gameState.budgetUsed = 0;
@@ -292,6 +296,63 @@ document.addEventListener('DOMContentLoaded', function() {
         discussionLogEl.scrollTop = discussionLogEl.scrollHeight;
     }
     
+    // Show opening statements, either included in the response or streamed
+    function showOpeningStatements(data) {
+        if (data.statements_stream_url) {
+            streamAgentStatements(data.statements_stream_url);
+        } else {
+            displayAgentStatements(data.statements);
+        }
+    }
+    
+    // Display agent statements as they are generated, one token at a time
+    function streamAgentStatements(url) {
+        const source = new EventSource(url);
+        const messageEls = {};
+        
+        function getMessageEl(agentId, agentName, preference) {
+            if (!messageEls[agentId]) {
+                const messageEl = document.createElement('div');
+                messageEl.className = 'agent-message';
+                messageEl.innerHTML = `
+                    <p><strong></strong></p>
+                    <p class="statement-text"></p>
+                `;
+                discussionLogEl.appendChild(messageEl);
+                messageEls[agentId] = messageEl;
+            }
+            const messageEl = messageEls[agentId];
+            if (agentName) {
+                messageEl.querySelector('strong').textContent = `${agentName} (Option ${preference}):`;
+            }
+            return messageEl;
+        }
+        
+        source.addEventListener('token', function(e) {
+            const data = JSON.parse(e.data);
+            getMessageEl(data.agent_id).querySelector('.statement-text').textContent += data.token;
+            discussionLogEl.scrollTop = discussionLogEl.scrollHeight;
+        });
+        
+        source.addEventListener('statement', function(e) {
+            const data = JSON.parse(e.data);
+            const messageEl = getMessageEl(data.agent_id, data.agent_name, data.preference);
+            messageEl.querySelector('.statement-text').textContent = data.statement;
+            discussionLogEl.scrollTop = discussionLogEl.scrollHeight;
+        });
+        
+        source.addEventListener('done', function() {
+            source.close();
+        });
+        
+        source.addEventListener('error', function(e) {
+            if (e.data) {
+                console.error('Error streaming agent statements:', JSON.parse(e.data).message);
+            }
+            source.close();
+        });
+    }
+    
     // Submit human argument
     if (submitArgumentBtn) {
         submitArgumentBtn.addEventListener('click', async function() {
@@ -365,7 +426,8 @@ document.addEventListener('DOMContentLoaded', function() {
             try {
                 const response = await axios.post('/api/finalize-topic', {
                     session_id: gameState.sessionId,
-                    option: option
+                    option: option,
+                    stream_statements: supportsStreaming
                 });
                 
                 if (response.data.success) {
@@ -395,7 +457,7 @@ document.addEventListener('DOMContentLoaded', function() {
                         discussionLogEl.appendChild(decisionEl);
                         
                         // Display opening statements for next topic
-                        displayAgentStatements(response.data.statements);
+                        showOpeningStatements(response.data);
                     } else {
                         // Move to reflection phase
                         startReflectionPhase();
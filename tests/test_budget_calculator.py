@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from modules.budget_calculator import POLICY_AREAS, BudgetCalculator, decode_package, encode_package
+from modules.game_controller import ChallengeGameController
+
+COSTS = {1: 1, 2: 2, 3: 3}
+
+
+def recount_summary(selected, total_budget=14):
+    """The policy summary recounted by scanning every area, as the calculator did before it kept running totals."""
+    used_budget = sum(COSTS[option] for option in selected.values() if option is not None)
+    option_counts = {1: 0, 2: 0, 3: 0}
+    for option in selected.values():
+        if option is not None:
+            option_counts[option] += 1
+    return {
+        "used_budget": used_budget,
+        "remaining_budget": total_budget - used_budget,
+        "selected_policies": dict(selected),
+        "option_counts": option_counts,
+        "has_complete_policy_set": None not in selected.values(),
+        "has_policy_mix": len(set(selected.values()) - {None}) > 1
+    }
+
+
+def recount_is_valid(selected, total_budget=14):
+    summary = recount_summary(selected, total_budget)
+    return summary["used_budget"] <= total_budget and summary["has_policy_mix"] and summary["has_complete_policy_set"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_running_totals_match_recount(seed):
+    rng = random.Random(seed)
+    calculator = BudgetCalculator()
+    selected = {area: None for area in POLICY_AREAS}
+
+    for _ in range(60):
+        area = rng.choice(POLICY_AREAS)
+        option = rng.randint(1, 3)
+        current_cost = 0 if selected[area] is None else COSTS[selected[area]]
+        affordable = recount_summary(selected)["remaining_budget"] >= COSTS[option] - current_cost
+
+        assert calculator.set_policy_option(area, option) == affordable
+        if affordable:
+            selected[area] = option
+
+        assert calculator.get_policy_summary() == recount_summary(selected)
+        assert calculator.is_valid_policy_set() == recount_is_valid(selected)
+        assert calculator.calculate_current_usage() == recount_summary(selected)["used_budget"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_package_code_round_trip(seed):
+    rng = random.Random(seed)
+    calculator = BudgetCalculator()
+    for area in POLICY_AREAS:
+        if rng.random() < 0.8:
+            calculator.set_policy_option(area, rng.randint(1, 3))
+
+    options = [calculator.selected_policies[area] or 0 for area in POLICY_AREAS]
+    assert encode_package(options) == calculator.package_code
+    assert decode_package(calculator.package_code) == options
+
+    loaded = BudgetCalculator()
+    assert loaded.load_package_code(calculator.package_code)
+    assert loaded.get_policy_summary() == calculator.get_policy_summary()
+
+
+def test_load_over_budget_package_code_changes_nothing():
+    calculator = BudgetCalculator()
+    calculator.set_policy_option("Access to Education", 1)
+    before = calculator.get_policy_summary()
+
+    assert not calculator.load_package_code(encode_package([3] * len(POLICY_AREAS)))
+    assert not calculator.load_package_code(4 ** len(POLICY_AREAS))
+    assert not calculator.load_package_code(-1)
+    assert calculator.get_policy_summary() == before
+
+
+def test_from_state_rejects_over_budget_package_code():
+    state = ChallengeGameController.new_game(seed=3).to_state()
+    state["package_code"] = encode_package([3] * len(POLICY_AREAS))
+
+    with pytest.raises(ValueError):
+        ChallengeGameController.from_state(state)
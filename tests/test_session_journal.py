@@ -0,0 +1,74 @@
+import json
+
+from modules.game_controller import ChallengeGameController
+from modules.session_journal import SessionJournal
+from modules.session_store import MemorySessionStore
+
+
+def play_journaled_game(directory, snapshot_every=50, topics=3):
+    """
+    Play the start of a game through a journaled memory store and return (store, journal).
+    The human picks option 2 everywhere, argues on each topic and the group settles on option 2.
+    """
+    journal = SessionJournal(str(directory), snapshot_every=snapshot_every)
+    store = MemorySessionStore(sweep_interval=0)
+    store.journal = journal
+    store.put("game", ChallengeGameController.new_game(seed=7))
+
+    with store.session("game") as controller:
+        controller.start_game()
+    for area in store.get("game").policy_areas:
+        with store.session("game") as controller:
+            assert controller.set_human_preference(area, 2)["success"]
+    with store.session("game") as controller:
+        assert controller.start_group_discussion()["success"]
+
+    for _ in range(topics):
+        with store.session("game") as controller:
+            assert controller.get_agent_opening_statements()["success"]
+        with store.session("game") as controller:
+            assert controller.submit_human_argument("Option 2 balances cost and inclusion.", 2)["success"]
+        with store.session("game") as controller:
+            assert controller.finalize_topic_decision(2)["success"]
+    return store, journal
+
+
+def test_replay_reproduces_state(tmp_path):
+    store, journal = play_journaled_game(tmp_path)
+
+    controller, last_change, replayed = journal.load("game")
+    assert replayed > 0
+    assert controller.to_state() == store.get("game").to_state()
+    assert last_change == controller.discussion_history[-1]["timestamp"]
+
+
+def test_compaction_preserves_state(tmp_path):
+    store, journal = play_journaled_game(tmp_path, snapshot_every=3)
+
+    assert journal.snapshots_written > 1
+    controller, _, replayed = journal.load("game")
+    assert replayed < 3
+    assert controller.to_state() == store.get("game").to_state()
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    store, journal = play_journaled_game(tmp_path)
+    _, _, replayed = journal.load("game")
+
+    # A crash in the middle of writing an event leaves a partial last line
+    event = json.dumps({"t": "decision", "option": 3, "ts": 0}, separators=(",", ":"))
+    with open(journal._path("game"), "a", encoding="utf-8") as f:
+        f.write(event[:len(event) // 2])
+
+    controller, _, replayed_after_crash = journal.load("game")
+    assert replayed_after_crash == replayed
+    assert controller.to_state() == store.get("game").to_state()
+
+
+def test_restore_rebuilds_sessions(tmp_path):
+    store, journal = play_journaled_game(tmp_path)
+
+    restored_store = MemorySessionStore(sweep_interval=0)
+    restored_store.journal = journal
+    assert journal.restore(restored_store) == 1
+    assert restored_store.get("game").to_state() == store.get("game").to_state()